@@ -21,11 +21,19 @@ else
 fi
 
 # Django setup
-python manage.py flush --no-input
+if [ "$ENV" = "local" ]; then
+    # Reset the local database with the fixtures on every start
+    python manage.py flush --no-input
+    python manage.py makemigrations
+fi
+
 python manage.py collectstatic --no-input
-python manage.py makemigrations
 python manage.py migrate
-python manage.py loaddata */fixtures/*.json
 
-# Start Gunicorn
-gunicorn --bind 0.0.0.0:8000 source.wsgi
+if [ "$ENV" = "local" ]; then
+    python manage.py loaddata */fixtures/*.json
+fi
+
+# Start Gunicorn, see gunicorn.conf.py for the served app and the GUNICORN_*
+# tuning variables
+exec gunicorn -c gunicorn.conf.py
@@ -0,0 +1,52 @@
+"""
+Gunicorn serving profile.
+
+Every value can be tuned per machine with a GUNICORN_* environment variable,
+see config/gunicorn_load_test.py to find the best ones.
+"""
+
+import multiprocessing
+import os
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Views mostly wait on Stripe, Google, S3, Pinpoint and the database, so
+# threads keep a worker busy while a request is blocked on I/O.
+# GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker serves source.asgi
+# instead, where the async views keep hundreds of those calls in flight per
+# process. Every ASGI request then queries the database from its own thread,
+# so persistent connections are never reused: set DB_POOL_MAX_SIZE along with
+# it to lend them from a pool, see utils.async_views.run_external_call
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("GUNICORN_WORKERS", cpu_count * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", 4))  # gthread only
+
+is_asgi = worker_class.startswith("uvicorn.")
+wsgi_app = "source.asgi:application" if is_asgi else "source.wsgi:application"
+
+# Import the app once in the master, workers are forked with it loaded
+preload_app = os.getenv("GUNICORN_PRELOAD_APP", "true").lower() == "true"
+
+# Recycle workers, with jitter so that they do not all restart together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))  # in seconds
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))  # in seconds
+# Above the load balancer idle timeout, so it never reuses a closed connection
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 75))  # in seconds
+
+# Heartbeat files on a tmpfs, a slow container disk can get workers killed
+worker_tmp_dir = os.getenv("GUNICORN_WORKER_TMP_DIR", "/dev/shm")
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None  # Empty to disable
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Connections opened by the master while preloading must not be shared
+    from django.db import connections
+
+    connections.close_all()
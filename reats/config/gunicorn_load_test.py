@@ -0,0 +1,170 @@
+"""
+Find the best gunicorn workers and threads numbers on the current machine.
+
+Every combination is served with config/gunicorn.conf.py, then loaded by
+concurrent clients for a fixed duration. Run it from the reats directory,
+with the same environment variables as the server:
+
+    python config/gunicorn_load_test.py --path /api/v1/health/ \
+        --workers 2 4 8 --threads 1 4 8 --concurrency 64 --duration 20
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+CONFIG_PATH = Path(__file__).resolve().parent / "gunicorn.conf.py"
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, headers: dict, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+            return
+        except urllib.error.HTTPError:
+            return  # The server answers, even if the path needs other headers
+        except OSError:
+            time.sleep(0.2)
+
+    raise RuntimeError(f"Server not ready after {timeout} seconds")
+
+
+def run_client(url: str, headers: dict, deadline: float) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    errors_number = 0
+
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+
+        try:
+            with urllib.request.urlopen(
+                urllib.request.Request(url, headers=headers), timeout=30
+            ) as response:
+                response.read()
+        except OSError:
+            errors_number += 1
+            continue
+
+        latencies.append(time.monotonic() - start)
+
+    return latencies, errors_number
+
+
+def measure(
+    workers: int,
+    threads: int,
+    path: str,
+    headers: dict,
+    concurrency: int,
+    duration: float,
+) -> dict:
+    port = get_free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    environment = {
+        **os.environ,
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_WORKERS": str(workers),
+        "GUNICORN_THREADS": str(threads),
+        "GUNICORN_ACCESS_LOG": "",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", str(CONFIG_PATH)],
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        wait_until_ready(url, headers)
+        deadline = time.monotonic() + duration
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(
+                executor.map(
+                    lambda _: run_client(url, headers, deadline), range(concurrency)
+                )
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(latency for result in results for latency in result[0])
+
+    return {
+        "workers": workers,
+        "threads": threads,
+        "requests_per_second": len(latencies) / duration,
+        "p50_latency": statistics.median(latencies) if latencies else 0.0,
+        "p95_latency": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+        "errors_number": sum(result[1] for result in results),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--path", default="/api/v1/health/")
+    parser.add_argument(
+        "--header",
+        action="append",
+        default=[],
+        help="Request header, ex: 'Authorization: Bearer <token>'",
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)  # in seconds
+    args = parser.parse_args()
+
+    headers = dict(
+        (name.strip(), value.strip())
+        for name, value in (header.split(":", 1) for header in args.header)
+    )
+    results = []
+
+    for workers in args.workers:
+        for threads in args.threads:
+            result = measure(
+                workers, threads, args.path, headers, args.concurrency, args.duration
+            )
+            results.append(result)
+            print(
+                f"workers={workers:<3} threads={threads:<3} "
+                f"{result['requests_per_second']:8.1f} req/s  "
+                f"p50={result['p50_latency'] * 1000:7.1f}ms  "
+                f"p95={result['p95_latency'] * 1000:7.1f}ms  "
+                f"errors={result['errors_number']}"
+            )
+
+    best = max(
+        (result for result in results if result["errors_number"] == 0),
+        key=lambda result: result["requests_per_second"],
+        default=None,
+    )
+
+    if best is None:
+        print("Every combination had errors, check the server logs.")
+        return
+
+    print(
+        f"\nBest: GUNICORN_WORKERS={best['workers']} GUNICORN_THREADS={best['threads']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -19,13 +19,17 @@ from rest_framework_simplejwt.serializers import (
     TokenObtainPairSerializer,
     TokenRefreshSerializer,
 )
-from utils.common import compute_order_items_total_amount, format_phone
+from utils.common import (
+    compute_order_items_total_amount,
+    format_phone,
+    get_user_by_app_origin,
+)
 
 
 class CookerSerializer(ModelSerializer):
     class Meta:
         model = CookerModel
-        exclude = ("photo",)
+        exclude = ("photo", "in_flight_order_number", "national_phone")
 
     def validate_phone(self, phone):
         try:
@@ -90,44 +94,16 @@ class TokenObtainPairWithoutPasswordSerializer(TokenObtainPairSerializer):
         app_origin = request_headers.get("App-Origin")
         formatted_phone = format_phone(phone)
 
-        if app_origin not in ["cooker", "customer", "delivery"]:
+        if app_origin not in [
+            settings.COOKER_APP_ORIGIN,
+            settings.CUSTOMER_APP_ORIGIN,
+            settings.DELIVERY_APP_ORIGIN,
+        ]:
             raise ValidationError(f"Unknown App-Origin header value {app_origin}")
 
-        try:
-            cooker_user: Union[CookerModel, None] = CookerModel.objects.get(
-                phone=formatted_phone
-            )
-        except CookerModel.DoesNotExist:
-            cooker_user = None
-
-        try:
-            customer_user: Union[CustomerModel, None] = CustomerModel.objects.get(
-                phone=formatted_phone
-            )
-
-        except CustomerModel.DoesNotExist:
-            customer_user = None
-
-        try:
-            deliver_user: Union[DeliverModel, None] = DeliverModel.objects.get(
-                phone=formatted_phone
-            )
-        except DeliverModel.DoesNotExist:
-            deliver_user = None
-
-        if cooker_user is None and customer_user is None and deliver_user is None:
-            return {"ok": False, "status": status.HTTP_400_BAD_REQUEST}
-
-        self.user: Union[CookerModel, CustomerModel, DeliverModel, None] = None
-
-        if app_origin == "cooker":
-            self.user = cooker_user
-        elif app_origin == "customer":
-            self.user = customer_user
-        elif app_origin == "delivery":
-            self.user = deliver_user
-        else:
-            self.user = None
+        self.user: Union[
+            CookerModel, CustomerModel, DeliverModel, None
+        ] = get_user_by_app_origin(app_origin, formatted_phone)
 
         if self.user is None:
             return {"ok": False, "status": status.HTTP_400_BAD_REQUEST}
@@ -1,13 +1,22 @@
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 from typing import Type, Union
 
-from core_app.models import CookerModel, DishModel, DrinkModel, OrderModel
+from asgiref.sync import sync_to_async
+from core_app.models import (
+    CookerDailyRollupModel,
+    CookerModel,
+    DishModel,
+    DrinkModel,
+    OrderEventModel,
+    OrderModel,
+)
 from core_app.serializers import (
     DishGETSerializer,
     DrinkGETSerializer,
+    OrderEventGETSerializer,
     OrderPATCHSerializer,
 )
 from custom_renderers.renderers import (
@@ -18,7 +27,8 @@ from custom_renderers.renderers import (
     OrderCustomRendererWithData,
 )
 from django.db import IntegrityError
-from django.db.models import Count
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
 from phonenumbers.phonenumberutil import NumberParseException
 from rest_framework import status
 from rest_framework.decorators import action
@@ -30,19 +40,33 @@ from rest_framework.response import Response
 from rest_framework.serializers import BaseSerializer
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 from rest_framework_simplejwt.views import TokenViewBase
+from utils.async_views import (
+    AsyncCreateModelMixin,
+    AsyncUpdateModelMixin,
+    AsyncViewSetMixin,
+    run_external_call,
+)
 from utils.common import (
     activate_user,
+    arequest_otp,
+    aupload_photo,
     compute_order_items_total_amount,
     create_stripe_refund,
-    delete_s3_object,
+    delete_photo,
+    delete_photo_if_unused,
     format_phone,
+    get_acceptance_rate_delta,
     is_otp_valid,
-    send_otp,
+    request_otp,
     update_cooker_acceptance_rate,
-    upload_image_to_s3,
 )
 from utils.custom_permissions import CustomAPIKeyPermission, UserPermission
+from utils.custom_throttles import OtpRequestThrottle
 from utils.enums import OrderStatusEnum
+from utils.timeframe_stats import (
+    get_cooker_timeframe_stats,
+    get_timeframe_stats_response,
+)
 
 from .serializers import (
     CookerGETSerializer,
@@ -59,7 +83,7 @@ from .serializers import (
 logger = logging.getLogger("watchtower-logger")
 
 
-class CookerView(ModelViewSet):
+class CookerView(AsyncViewSetMixin, ModelViewSet):
     parser_classes = [MultiPartParser]
     queryset = CookerModel.objects.all()
 
@@ -77,6 +101,12 @@ class CookerView(ModelViewSet):
 
         return [permission() for permission in permission_classes]
 
+    def get_throttles(self) -> list:
+        if self.action in ("auth", "ask_otp", "create"):
+            return [OtpRequestThrottle()]
+
+        return super().get_throttles()
+
     def get_serializer_class(self) -> type[BaseSerializer]:
         if self.request.method in ("POST", "PATCH"):
             self.serializer_class = CookerSerializer
@@ -93,7 +123,7 @@ class CookerView(ModelViewSet):
             logger.error(err)
             return
 
-        send_otp(serializer.validated_data.get("phone"))
+        request_otp(serializer.validated_data.get("phone"))
 
     def get_renderers(self) -> list[BaseRenderer]:
         if self.request.method in ("POST", "PATCH", "DELETE"):
@@ -104,36 +134,29 @@ class CookerView(ModelViewSet):
 
         return super().get_renderers()
 
-    def partial_update(self, request, *args, **kwargs) -> Response:
+    async def partial_update(self, request, *args, **kwargs) -> Response:
         kwargs.pop("pk")  # pk is unexpected in parent's partial_update method
-        cooker: CookerModel = self.get_object()
+        cooker: CookerModel = await sync_to_async(self.get_object)()
         old_photo_key: str = cooker.photo
-        photo = None
+        photo_directory = None
 
         try:
             self.request.FILES["photo"]
         except KeyError:
             pass
         else:
-            photo = (
-                "cookers"
-                + "/"
-                + str(cooker.pk)
-                + "/"
-                + "profile_pics"
-                + "/"
-                + self.request.FILES["photo"].name
-            )
+            photo_directory = "cookers" + "/" + str(cooker.pk) + "/" + "profile_pics"
 
-        if photo is not None:
-            upload_image_to_s3(self.request.FILES["photo"], photo)
+        if photo_directory is not None:
+            photo = await aupload_photo(self.request.FILES["photo"], photo_directory)
             cooker.photo = photo
-            cooker.save()
+            await sync_to_async(cooker.save)()
 
             if not old_photo_key.endswith("default-profile-pic.jpg"):
-                delete_s3_object(old_photo_key)
+                if old_photo_key != photo:
+                    await run_external_call(delete_photo, old_photo_key)
 
-        return super().partial_update(request, *args, **kwargs)
+        return await sync_to_async(super().partial_update)(request, *args, **kwargs)
 
     def destroy(self, request, *args, **kwargs) -> Response:
         instance = self.get_object()
@@ -157,7 +180,7 @@ class CookerView(ModelViewSet):
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
     @action(methods=["post"], detail=False)
-    def auth(self, request) -> Response:
+    async def auth(self, request) -> Response:
         phone = request.data.get("phone")
 
         if phone is None:
@@ -169,42 +192,22 @@ class CookerView(ModelViewSet):
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            cooker: CookerModel = CookerModel.objects.get(phone=e164_phone_format)
+            cooker: CookerModel = await CookerModel.objects.aget(
+                phone=e164_phone_format
+            )
         except CookerModel.DoesNotExist:
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
         if not cooker.is_activated:
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        otp_response: Union[dict, None] = send_otp(e164_phone_format)
-
-        if otp_response is None:
-            return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
-
-        otp_response_status_code = (
-            otp_response.get("MessageResponse", {})
-            .get("Result", {})
-            .get(e164_phone_format, {})
-            .get("StatusCode")
-        )
-
-        if otp_response_status_code != status.HTTP_200_OK:
-            return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
-
-        otp_response_delivery_status = (
-            otp_response.get("MessageResponse", {})
-            .get("Result", {})
-            .get(e164_phone_format, {})
-            .get("DeliveryStatus")
-        )
-
-        if otp_response_delivery_status != "SUCCESSFUL":
+        if not await arequest_otp(e164_phone_format):
             return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
         return Response(status=status.HTTP_200_OK)
 
     @action(methods=["post"], detail=False, url_path="otp/ask")
-    def ask_otp(self, request) -> Response:
+    async def ask_otp(self, request) -> Response:
         phone = request.data.get("phone")
 
         try:
@@ -212,7 +215,13 @@ class CookerView(ModelViewSet):
         except NumberParseException:
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        send_otp(e164_phone_format)
+        try:
+            await CookerModel.objects.aget(phone=e164_phone_format)
+        except CookerModel.DoesNotExist:
+            logger.error(f"Cooker with phone {e164_phone_format} does not exist.")
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+
+        await arequest_otp(e164_phone_format, deduplicate=False)
 
         return Response(status=status.HTTP_200_OK)
 
@@ -245,16 +254,65 @@ class DashboardView(GenericViewSet):
                 }
             )
 
+        if timezone.is_naive(start_date):
+            start_date = timezone.make_aware(start_date)
+
+        if timezone.is_naive(end_date):
+            end_date = timezone.make_aware(end_date)
+
+        # Full days are read from the daily rollups, only the partial
+        # days at both ends of the range are counted from the orders table.
+        first_full_day = timezone.localdate(start_date)
+        if start_date != timezone.make_aware(
+            datetime.combine(first_full_day, time.min)
+        ):
+            first_full_day += timedelta(days=1)
+        last_partial_day = timezone.localdate(end_date)
+
+        orders_filter = Q(created__gte=start_date, created__lte=end_date)
+        orders_dict: dict[str, int] = {}
+
+        if first_full_day < last_partial_day:
+            orders_filter = Q(
+                created__gte=start_date,
+                created__lt=timezone.make_aware(
+                    datetime.combine(first_full_day, time.min)
+                ),
+            ) | Q(
+                created__gte=timezone.make_aware(
+                    datetime.combine(last_partial_day, time.min)
+                ),
+                created__lte=end_date,
+            )
+            rollups = (
+                CookerDailyRollupModel.objects.filter(
+                    cooker=request.user.pk,
+                    day__gte=first_full_day,
+                    day__lt=last_partial_day,
+                )
+                .values("status")
+                .annotate(total=Sum("count"))
+                .values_list("status", "total")
+            )
+            orders_dict.update(rollups)
+
         orders = (
-            OrderModel.objects.filter(created__gte=start_date)
-            .filter(created__lte=end_date)
+            OrderModel.objects.filter(orders_filter)
             .filter(cooker=request.user.pk)
             .exclude(status__in=[OrderStatusEnum.DRAFT])
             .values("status")  # Group by 'status'
             .annotate(count=Count("id"))  # Count the number of orders for each status
             .values_list("status", "count")  # Return as a list of tuples
         )
-        orders_dict = {status: count for status, count in orders}
+
+        for order_status, count in orders:
+            orders_dict[order_status] = orders_dict.get(order_status, 0) + count
+
+        orders_dict = {
+            order_status: count
+            for order_status, count in orders_dict.items()
+            if count > 0
+        }
 
         return Response(
             {
@@ -264,8 +322,17 @@ class DashboardView(GenericViewSet):
             }
         )
 
+    @action(methods=["get"], detail=False)
+    def timeframe(self, request) -> Response:
+        return get_timeframe_stats_response(
+            request.query_params.get("timeframe"),
+            lambda timeframe: get_cooker_timeframe_stats(request.user.pk, timeframe),
+        )
+
 
-class DishView(ModelViewSet):
+class DishView(
+    AsyncViewSetMixin, AsyncCreateModelMixin, AsyncUpdateModelMixin, ModelViewSet
+):
     parser_classes = [MultiPartParser]
     queryset = DishModel.objects.all()
 
@@ -290,8 +357,8 @@ class DishView(ModelViewSet):
 
         return super().get_renderers()
 
-    def perform_create(self, serializer: BaseSerializer) -> None:
-        photo = (
+    async def perform_create(self, serializer: BaseSerializer) -> None:
+        photo_directory = (
             "cookers"
             + "/"
             + str(serializer.validated_data["cooker"].pk)
@@ -299,24 +366,22 @@ class DishView(ModelViewSet):
             + "dishes"
             + "/"
             + serializer.validated_data["category"]
-            + "/"
-            + self.request.FILES["photo"].name
         )
 
-        upload_image_to_s3(self.request.FILES["photo"], photo)
+        photo = await aupload_photo(self.request.FILES["photo"], photo_directory)
         serializer.validated_data["photo"] = photo
-        super().perform_create(serializer)
+        await super().perform_create(serializer)
 
-    def perform_update(self, serializer: BaseSerializer) -> None:
-        current_object = self.get_object()
-        photo = None
+    async def perform_update(self, serializer: BaseSerializer) -> None:
+        current_object = await sync_to_async(self.get_object)()
+        photo_directory = None
 
         try:
             self.request.FILES["photo"]
         except KeyError:
             pass
         else:
-            photo = (
+            photo_directory = (
                 "cookers"
                 + "/"
                 + str(serializer.validated_data["cooker"].pk)
@@ -324,17 +389,18 @@ class DishView(ModelViewSet):
                 + "dishes"
                 + "/"
                 + serializer.validated_data["category"]
-                + "/"
-                + self.request.FILES["photo"].name
             )
 
-        if photo is not None:
-            upload_image_to_s3(self.request.FILES["photo"], photo)
+        if photo_directory is not None:
+            photo = await aupload_photo(self.request.FILES["photo"], photo_directory)
             serializer.validated_data["photo"] = photo
-            old_photo_key = current_object.photo
-            delete_s3_object(old_photo_key)
 
-        super().perform_update(serializer)
+        await super().perform_update(serializer)
+
+        if serializer.instance.photo != current_object.photo:
+            await sync_to_async(delete_photo_if_unused)(
+                type(current_object), current_object.photo
+            )
 
     def list(self, request, *args, **kwargs) -> Response:
         request_name: Union[str, None] = self.request.query_params.get("name")
@@ -375,7 +441,9 @@ class DishView(ModelViewSet):
         )
 
 
-class DrinkView(ModelViewSet):
+class DrinkView(
+    AsyncViewSetMixin, AsyncCreateModelMixin, AsyncUpdateModelMixin, ModelViewSet
+):
     parser_classes = [MultiPartParser]
     queryset = DrinkModel.objects.all()
 
@@ -400,47 +468,46 @@ class DrinkView(ModelViewSet):
 
         return super().get_renderers()
 
-    def perform_create(self, serializer: BaseSerializer) -> None:
-        photo = (
+    async def perform_create(self, serializer: BaseSerializer) -> None:
+        photo_directory = (
             "cookers"
             + "/"
             + str(serializer.validated_data["cooker"].pk)
             + "/"
             + "drinks"
-            + "/"
-            + self.request.FILES["photo"].name
         )
 
-        upload_image_to_s3(self.request.FILES["photo"], photo)
+        photo = await aupload_photo(self.request.FILES["photo"], photo_directory)
         serializer.validated_data["photo"] = photo
-        super().perform_create(serializer)
+        await super().perform_create(serializer)
 
-    def perform_update(self, serializer: BaseSerializer) -> None:
-        current_object = self.get_object()
-        photo = None
+    async def perform_update(self, serializer: BaseSerializer) -> None:
+        current_object = await sync_to_async(self.get_object)()
+        photo_directory = None
 
         try:
             self.request.FILES["photo"]
         except KeyError:
             pass
         else:
-            photo = (
+            photo_directory = (
                 "cookers"
                 + "/"
                 + str(serializer.validated_data["cooker"].pk)
                 + "/"
                 + "drinks"
-                + "/"
-                + self.request.FILES["photo"].name
             )
 
-        if photo is not None:
-            upload_image_to_s3(self.request.FILES["photo"], photo)
+        if photo_directory is not None:
+            photo = await aupload_photo(self.request.FILES["photo"], photo_directory)
             serializer.validated_data["photo"] = photo
-            old_photo_key = current_object.photo
-            delete_s3_object(old_photo_key)
 
-        super().perform_update(serializer)
+        await super().perform_update(serializer)
+
+        if serializer.instance.photo != current_object.photo:
+            await sync_to_async(delete_photo_if_unused)(
+                type(current_object), current_object.photo
+            )
 
     def list(self, request, *args, **kwargs) -> Response:
         request_name: Union[str, None] = self.request.query_params.get("name")
@@ -528,7 +595,8 @@ class CookerOrderView(
                 int(amount_to_refund_in_cents), instance.stripe_payment_intent_id
             )
 
-        update_cooker_acceptance_rate(instance, new_status)
+        if get_acceptance_rate_delta(new_status) is not None:
+            update_cooker_acceptance_rate(instance, new_status)
 
         return super().partial_update(request, *args, **kwargs)
 
@@ -539,6 +607,9 @@ class CookerOrderView(
         if self.request.method == "GET":
             self.renderer_classes = [OrderCustomRendererWithData]
 
+        if self.action == "events":
+            self.renderer_classes = [CustomRendererWithData]
+
         return super().get_renderers()
 
     def get_serializer_class(self) -> type[BaseSerializer]:
@@ -569,6 +640,15 @@ class CookerOrderView(
 
         return super().list(request, *args, **kwargs)
 
+    @action(methods=["get"], detail=True)
+    def events(self, request, pk=None) -> Response:
+        events = OrderEventModel.objects.filter(
+            order_id=pk,
+            cooker_id=request.user.pk,
+        ).order_by("created", "id")
+
+        return Response(OrderEventGETSerializer(events, many=True).data)
+
 
 class CookerOrderHistoryView(ListModelMixin, GenericViewSet):
     permission_classes = [UserPermission]
@@ -0,0 +1,123 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from core_app.models import CookerModel, DishModel, OrderModel
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from utils.benchmarks.dataset import seed_dataset
+from utils.benchmarks.endpoints import (
+    BASELINE_PATH,
+    benchmark_endpoints,
+    compare_with_baseline,
+)
+from utils.benchmarks.stand_ins import external_services_stand_ins
+
+
+def get_dataset_size() -> dict[str, int]:
+    return {
+        "cookers": CookerModel.objects.count(),
+        "dishes": DishModel.objects.count(),
+        "orders": OrderModel.objects.count(),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the latency, queries and allocated memory of every router "
+        "endpoint on a synthetic dataset, in a database of its own, Stripe, "
+        "Google, Pinpoint and S3 being replaced by local stand-ins. Fails on "
+        "regressions from the stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="1 seeds 2000 cookers, 100k dishes and 1M orders",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the seeded database for the next runs",
+        )
+        parser.add_argument("--baseline", default=str(BASELINE_PATH))
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Store the results as the new baseline instead of comparing",
+        )
+        parser.add_argument("--latency-tolerance", type=float, default=0.5)
+        parser.add_argument("--memory-tolerance", type=float, default=0.25)
+
+    def handle(self, *args, **options):
+        database_name = connection.settings_dict["NAME"]
+        connection.settings_dict["TEST"]["NAME"] = f"benchmark_{database_name}"
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"], serialize=False
+        )
+
+        try:
+            if not OrderModel.objects.exists():
+                start = perf_counter()
+                seed_dataset(options["scale"])
+                self.stdout.write(
+                    f"dataset seeded in {perf_counter() - start:.0f} s: "
+                    f"{get_dataset_size()}"
+                )
+
+            with TemporaryDirectory() as storage_root, external_services_stand_ins(
+                storage_root
+            ), override_settings(DEBUG=False):
+                results = benchmark_endpoints(options["repeat"])
+
+            dataset_size = get_dataset_size()
+        finally:
+            connection.creation.destroy_test_db(
+                database_name, verbosity=0, keepdb=options["keepdb"]
+            )
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name}: {result['status']} in {result['p50_ms']} ms "
+                f"(p95 {result['p95_ms']} ms), {result['queries']} queries, "
+                f"{result['peak_kb']} KB allocated"
+            )
+
+        baseline_path = Path(options["baseline"])
+
+        if options["save_baseline"]:
+            baseline_path.write_text(
+                json.dumps(
+                    {"dataset": dataset_size, "endpoints": results},
+                    indent=2,
+                    sort_keys=True,
+                )
+                + "\n"
+            )
+            self.stdout.write(f"Baseline saved to {baseline_path}.")
+            return
+
+        baseline = json.loads(baseline_path.read_text())
+
+        if baseline["dataset"] != dataset_size:
+            raise CommandError(
+                f"The baseline was measured on {baseline['dataset']}, not on "
+                f"{dataset_size}, run with the same --scale."
+            )
+
+        regressions = compare_with_baseline(
+            results,
+            baseline["endpoints"],
+            options["latency_tolerance"],
+            options["memory_tolerance"],
+        )
+
+        if regressions:
+            raise CommandError("\n".join(["Regressions:", *regressions]))
+
+        self.stdout.write("No regression.")
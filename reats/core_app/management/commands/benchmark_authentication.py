@@ -0,0 +1,77 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.permissions import BasePermission
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from utils.authentication import CachedJWTStatelessUserAuthentication, verified_tokens
+from utils.custom_permissions import UserPermission
+
+
+class DoubleVerificationPermission(BasePermission):
+    # Former UserPermission, authenticating the request a second time
+    def has_permission(self, request: Request, view) -> bool:
+        return JWTStatelessUserAuthentication().authenticate(request) is not None
+
+
+class PingView(APIView):
+    def get(self, request: Request) -> Response:
+        return Response({"ok": True})
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the requests per second of an authenticated no-op endpoint, "
+        "verifying the JWT twice, once, or once per token lifetime."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--user-id", type=int, default=1)
+
+    def handle(self, *args, **options):
+        token = AccessToken()
+        token[api_settings.USER_ID_CLAIM] = options["user_id"]
+        request = APIRequestFactory().get(
+            "/ping/", HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+
+        scenarios = [
+            (
+                "double verification",
+                JWTStatelessUserAuthentication,
+                DoubleVerificationPermission,
+            ),
+            ("single verification", JWTStatelessUserAuthentication, UserPermission),
+            (
+                "cached verification",
+                CachedJWTStatelessUserAuthentication,
+                UserPermission,
+            ),
+        ]
+
+        for name, authentication_class, permission_class in scenarios:
+            view = PingView.as_view(
+                authentication_classes=[authentication_class],
+                permission_classes=[permission_class],
+            )
+            verified_tokens.clear()
+
+            start = perf_counter()
+
+            for _ in range(options["requests"]):
+                response = view(request)
+
+                if response.status_code != 200:
+                    raise CommandError(f"{name}: {response.data}")
+
+            elapsed = perf_counter() - start
+
+            self.stdout.write(
+                f"{name}: {options['requests'] / elapsed:.0f} requests/sec"
+            )
@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.postgresql.base import DatabaseWrapper
+from utils.postgresql_pool import base as postgresql_pool
+
+BENCHMARK_ALIAS = "benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the requests per second of a single query request, opening a "
+        "connection per request, keeping it open, or borrowing it from the pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument(
+            "--threads", type=int, default=4, help="Like gunicorn threads"
+        )
+
+    def run_requests(self, wrapper_class, settings_dict: dict, requests: int) -> None:
+        # One wrapper per thread, like django.db.connections
+        wrapper = wrapper_class(settings_dict, alias=BENCHMARK_ALIAS)
+
+        try:
+            for _ in range(requests):
+                with wrapper.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+
+                # What the request_finished signal does
+                wrapper.close_if_unusable_or_obsolete()
+        finally:
+            wrapper.close()
+
+    def handle(self, *args, **options):
+        base_settings = {
+            **connections[DEFAULT_DB_ALIAS].settings_dict,
+            "CONN_HEALTH_CHECKS": True,
+        }
+        threads = options["threads"]
+        requests_per_thread = options["requests"] // threads
+        postgresql_pool.pools[BENCHMARK_ALIAS] = postgresql_pool.ConnectionPool(
+            threads, settings.DB_POOL_TIMEOUT, settings.DB_POOL_HEALTH_CHECK_AGE
+        )
+
+        scenarios = [
+            ("per-request connection", DatabaseWrapper, 0),
+            ("persistent connection", DatabaseWrapper, 600),
+            ("pooled connection", postgresql_pool.DatabaseWrapper, 0),
+        ]
+
+        for name, wrapper_class, max_age in scenarios:
+            settings_dict = {**base_settings, "CONN_MAX_AGE": max_age}
+
+            start = perf_counter()
+
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                for _ in executor.map(
+                    lambda _: self.run_requests(
+                        wrapper_class, settings_dict, requests_per_thread
+                    ),
+                    range(threads),
+                ):
+                    pass
+
+            elapsed = perf_counter() - start
+
+            self.stdout.write(
+                f"{name}: {requests_per_thread * threads / elapsed:.0f} requests/sec"
+            )
+
+        pool = postgresql_pool.pools.pop(BENCHMARK_ALIAS)
+        self.stdout.write(f"pool metrics: {pool.get_metrics()}")
+        pool.close_idle_connections()
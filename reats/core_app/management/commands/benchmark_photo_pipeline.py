@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from PIL import Image
+from utils.common import photo_uploads, upload_photo
+
+
+def make_photo(width: int, height: int) -> bytes:
+    # Smooth noise compresses like a photo, unlike noise or a plain color
+    channels = [
+        Image.effect_noise((width // 16, height // 16), 64).resize((width, height))
+        for _ in range(3)
+    ]
+    photo = BytesIO()
+    Image.merge("RGB", channels).save(photo, "JPEG", quality=90)
+
+    return photo.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the photos per second of the whole photo pipeline, from the "
+        "uploaded file to the stored renditions, on a FileSystemStorage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--photos", type=int, default=40)
+        parser.add_argument("--width", type=int, default=4032)
+        parser.add_argument("--height", type=int, default=3024)
+        parser.add_argument(
+            "--threads", type=int, default=4, help="Like gunicorn threads"
+        )
+        parser.add_argument(
+            "--upload-concurrency",
+            type=int,
+            default=settings.S3_UPLOADS_MAX_CONCURRENCY,
+            help="0 processes and stores the photos in the request threads",
+        )
+
+    def upload_photos(self, photos: list[bytes], threads: int) -> tuple[float, float]:
+        start = perf_counter()
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for _ in executor.map(
+                lambda indexed_photo: upload_photo(
+                    SimpleUploadedFile(
+                        f"{indexed_photo[0]}.jpg", indexed_photo[1], "image/jpeg"
+                    ),
+                    "benchmark/photos",
+                ),
+                enumerate(photos),
+            ):
+                pass
+
+        requests_time = perf_counter() - start
+        photo_uploads.join()
+
+        return requests_time, perf_counter() - start
+
+    def handle(self, *args, **options):
+        photos = [
+            make_photo(options["width"], options["height"])
+            for _ in range(options["photos"])
+        ]
+        uploaded_size = sum(len(photo) for photo in photos) / 1024 / 1024
+
+        with TemporaryDirectory() as root, override_settings(
+            STORAGE_BACKEND="utils.storage.filesystem.FileSystemStorage",
+            STORAGE_FILESYSTEM_ROOT=root,
+            S3_UPLOADS_MAX_CONCURRENCY=options["upload_concurrency"],
+        ):
+            # Stored photos are skipped the second time
+            for name in ("new photos", "photos already stored"):
+                requests_time, total_time = self.upload_photos(
+                    photos, options["threads"]
+                )
+                self.stdout.write(
+                    f"{name}: {len(photos) / total_time:.1f} photos/sec, "
+                    f"{uploaded_size / total_time:.1f} MB/sec uploaded, "
+                    f"{requests_time / len(photos) * 1000:.1f} ms/photo "
+                    "in the requests"
+                )
+
+            stored_files = [
+                path for path in Path(root, "objects").rglob("*") if path.is_file()
+            ]
+            stored_size = sum(path.stat().st_size for path in stored_files)
+            self.stdout.write(
+                f"{uploaded_size:.1f} MB uploaded, {len(stored_files)} renditions "
+                f"of {stored_size / 1024 / 1024:.1f} MB stored"
+            )
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from utils.common import get_otp_validity_period
+from utils.otp_throttling import OtpSendStore, TokenBucketStore
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the OTP throttling buckets that are full again and the OTP sends "
+        "older than their validity period, to be run periodically."
+    )
+
+    def handle(self, *args, **options):
+        full_period = timedelta(
+            seconds=max(
+                settings.OTP_IP_BUCKET_CAPACITY * settings.OTP_IP_BUCKET_REFILL_TIME,
+                settings.OTP_PHONE_BUCKET_CAPACITY
+                * settings.OTP_PHONE_BUCKET_REFILL_TIME,
+            )
+        )
+        deleted_buckets_number = TokenBucketStore.delete_full(full_period)
+        deleted_sends_number = OtpSendStore.delete_expired(get_otp_validity_period())
+
+        self.stdout.write(
+            f"{deleted_buckets_number} OTP throttling buckets and "
+            f"{deleted_sends_number} OTP sends deleted."
+        )
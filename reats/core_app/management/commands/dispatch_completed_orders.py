@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from utils.dispatcher import dispatch_completed_orders
+
+
+class Command(BaseCommand):
+    help = "Assign completed orders to the closest online delivery men."
+
+    def handle(self, *args, **options):
+        assigned_orders_number: int = dispatch_completed_orders()
+
+        self.stdout.write(f"{assigned_orders_number} orders dispatched.")
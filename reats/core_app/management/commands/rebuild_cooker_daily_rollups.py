@@ -0,0 +1,55 @@
+from core_app.models import (
+    CookerDailyRollupModel,
+    OrderDishItemModel,
+    OrderDrinkItemModel,
+    OrderModel,
+)
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from utils.enums import OrderStatusEnum
+from utils.timeframe_stats_cache import invalidate_timeframe_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the cookers daily orders rollups from the orders table."
+
+    def handle(self, *args, **options):
+        dishes_total = (
+            OrderDishItemModel.objects.filter(order=OuterRef("pk"))
+            .order_by()
+            .values("order")
+            .annotate(total=Sum(F("dish__price") * F("dish_quantity")))
+            .values("total")
+        )
+        drinks_total = (
+            OrderDrinkItemModel.objects.filter(order=OuterRef("pk"))
+            .order_by()
+            .values("order")
+            .annotate(total=Sum(F("drink__price") * F("drink_quantity")))
+            .values("total")
+        )
+        rollups = (
+            OrderModel.objects.exclude(status=OrderStatusEnum.DRAFT)
+            .annotate(
+                day=TruncDate("created"),
+                items_total=Coalesce(
+                    Subquery(dishes_total, output_field=FloatField()), 0.0
+                )
+                + Coalesce(Subquery(drinks_total, output_field=FloatField()), 0.0),
+            )
+            .order_by()
+            .values("cooker_id", "day", "status")
+            .annotate(count=Count("id"), revenue=Sum("items_total"))
+        )
+
+        with transaction.atomic():
+            CookerDailyRollupModel.objects.all().delete()
+            created_rollups = CookerDailyRollupModel.objects.bulk_create(
+                [CookerDailyRollupModel(**rollup) for rollup in rollups],
+                batch_size=1000,
+            )
+            invalidate_timeframe_stats()
+
+        self.stdout.write(f"{len(created_rollups)} daily rollups rebuilt.")
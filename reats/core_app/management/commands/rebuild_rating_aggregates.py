@@ -0,0 +1,69 @@
+from core_app.models import CookerModel, DeliverModel, OrderModel
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+
+def get_rating_aggregates(order_field: str) -> dict[int, tuple[float, int]]:
+    return {
+        row[order_field]: (row["rating_sum"], row["rating_count"])
+        for row in OrderModel.objects.filter(
+            rating__gt=0, **{f"{order_field}__isnull": False}
+        )
+        .order_by()
+        .values(order_field)
+        .annotate(rating_sum=Sum("rating"), rating_count=Count("id"))
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every cooker's and delivery man's rating sum and count from "
+        "the orders ratings, with one grouped query each."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # Rows are locked first, ratings committed meanwhile wait and then
+            # apply on top of the recomputed values
+            cookers = list(
+                CookerModel.objects.select_for_update().only(
+                    "id", "rating_sum", "rating_count"
+                )
+            )
+            cookers_ratings = get_rating_aggregates("cooker")
+
+            for cooker in cookers:
+                cooker.rating_sum, cooker.rating_count = cookers_ratings.get(
+                    cooker.id, (0.0, 0)
+                )
+
+            CookerModel.objects.bulk_update(
+                cookers, ["rating_sum", "rating_count"], batch_size=1000
+            )
+
+            delivers = list(
+                DeliverModel.objects.select_for_update().only(
+                    "id", "rating_sum", "rating_count", "grades"
+                )
+            )
+            delivers_ratings = get_rating_aggregates("delivery_man")
+
+            for deliver in delivers:
+                deliver.rating_sum, deliver.rating_count = delivers_ratings.get(
+                    deliver.id, (0.0, 0)
+                )
+                deliver.grades = (
+                    deliver.rating_sum / deliver.rating_count
+                    if deliver.rating_count
+                    else 0.0
+                )
+
+            DeliverModel.objects.bulk_update(
+                delivers, ["rating_sum", "rating_count", "grades"], batch_size=1000
+            )
+
+        self.stdout.write(
+            f"Ratings recomputed for {len(cookers)} cookers and "
+            f"{len(delivers)} delivery men."
+        )
@@ -0,0 +1,32 @@
+from core_app.models import CookerModel, OrderModel
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from utils.enums import OrderStatusEnum
+
+
+class Command(BaseCommand):
+    help = "Recompute every cooker's in-flight order counter from the orders table."
+
+    def handle(self, *args, **options):
+        in_flight_orders_count = (
+            OrderModel.objects.filter(
+                cooker=OuterRef("pk"),
+                status__in=OrderStatusEnum.in_flight_statuses(),
+            )
+            .order_by()
+            .values("cooker")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+
+        updated_rows: int = CookerModel.objects.update(
+            in_flight_order_number=Coalesce(
+                Subquery(in_flight_orders_count, output_field=IntegerField()),
+                0,
+            )
+        )
+
+        self.stdout.write(
+            f"In-flight order counters recomputed for {updated_rows} cookers."
+        )
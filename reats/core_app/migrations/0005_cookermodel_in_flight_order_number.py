@@ -0,0 +1,45 @@
+# Generated by Django 4.1 on 2026-10-19 15:34
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def compute_in_flight_order_number(apps, schema_editor):
+    CookerModel = apps.get_model("core_app", "CookerModel")
+    OrderModel = apps.get_model("core_app", "OrderModel")
+    in_flight_orders_count = (
+        OrderModel.objects.filter(
+            cooker=OuterRef("pk"),
+            status__in=["pending", "processing", "completed"],
+        )
+        .order_by()
+        .values("cooker")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    CookerModel.objects.update(
+        in_flight_order_number=Coalesce(
+            Subquery(in_flight_orders_count, output_field=models.IntegerField()),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_app", "0004_alter_dishratingmodel_comment_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cookermodel",
+            name="in_flight_order_number",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(
+            compute_in_flight_order_number,
+            migrations.RunPython.noop,
+        ),
+    ]
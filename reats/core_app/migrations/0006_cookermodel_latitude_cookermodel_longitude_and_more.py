@@ -0,0 +1,33 @@
+# Generated by Django 4.1 on 2026-10-19 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_app", "0005_cookermodel_in_flight_order_number"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cookermodel",
+            name="latitude",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="cookermodel",
+            name="longitude",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="delivermodel",
+            name="latitude",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="delivermodel",
+            name="longitude",
+            field=models.FloatField(null=True),
+        ),
+    ]
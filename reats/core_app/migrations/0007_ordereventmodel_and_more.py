@@ -0,0 +1,101 @@
+# Generated by Django 4.1 on 2026-10-19 15:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_app", "0006_cookermodel_latitude_cookermodel_longitude_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderEventModel",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "previous_status",
+                    models.CharField(
+                        choices=[
+                            ("draft", "draft"),
+                            ("pending", "pending"),
+                            ("processing", "processing"),
+                            ("completed", "completed"),
+                            ("cancelled_by_customer", "cancelled_by_customer"),
+                            ("cancelled_by_cooker", "cancelled_by_cooker"),
+                            ("delivered", "delivered"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("draft", "draft"),
+                            ("pending", "pending"),
+                            ("processing", "processing"),
+                            ("completed", "completed"),
+                            ("cancelled_by_customer", "cancelled_by_customer"),
+                            ("cancelled_by_cooker", "cancelled_by_cooker"),
+                            ("delivered", "delivered"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "cooker",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="orders_events",
+                        to="core_app.cookermodel",
+                    ),
+                ),
+                (
+                    "delivery_man",
+                    models.ForeignKey(
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="orders_events",
+                        to="core_app.delivermodel",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="events",
+                        to="core_app.ordermodel",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "orders_events",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="ordereventmodel",
+            index=models.Index(
+                fields=["order", "created"], name="orders_even_order_i_027797_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ordereventmodel",
+            index=models.Index(
+                fields=["cooker", "created"], name="orders_even_cooker__bf2a47_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ordereventmodel",
+            index=models.Index(
+                fields=["delivery_man", "created"],
+                name="orders_even_deliver_1ef285_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.1 on 2026-10-19 15:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_app", "0007_ordereventmodel_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ordermodel",
+            index=models.Index(
+                fields=["delivery_man", "status", "created"],
+                name="orders_deliver_c60f11_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 4.1 on 2026-10-19 15:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def compute_cooker_daily_rollups(apps, schema_editor):
+    CookerDailyRollupModel = apps.get_model("core_app", "CookerDailyRollupModel")
+    OrderModel = apps.get_model("core_app", "OrderModel")
+    OrderDishItemModel = apps.get_model("core_app", "OrderDishItemModel")
+    OrderDrinkItemModel = apps.get_model("core_app", "OrderDrinkItemModel")
+    dishes_total = (
+        OrderDishItemModel.objects.filter(order=OuterRef("pk"))
+        .order_by()
+        .values("order")
+        .annotate(total=Sum(F("dish__price") * F("dish_quantity")))
+        .values("total")
+    )
+    drinks_total = (
+        OrderDrinkItemModel.objects.filter(order=OuterRef("pk"))
+        .order_by()
+        .values("order")
+        .annotate(total=Sum(F("drink__price") * F("drink_quantity")))
+        .values("total")
+    )
+    rollups = (
+        OrderModel.objects.exclude(status="draft")
+        .annotate(
+            day=TruncDate("created"),
+            items_total=Coalesce(
+                Subquery(dishes_total, output_field=models.FloatField()), 0.0
+            )
+            + Coalesce(Subquery(drinks_total, output_field=models.FloatField()), 0.0),
+        )
+        .order_by()
+        .values("cooker_id", "day", "status")
+        .annotate(count=Count("id"), revenue=Sum("items_total"))
+    )
+    CookerDailyRollupModel.objects.bulk_create(
+        [CookerDailyRollupModel(**rollup) for rollup in rollups],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_app", "0008_ordermodel_orders_deliver_c60f11_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CookerDailyRollupModel",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("day", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("draft", "draft"),
+                            ("pending", "pending"),
+                            ("processing", "processing"),
+                            ("completed", "completed"),
+                            ("cancelled_by_customer", "cancelled_by_customer"),
+                            ("cancelled_by_cooker", "cancelled_by_cooker"),
+                            ("delivered", "delivered"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                ("revenue", models.FloatField(default=0.0)),
+                (
+                    "cooker",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_rollups",
+                        to="core_app.cookermodel",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "cookers_daily_rollups",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="cookerdailyrollupmodel",
+            constraint=models.UniqueConstraint(
+                fields=("cooker", "day", "status"), name="unique_cooker_day_status"
+            ),
+        ),
+        migrations.RunPython(
+            compute_cooker_daily_rollups,
+            migrations.RunPython.noop,
+        ),
+    ]
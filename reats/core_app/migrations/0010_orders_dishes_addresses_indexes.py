@@ -0,0 +1,73 @@
+# Generated by Django 4.1 on 2026-10-19 15:52
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently so that orders stay writable meanwhile
+    atomic = False
+
+    dependencies = [
+        ("core_app", "0009_cookerdailyrollupmodel"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="addressmodel",
+            index=models.Index(
+                condition=models.Q(("is_enabled", True)),
+                fields=["customer"],
+                name="addresses_customer_enabled_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="dishmodel",
+            index=models.Index(
+                fields=["cooker", "category", "is_enabled", "name"],
+                name="dishes_cooker_category_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="ordermodel",
+            index=models.Index(
+                fields=["cooker", "created"], name="orders_cooker_created_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="ordermodel",
+            index=models.Index(
+                fields=["customer", "-modified"], name="orders_customer_modified_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="ordermodel",
+            index=models.Index(
+                condition=models.Q(
+                    ("status__in", ["pending", "processing", "completed"])
+                ),
+                fields=["customer", "status", "-modified"],
+                name="orders_customer_active_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="ordermodel",
+            index=models.Index(
+                condition=models.Q(
+                    ("status__in", ["pending", "processing", "completed"])
+                ),
+                fields=["cooker", "status", "-modified"],
+                name="orders_cooker_active_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="ordermodel",
+            index=models.Index(
+                condition=models.Q(
+                    ("delivery_man__isnull", True), ("status", "completed")
+                ),
+                fields=["completed_date", "id"],
+                name="orders_to_dispatch_idx",
+            ),
+        ),
+    ]
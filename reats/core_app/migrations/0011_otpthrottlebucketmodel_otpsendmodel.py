@@ -0,0 +1,36 @@
+# Generated by Django 4.1 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_app", "0010_orders_dishes_addresses_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OtpSendModel",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("phone", models.CharField(max_length=17, unique=True)),
+                ("sent_date", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "otp_sends",
+            },
+        ),
+        migrations.CreateModel(
+            name="OtpThrottleBucketModel",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("key", models.CharField(max_length=64, unique=True)),
+                ("tokens", models.FloatField()),
+                ("updated", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "otp_throttle_buckets",
+            },
+        ),
+    ]
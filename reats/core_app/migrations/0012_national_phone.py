@@ -0,0 +1,51 @@
+# Generated by Django 4.1 on 2026-10-19 16:17
+
+import phonenumbers
+from django.conf import settings
+from django.db import migrations, models
+
+
+def compute_national_phones(apps, schema_editor):
+    for model_name in ("CookerModel", "CustomerModel", "DeliverModel"):
+        model = apps.get_model("core_app", model_name)
+        users = list(model.objects.only("id", "phone"))
+
+        for user in users:
+            try:
+                user.national_phone = phonenumbers.format_number(
+                    phonenumbers.parse(user.phone, settings.PHONE_REGION),
+                    phonenumbers.PhoneNumberFormat.NATIONAL,
+                ).replace(" ", "")
+            except phonenumbers.NumberParseException:
+                user.national_phone = ""
+
+        model.objects.bulk_update(users, ["national_phone"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_app", "0011_otpthrottlebucketmodel_otpsendmodel"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cookermodel",
+            name="national_phone",
+            field=models.CharField(blank=True, default="", max_length=17),
+        ),
+        migrations.AddField(
+            model_name="customermodel",
+            name="national_phone",
+            field=models.CharField(blank=True, default="", max_length=17),
+        ),
+        migrations.AddField(
+            model_name="delivermodel",
+            name="national_phone",
+            field=models.CharField(blank=True, default="", max_length=17),
+        ),
+        migrations.RunPython(
+            compute_national_phones,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.1 on 2026-10-19 17:21
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def compute_rating_aggregates(apps, schema_editor):
+    OrderModel = apps.get_model("core_app", "OrderModel")
+
+    for model_name, order_field in (
+        ("CookerModel", "cooker"),
+        ("DeliverModel", "delivery_man"),
+    ):
+        model = apps.get_model("core_app", model_name)
+        rated_orders = (
+            OrderModel.objects.filter(rating__gt=0, **{f"{order_field}__isnull": False})
+            .order_by()
+            .values(order_field)
+            .annotate(rating_sum=Sum("rating"), rating_count=Count("id"))
+        )
+        users = []
+
+        for row in rated_orders:
+            user = model(id=row[order_field])
+            user.rating_sum = row["rating_sum"]
+            user.rating_count = row["rating_count"]
+            user.grades = row["rating_sum"] / row["rating_count"]
+            users.append(user)
+
+        model.objects.bulk_update(
+            users,
+            ["rating_sum", "rating_count", "grades"]
+            if model_name == "DeliverModel"
+            else ["rating_sum", "rating_count"],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_app", "0012_national_phone"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cookermodel",
+            name="rating_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="cookermodel",
+            name="rating_sum",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name="delivermodel",
+            name="rating_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="delivermodel",
+            name="rating_sum",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.RunPython(
+            compute_rating_aggregates,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1 on 2026-10-19 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_app", "0013_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="otpsendmodel",
+            name="sent_date",
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="otpthrottlebucketmodel",
+            name="updated",
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
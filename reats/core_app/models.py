@@ -1,18 +1,34 @@
 from django.core.validators import MinLengthValidator, RegexValidator
+from django.db import IntegrityError, transaction
 from django.db.models import (
     CASCADE,
     AutoField,
+    BigAutoField,
     BooleanField,
     CharField,
+    DateField,
     DateTimeField,
+    F,
     FloatField,
     ForeignKey,
+    Index,
     IntegerField,
     Manager,
+    Model,
+    Q,
+    Sum,
     TextField,
+    UniqueConstraint,
 )
+from django.db.models.functions import Coalesce, Greatest, NullIf
+from django.db.models.signals import pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from phonenumbers.phonenumberutil import NumberParseException
 from utils.enums import OrderStatusEnum
 from utils.models import ReatsModel
+from utils.phones import parse_phone
+from utils.timeframe_stats_cache import invalidate_timeframe_stats
 
 
 class CookerModel(ReatsModel):
@@ -22,6 +38,7 @@ class CookerModel(ReatsModel):
     phone: CharField = CharField(
         unique=True, max_length=17, validators=[MinLengthValidator(10)]
     )
+    national_phone: CharField = CharField(max_length=17, blank=True, default="")
     postal_code: CharField = CharField(
         max_length=5,
         validators=[RegexValidator(regex=r"[0-9]{5}")],
@@ -36,15 +53,20 @@ class CookerModel(ReatsModel):
     street_number: CharField = CharField(max_length=10)
     town: CharField = CharField(max_length=100)
     address_complement: CharField = CharField(max_length=512, null=True)
+    latitude: FloatField = FloatField(null=True)
+    longitude: FloatField = FloatField(null=True)
     photo: CharField = CharField(
         max_length=512,
         default="cookers/1/profile_pics/default-profile-pic.jpg",
     )
     max_order_number: IntegerField = IntegerField(default=10)
+    in_flight_order_number: IntegerField = IntegerField(default=0)
     is_online: BooleanField = BooleanField(default=False)
     is_activated: BooleanField = BooleanField(default=False)
     acceptance_rate: FloatField = FloatField(default=100.0)
     last_acceptance_rate_update_date: DateTimeField = DateTimeField(null=True)
+    rating_sum: FloatField = FloatField(default=0.0)
+    rating_count: IntegerField = IntegerField(default=0)
 
     @property
     def full_address(self) -> str:
@@ -53,6 +75,14 @@ class CookerModel(ReatsModel):
 
         return f"{self.street_number} {self.street_name} {self.postal_code} {self.town}"
 
+    @property
+    def is_full(self) -> bool:
+        return self.in_flight_order_number >= self.max_order_number
+
+    @property
+    def rating(self) -> float:
+        return self.rating_sum / self.rating_count if self.rating_count else 0.0
+
     class Meta:
         db_table = "cookers"
 
@@ -75,6 +105,7 @@ class DeliverModel(ReatsModel):
         max_length=17,
         validators=[MinLengthValidator(10)],
     )
+    national_phone: CharField = CharField(max_length=17, blank=True, default="")
     photo: CharField = CharField(
         max_length=512,
         default="delivers/1/profile_pics/default-profile-pic.jpg",
@@ -94,7 +125,11 @@ class DeliverModel(ReatsModel):
         max_length=14,
     )
     is_online: BooleanField = BooleanField(default=False)
-    grades: FloatField = FloatField(default=0.0)
+    grades: FloatField = FloatField(default=0.0)  # rating_sum / rating_count
+    rating_sum: FloatField = FloatField(default=0.0)
+    rating_count: IntegerField = IntegerField(default=0)
+    latitude: FloatField = FloatField(null=True)
+    longitude: FloatField = FloatField(null=True)
 
     class Meta:
         db_table = "delivers"
@@ -123,6 +158,12 @@ class DishModel(ReatsModel):
 
     class Meta:
         db_table = "dishes"
+        indexes = [
+            Index(
+                fields=["cooker", "category", "is_enabled", "name"],
+                name="dishes_cooker_category_idx",
+            ),
+        ]
 
 
 class DrinkModel(ReatsModel):
@@ -155,6 +196,7 @@ class CustomerModel(ReatsModel):
     phone: CharField = CharField(
         unique=True, max_length=17, validators=[MinLengthValidator(10)]
     )
+    national_phone: CharField = CharField(max_length=17, blank=True, default="")
     photo: CharField = CharField(
         max_length=512,
         default="customers/1/profile_pics/default-profile-pic.jpg",
@@ -168,6 +210,17 @@ class CustomerModel(ReatsModel):
     objects: Manager = Manager()  # For linting purposes
 
 
+@receiver(pre_save, sender=CookerModel)
+@receiver(pre_save, sender=CustomerModel)
+@receiver(pre_save, sender=DeliverModel)
+def set_national_phone(sender, instance, **kwargs):
+    # Profiles are rendered with the national form, parsed here once per save
+    try:
+        instance.national_phone = parse_phone(instance.phone)[1]
+    except NumberParseException:
+        instance.national_phone = ""
+
+
 class AddressModel(ReatsModel):
     id: AutoField = AutoField(primary_key=True)
     street_name: CharField = CharField(max_length=100)
@@ -182,6 +235,13 @@ class AddressModel(ReatsModel):
 
     class Meta:
         db_table = "addresses"
+        indexes = [
+            Index(
+                fields=["customer"],
+                condition=Q(is_enabled=True),
+                name="addresses_customer_enabled_idx",
+            ),
+        ]
 
     def __str__(self):
         if self.address_complement:
@@ -193,6 +253,30 @@ class AddressModel(ReatsModel):
 class OrderModel(ReatsModel):
     class Meta:
         db_table = "orders"
+        indexes = [
+            Index(fields=["delivery_man", "status", "created"]),
+            Index(fields=["cooker", "created"], name="orders_cooker_created_idx"),
+            Index(
+                fields=["customer", "-modified"], name="orders_customer_modified_idx"
+            ),
+            # Orders lists only ever show orders which are still in flight
+            Index(
+                fields=["customer", "status", "-modified"],
+                condition=Q(status__in=["pending", "processing", "completed"]),
+                name="orders_customer_active_idx",
+            ),
+            Index(
+                fields=["cooker", "status", "-modified"],
+                condition=Q(status__in=["pending", "processing", "completed"]),
+                name="orders_cooker_active_idx",
+            ),
+            # Completed orders waiting for a delivery man, see utils.dispatcher
+            Index(
+                fields=["completed_date", "id"],
+                condition=Q(status="completed", delivery_man__isnull=True),
+                name="orders_to_dispatch_idx",
+            ),
+        ]
 
     objects: Manager = Manager()  # For linting purposes
 
@@ -242,6 +326,76 @@ class OrderModel(ReatsModel):
     rating: FloatField = FloatField(default=0.0)
     comment: TextField = TextField(null=True, blank=True)
 
+    _persisted_status: str | None = None
+    _persisted_rating: float | None = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._persisted_status = instance.__dict__.get("status")
+        instance._persisted_rating = instance.__dict__.get("rating")
+
+        return instance
+
+    def save(self, *args, **kwargs) -> None:
+        update_fields = kwargs.get("update_fields")
+        previous_status = self._persisted_status
+        previous_rating = self._persisted_rating
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if previous_status != self.status and (
+                update_fields is None or "status" in update_fields
+            ):
+                CookerDailyRollupModel.move_order(self, previous_status, self.status)
+
+            if previous_rating != self.rating and (
+                update_fields is None or "rating" in update_fields
+            ):
+                self.move_rating(previous_rating, self.rating)
+
+        self._persisted_status = self.status
+        self._persisted_rating = self.rating
+
+    def move_rating(self, old_rating: float | None, new_rating: float | None) -> None:
+        """
+        Update the rating sums and counts of the order cooker and delivery man,
+        a 0.0 rating being no rating
+        """
+        rating_delta: float = (new_rating or 0.0) - (old_rating or 0.0)
+        count_delta: int = bool(new_rating) - bool(old_rating)
+
+        if not rating_delta and not count_delta:
+            return
+
+        CookerModel.objects.filter(pk=self.cooker_id).update(
+            rating_sum=F("rating_sum") + rating_delta,
+            rating_count=F("rating_count") + count_delta,
+        )
+
+        if self.delivery_man_id:
+            # Right-hand sides read the row before the update
+            DeliverModel.objects.filter(pk=self.delivery_man_id).update(
+                rating_sum=F("rating_sum") + rating_delta,
+                rating_count=F("rating_count") + count_delta,
+                grades=Coalesce(
+                    (F("rating_sum") + rating_delta)
+                    / NullIf(F("rating_count") + count_delta, 0),
+                    0.0,
+                ),
+            )
+
+    def get_items_total_amount(self) -> float:
+        dishes_total = self.dishes_items.aggregate(
+            total=Sum(F("dish__price") * F("dish_quantity"))
+        )["total"]
+        drinks_total = self.drinks_items.aggregate(
+            total=Sum(F("drink__price") * F("drink_quantity"))
+        )["total"]
+
+        return round((dishes_total or 0.0) + (drinks_total or 0.0), 2)
+
     def get_state_map(self) -> dict:
         return {
             OrderStatusEnum.DRAFT: DraftState(),
@@ -316,21 +470,215 @@ class OrderDrinkItemModel(ReatsModel):
     objects: Manager = Manager()  # For linting purposes
 
 
+class OrderEventModel(Model):
+    """
+    Append-only log of order status transitions, one compact row per transition.
+    """
+
+    id: BigAutoField = BigAutoField(primary_key=True)
+    order: ForeignKey = ForeignKey(
+        OrderModel,
+        on_delete=CASCADE,
+        related_name="events",
+        db_index=False,
+    )
+    cooker: ForeignKey = ForeignKey(
+        CookerModel,
+        on_delete=CASCADE,
+        related_name="orders_events",
+        db_index=False,
+    )
+    delivery_man: ForeignKey = ForeignKey(
+        DeliverModel,
+        on_delete=CASCADE,
+        related_name="orders_events",
+        null=True,
+        db_index=False,
+    )
+    previous_status: CharField = CharField(
+        max_length=30,
+        choices=OrderStatusEnum.choices(),
+    )
+    status: CharField = CharField(max_length=30, choices=OrderStatusEnum.choices())
+    created: DateTimeField = DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "orders_events"
+        indexes = [
+            Index(fields=["order", "created"]),
+            Index(fields=["cooker", "created"]),
+            Index(fields=["delivery_man", "created"]),
+        ]
+
+    objects: Manager = Manager()  # For linting purposes
+
+    def save(self, *args, **kwargs) -> None:
+        if not self._state.adding:
+            raise ValueError("Order events are append-only.")
+
+        super().save(*args, **kwargs)
+
+
+class CookerDailyRollupModel(Model):
+    """
+    Number of orders and items revenue per cooker, creation day and current status.
+
+    Rows are kept up to date by OrderModel.save and order deletions, draft
+    orders are never counted.
+    """
+
+    id: BigAutoField = BigAutoField(primary_key=True)
+    cooker: ForeignKey = ForeignKey(
+        CookerModel,
+        on_delete=CASCADE,
+        related_name="daily_rollups",
+        db_index=False,
+    )
+    day: DateField = DateField()
+    status: CharField = CharField(max_length=30, choices=OrderStatusEnum.choices())
+    count: IntegerField = IntegerField(default=0)
+    revenue: FloatField = FloatField(default=0.0)
+
+    class Meta:
+        db_table = "cookers_daily_rollups"
+        constraints = [
+            UniqueConstraint(
+                fields=["cooker", "day", "status"],
+                name="unique_cooker_day_status",
+            ),
+        ]
+
+    objects: Manager = Manager()  # For linting purposes
+
+    @classmethod
+    def move_order(
+        cls,
+        order: OrderModel,
+        old_status: str | None,
+        new_status: str | None,
+    ) -> None:
+        uncounted_statuses = (None, OrderStatusEnum.DRAFT)
+
+        if old_status == new_status or (
+            old_status in uncounted_statuses and new_status in uncounted_statuses
+        ):
+            return
+
+        revenue: float = order.get_items_total_amount()
+        day = timezone.localdate(order.created)
+
+        # Buckets of the past days may be cached, see utils.timeframe_stats
+        if day < timezone.localdate():
+            invalidate_timeframe_stats(f"cooker:{order.cooker_id}")
+
+        if old_status not in uncounted_statuses:
+            cls.objects.filter(
+                cooker_id=order.cooker_id,
+                day=day,
+                status=old_status,
+            ).update(count=F("count") - 1, revenue=F("revenue") - revenue)
+
+        if new_status in uncounted_statuses:
+            return
+
+        rollup_filter = {"cooker_id": order.cooker_id, "day": day, "status": new_status}
+
+        if cls.objects.filter(**rollup_filter).update(
+            count=F("count") + 1, revenue=F("revenue") + revenue
+        ):
+            return
+
+        try:
+            with transaction.atomic():
+                cls.objects.create(**rollup_filter, count=1, revenue=revenue)
+        except IntegrityError:
+            # Created concurrently by another transaction
+            cls.objects.filter(**rollup_filter).update(
+                count=F("count") + 1, revenue=F("revenue") + revenue
+            )
+
+
+@receiver(pre_delete, sender=OrderModel)
+def remove_deleted_order_from_daily_rollups(sender, instance: OrderModel, **kwargs):
+    CookerDailyRollupModel.move_order(instance, instance._persisted_status, None)
+
+
+@receiver(pre_delete, sender=OrderModel)
+def remove_deleted_order_from_deliver_stats(sender, instance: OrderModel, **kwargs):
+    if instance.delivery_man_id is not None and instance.delivered_date is not None:
+        invalidate_timeframe_stats(f"deliver:{instance.delivery_man_id}")
+
+
+@receiver(pre_delete, sender=OrderModel)
+def remove_deleted_order_from_ratings(sender, instance: OrderModel, **kwargs):
+    instance.move_rating(instance._persisted_rating, None)
+
+
+@receiver(pre_delete, sender=OrderModel)
+def remove_deleted_order_from_in_flight_orders(sender, instance: OrderModel, **kwargs):
+    OrderState.update_cooker_in_flight_order_number(
+        instance, instance._persisted_status, None
+    )
+
+
 class OrderState:
     def can_transition_to(self, new_state):
         raise NotImplementedError("Subclasses must implement this method.")
 
     def transition_to(self, order: OrderModel, new_state):
         if self.can_transition_to(new_state):
-            order.status = order.get_reverse_state_map().get(
-                new_state.__class__.__name__
-            )
-            order.save()
+            old_status = order.status
+            new_status = order.get_reverse_state_map().get(new_state.__class__.__name__)
+
+            with transaction.atomic():
+                # Raises before the order is saved when the cooker is full
+                self.update_cooker_in_flight_order_number(order, old_status, new_status)
+                order.status = new_status
+                order.save()
+                OrderEventModel.objects.create(
+                    order=order,
+                    cooker_id=order.cooker_id,
+                    delivery_man_id=order.delivery_man_id,
+                    previous_status=old_status,
+                    status=order.status,
+                )
         else:
             raise ValueError(
                 f"Cannot transition from {self.__class__.__name__} to {new_state.__class__.__name__}"
             )
 
+    @staticmethod
+    def update_cooker_in_flight_order_number(
+        order: OrderModel,
+        old_status: str | None,
+        new_status: str | None,
+    ) -> None:
+        """
+        Count the order in the in flight orders of its cooker, or not anymore
+
+        :raises ValueError: when the cooker cannot take more orders, checked
+            with the increment so that concurrent orders never go past
+            max_order_number
+        """
+        in_flight_statuses = OrderStatusEnum.in_flight_statuses()
+        delta = int(new_status in in_flight_statuses) - int(
+            old_status in in_flight_statuses
+        )
+
+        if delta > 0:
+            is_updated = CookerModel.objects.filter(
+                pk=order.cooker_id,
+                in_flight_order_number__lt=F("max_order_number"),
+            ).update(in_flight_order_number=F("in_flight_order_number") + delta)
+
+            if not is_updated:
+                raise ValueError("This cooker cannot take more orders for now.")
+
+        elif delta < 0:
+            CookerModel.objects.filter(pk=order.cooker_id).update(
+                in_flight_order_number=Greatest(F("in_flight_order_number") + delta, 0)
+            )
+
 
 class DraftState(OrderState):
     def can_transition_to(self, new_state: OrderState):
@@ -427,3 +775,35 @@ class DrinkRatingModel(RatingsModel):
             "customer",
             "drink",
         )  # One customer can rate a drink only once
+
+
+class OtpThrottleBucketModel(Model):
+    """
+    Token bucket limiting the OTP requests of a phone number or an IP address.
+    """
+
+    id: BigAutoField = BigAutoField(primary_key=True)
+    key: CharField = CharField(max_length=64, unique=True)  # Ex: "phone:+33600000000"
+    tokens: FloatField = FloatField()
+    updated: DateTimeField = DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "otp_throttle_buckets"
+
+    objects: Manager = Manager()  # For linting purposes
+
+
+class OtpSendModel(Model):
+    """
+    Last OTP successfully sent to a phone number, used to skip duplicated
+    sends while this OTP is still valid.
+    """
+
+    id: BigAutoField = BigAutoField(primary_key=True)
+    phone: CharField = CharField(max_length=17, unique=True)
+    sent_date: DateTimeField = DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "otp_sends"
+
+    objects: Manager = Manager()  # For linting purposes
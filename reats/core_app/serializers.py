@@ -10,6 +10,7 @@ from .models import (
     DrinkRatingModel,
     OrderDishItemModel,
     OrderDrinkItemModel,
+    OrderEventModel,
     OrderModel,
 )
 
@@ -100,3 +101,9 @@ class OrderRatingSerializer(ModelSerializer):
         instance.save()
 
         return instance
+
+
+class OrderEventGETSerializer(ModelSerializer):
+    class Meta:
+        model = OrderEventModel
+        fields = ("previous_status", "status", "created")
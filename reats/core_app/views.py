@@ -1,8 +1,21 @@
 import os
 
+from django.conf import settings
 from django.db import connection
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponseForbidden,
+    StreamingHttpResponse,
+)
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from utils.common import photo_deletes, photo_uploads
+from utils.postgresql_pool.base import get_pools_metrics
+from utils.storage.base import storage
+from utils.storage.filesystem import FileSystemStorage, InvalidKey
+
+STORAGE_OBJECT_CHUNK_SIZE = 64 * 1024  # in bytes
 
 
 class HealthCheckView(APIView):
@@ -19,10 +32,51 @@ class HealthCheckView(APIView):
         except Exception:
             db_status = "Unhealthy"
 
-        return Response(
-            {
-                "status": f"Everything seems fine on {os.environ['ENV']}",
-                "database": db_status,
-            },
-            status=200,
-        )
+        data = {
+            "status": f"Everything seems fine on {os.environ['ENV']}",
+            "database": db_status,
+        }
+
+        if settings.DB_POOL_MAX_SIZE:
+            data["database_pools"] = get_pools_metrics()
+
+        data["photo_transfers"] = {
+            "uploads": photo_uploads.get_metrics(),
+            "deletes": photo_deletes.get_metrics(),
+        }
+
+        return Response(data, status=200)
+
+
+def serve_storage_object(request: HttpRequest, key: str) -> StreamingHttpResponse:
+    """
+    What S3 answers to a presigned URL, for objects of FileSystemStorage
+    """
+    file_system_storage = storage.get_client()  # type: ignore
+
+    if not isinstance(file_system_storage, FileSystemStorage):
+        raise Http404
+
+    if not file_system_storage.is_signature_valid(
+        key, request.GET.get("Expires", ""), request.GET.get("Signature", "")
+    ):
+        return HttpResponseForbidden("AccessDenied")
+
+    try:
+        metadata = file_system_storage.get_metadata(key)
+    except (FileNotFoundError, InvalidKey):
+        raise Http404("NoSuchKey")
+
+    def read_chunks():
+        with file_system_storage.open(key) as content:
+            for start in range(0, len(content), STORAGE_OBJECT_CHUNK_SIZE):
+                end = start + STORAGE_OBJECT_CHUNK_SIZE
+                yield content[start:end]
+
+    response = StreamingHttpResponse(
+        read_chunks(), content_type=metadata["ContentType"]
+    )
+    response["Content-Length"] = metadata["ContentLength"]
+    response["Cache-Control"] = metadata["CacheControl"]
+
+    return response
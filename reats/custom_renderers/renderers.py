@@ -1,12 +1,10 @@
 import json
 import logging
 
-import phonenumbers
 from core_app.models import CookerModel, CustomerModel
-from django.conf import settings
 from rest_framework import status
 from rest_framework.renderers import JSONRenderer
-from utils.common import create_stripe_ephemeral_key, get_pre_signed_url
+from utils.common import create_stripe_ephemeral_key, get_photo_url
 from utils.enums import OrderStatusEnum
 
 logger = logging.getLogger("watchtower-logger")
@@ -40,16 +38,11 @@ class CookerCustomRendererWithData(JSONRenderer):
                     "personal_infos_section": {
                         "title": "personal_infos",
                         "data": {
-                            "photo": get_pre_signed_url(data["photo"]),
+                            "photo": get_photo_url(data["photo"], "medium"),
                             "siret": data["siret"],
                             "firstname": data["firstname"],
                             "lastname": data["lastname"],
-                            "phone": phonenumbers.format_number(
-                                phonenumbers.parse(
-                                    data["phone"], settings.PHONE_REGION
-                                ),
-                                phonenumbers.PhoneNumberFormat.NATIONAL,
-                            ).replace(" ", ""),
+                            "phone": data["national_phone"],
                             "max_order_number": str(data["max_order_number"]),
                             "is_online": data["is_online"],
                             "acceptance_rate": data["acceptance_rate"],
@@ -111,15 +104,10 @@ class CustomerCustomRendererWithData(JSONRenderer):
                     "personal_infos_section": {
                         "title": "personal_infos",
                         "data": {
-                            "photo": get_pre_signed_url(data["photo"]),
+                            "photo": get_photo_url(data["photo"], "medium"),
                             "firstname": data["firstname"],
                             "lastname": data["lastname"],
-                            "phone": phonenumbers.format_number(
-                                phonenumbers.parse(
-                                    data["phone"], settings.PHONE_REGION
-                                ),
-                                phonenumbers.PhoneNumberFormat.NATIONAL,
-                            ).replace(" ", ""),
+                            "phone": data["national_phone"],
                         },
                     },
                 },
@@ -168,19 +156,14 @@ class DeliverCustomRendererWithData(JSONRenderer):
                     "personal_infos_section": {
                         "title": "personal_infos",
                         "data": {
-                            "photo": get_pre_signed_url(data["photo"]),
+                            "photo": get_photo_url(data["photo"], "medium"),
                             "firstname": data["firstname"],
                             "lastname": data["lastname"],
                             "delivery_vehicle": data["delivery_vehicle"],
                             "town": data["town"],
                             "delivery_radius": data["delivery_radius"],
                             "siret": data["siret"],
-                            "phone": phonenumbers.format_number(
-                                phonenumbers.parse(
-                                    data["phone"], settings.PHONE_REGION
-                                ),
-                                phonenumbers.PhoneNumberFormat.NATIONAL,
-                            ).replace(" ", ""),
+                            "phone": data["national_phone"],
                         },
                     },
                 },
@@ -232,7 +215,7 @@ class CustomRendererWithData(JSONRenderer):
                     "data": [
                         {
                             k: (
-                                get_pre_signed_url(v)
+                                get_photo_url(v, "medium")
                                 if k == "photo"
                                 else (str(v) if not isinstance(v, bool) else v)
                             )
@@ -328,6 +311,30 @@ class CustomRendererWithoutData(JSONRenderer):
         return super().render(response)
 
 
+class RatingsCustomRendererWithData(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        status_code = renderer_context["response"].status_code
+        response = {
+            "ok": True,
+            "status_code": status_code,
+        }
+
+        if status_code == status.HTTP_201_CREATED:
+            response["data"] = data["data"]
+
+        if not str(status_code).startswith("2"):
+            response["ok"] = False
+
+        if status_code == status.HTTP_401_UNAUTHORIZED:
+            try:
+                response["error_code"] = data["detail"].code
+            except KeyError:
+                pass
+
+        logger.info(response)
+        return super().render(response)
+
+
 class AddressCustomRendererWithData(JSONRenderer):
     def render(self, data, accepted_media_type=None, renderer_context=None):
         status_code = renderer_context["response"].status_code
@@ -411,12 +418,12 @@ class OrderCustomRendererWithData(JSONRenderer):
             if isinstance(data, list):
                 for order_item in data:
                     for order_dish_item in order_item["dishes_items"]:
-                        order_dish_item["dish"]["photo"] = get_pre_signed_url(
-                            order_dish_item["dish"]["photo"]
+                        order_dish_item["dish"]["photo"] = get_photo_url(
+                            order_dish_item["dish"]["photo"], "thumbnail"
                         )
                     for order_drink_item in order_item["drinks_items"]:
-                        order_drink_item["drink"]["photo"] = get_pre_signed_url(
-                            order_drink_item["drink"]["photo"]
+                        order_drink_item["drink"]["photo"] = get_photo_url(
+                            order_drink_item["drink"]["photo"], "thumbnail"
                         )
                 response = {
                     "ok": True,
@@ -483,9 +490,7 @@ class CustomJSONRendererWithData(JSONRenderer):
     def render(self, data, accepted_media_type=None, renderer_context=None):
         logger.info(data)
         status_code = renderer_context["response"].status_code
-
-        if status_code == status.HTTP_200_OK:
-            response = data
+        response = data  # Built by the view, errors included
 
         if status_code == status.HTTP_401_UNAUTHORIZED:
             response = {
@@ -1,12 +1,15 @@
 import ast
 from datetime import datetime, timedelta
+from typing import Iterable, Optional, Type, Union
 
 import pytz
 from core_app.models import (
     AddressModel,
+    CookerModel,
     CustomerModel,
     DishModel,
     DishRatingModel,
+    DrinkModel,
     DrinkRatingModel,
     OrderDishItemModel,
     OrderDrinkItemModel,
@@ -15,6 +18,7 @@ from core_app.models import (
 from core_app.serializers import OrderDishItemGETSerializer, OrderDrinkItemGETSerializer
 from django.conf import settings
 from django.db import transaction
+from django.db.models import Exists, OuterRef
 from phonenumbers.phonenumberutil import NumberParseException
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
@@ -24,7 +28,7 @@ from utils.common import compute_order_items_total_amount, format_phone
 class CustomerSerializer(ModelSerializer):
     class Meta:
         model = CustomerModel
-        exclude = ("photo",)
+        exclude = ("photo", "national_phone")
 
     def validate_phone(self, phone):
         try:
@@ -118,33 +122,11 @@ class OrderSerializer(ModelSerializer):
         data_to_validate["address"] = data.get("addressID")
         data_to_validate["cooker"] = data.get("cookerID")
 
-        # Dealing with delivery datetime
-        if data.get("date") and data.get("time"):
-            delivery_datetime_string = f"{data.get('date')} {data.get('time')}"
-            delivery_datetime_object_naive = datetime.strptime(
-                delivery_datetime_string, "%m/%d/%Y %H:%M:%S"
-            )
-            local_timezone = pytz.timezone("Europe/Paris")
-            local_delivery_datetime = local_timezone.localize(
-                delivery_datetime_object_naive
-            )
-            utc_delivery_datetime = local_delivery_datetime.astimezone(pytz.UTC)
-
-            # Check if utc_delivery_datetime is in the past and return a 400 response
-            if utc_delivery_datetime < datetime.now(pytz.UTC):
-                raise serializers.ValidationError(
-                    {"date": "Scheduled delivery date must be in the future"},
-                )
-
-            # Check if utc_delivery_datetime is at least one hour in the future
-            if utc_delivery_datetime < datetime.now(pytz.UTC) + timedelta(hours=1):
-                raise serializers.ValidationError(
-                    {
-                        "date": "Scheduled delivery date must be at least one hour in the future"
-                    },
-                )
-
-            data_to_validate["scheduled_delivery_date"] = utc_delivery_datetime
+        scheduled_delivery_date = self.get_scheduled_delivery_date(
+            data.get("date"), data.get("time")
+        )
+        if scheduled_delivery_date is not None:
+            data_to_validate["scheduled_delivery_date"] = scheduled_delivery_date
 
         # We extract the dishes items from the request
         clean_order_dishes_items = []
@@ -177,18 +159,73 @@ class OrderSerializer(ModelSerializer):
 
         return super().to_internal_value(data_to_validate)
 
+    def validate(self, attrs: dict) -> dict:
+        cooker: CookerModel = attrs["cooker"]
+
+        if self.instance is None and cooker.is_full:
+            raise serializers.ValidationError(
+                {"cooker": "This cooker cannot take more orders for now."}
+            )
+
+        return attrs
+
+    def get_scheduled_delivery_date(
+        self,
+        date: Union[str, None],
+        time: Union[str, None],
+    ) -> Union[datetime, None]:
+        if not date or not time:
+            return None
+
+        delivery_datetime_string = f"{date} {time}"
+        try:
+            delivery_datetime_object_naive = datetime.strptime(
+                delivery_datetime_string, "%m/%d/%Y %H:%M:%S"
+            )
+        except ValueError:
+            raise serializers.ValidationError(
+                {"date": "Expected date format is %m/%d/%Y and time format %H:%M:%S"},
+            )
+        local_timezone = pytz.timezone("Europe/Paris")
+        local_delivery_datetime = local_timezone.localize(
+            delivery_datetime_object_naive
+        )
+        utc_delivery_datetime = local_delivery_datetime.astimezone(pytz.UTC)
+
+        # Check if utc_delivery_datetime is in the past and return a 400 response
+        if utc_delivery_datetime < datetime.now(pytz.UTC):
+            raise serializers.ValidationError(
+                {"date": "Scheduled delivery date must be in the future"},
+            )
+
+        # Check if utc_delivery_datetime is at least one hour in the future
+        if utc_delivery_datetime < datetime.now(pytz.UTC) + timedelta(hours=1):
+            raise serializers.ValidationError(
+                {
+                    "date": "Scheduled delivery date must be at least one hour in the future"
+                },
+            )
+
+        return utc_delivery_datetime
+
     def create(self, validated_data: dict):
         order_dishes_items_data = validated_data.pop("dishes_items")
-        order_drinks_items_data = validated_data.pop("drinks_items")
+        order_drinks_items_data = validated_data.pop("drinks_items", [])
 
         with transaction.atomic():
             order = OrderModel.objects.create(**validated_data)
-
-            for dish_item_data in order_dishes_items_data:
-                OrderDishItemModel.objects.create(order=order, **dish_item_data)
-
-            for drink_item_data in order_drinks_items_data:
-                OrderDrinkItemModel.objects.create(order=order, **drink_item_data)
+            OrderDishItemModel.objects.bulk_create(
+                [
+                    OrderDishItemModel(order=order, **dish_item_data)
+                    for dish_item_data in order_dishes_items_data
+                ]
+            )
+            OrderDrinkItemModel.objects.bulk_create(
+                [
+                    OrderDrinkItemModel(order=order, **drink_item_data)
+                    for drink_item_data in order_drinks_items_data
+                ]
+            )
 
         return order
 
@@ -213,12 +250,208 @@ class OrderSerializer(ModelSerializer):
         return instance
 
 
+class StrictSerializerMixin:
+    """Reject any payload key which is not a declared field."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            unexpected_fields = sorted(set(data) - set(self.fields))  # type: ignore
+            if unexpected_fields:
+                raise serializers.ValidationError(
+                    {field: "Unexpected field." for field in unexpected_fields}
+                )
+
+        return super().to_internal_value(data)  # type: ignore
+
+
+class OrderDishItemJSONSerializer(StrictSerializerMixin, serializers.Serializer):
+    dishID = serializers.IntegerField(min_value=1)
+    dishOrderedQuantity = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.ORDER_ITEM_MAX_QUANTITY,
+    )
+
+
+class OrderDrinkItemJSONSerializer(StrictSerializerMixin, serializers.Serializer):
+    drinkID = serializers.IntegerField(min_value=1)
+    drinkOrderedQuantity = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.ORDER_ITEM_MAX_QUANTITY,
+    )
+
+
+class OrderJSONPayloadSerializer(StrictSerializerMixin, serializers.Serializer):
+    """Shape of the JSON body accepted by OrderJSONSerializer."""
+
+    customerID = serializers.IntegerField()
+    cookerID = serializers.IntegerField()
+    addressID = serializers.IntegerField(required=False, allow_null=True)
+    date = serializers.CharField(required=False)
+    time = serializers.CharField(required=False)
+    dishes_items = serializers.ListField(
+        child=OrderDishItemJSONSerializer(),
+        min_length=1,
+        max_length=settings.ORDER_MAX_ITEMS,
+    )
+    drinks_items = serializers.ListField(
+        child=OrderDrinkItemJSONSerializer(),
+        required=False,
+        max_length=settings.ORDER_MAX_ITEMS,
+    )
+
+
+class OrderJSONSerializer(OrderSerializer):
+    """
+    Order creation from a JSON body.
+
+    Items are validated against OrderJSONPayloadSerializer then resolved with
+    a single id__in query per model instead of one lookup per item.
+    """
+
+    dishes_items = OrderDishItemSerializer(many=True, read_only=True)
+    drinks_items = OrderDrinkItemSerializer(many=True, read_only=True)
+
+    def to_internal_value(self, data):
+        payload_serializer = OrderJSONPayloadSerializer(data=data)
+        payload_serializer.is_valid(raise_exception=True)
+        payload: dict = payload_serializer.validated_data
+
+        data_to_validate = {
+            "customer": payload["customerID"],
+            "address": payload.get("addressID"),
+            "cooker": payload["cookerID"],
+        }
+        scheduled_delivery_date = self.get_scheduled_delivery_date(
+            payload.get("date"), payload.get("time")
+        )
+        if scheduled_delivery_date is not None:
+            data_to_validate["scheduled_delivery_date"] = scheduled_delivery_date
+
+        # Skip OrderSerializer.to_internal_value which reads multipart fields
+        validated_data = super(OrderSerializer, self).to_internal_value(
+            data_to_validate
+        )
+        validated_data["dishes_items"] = self._resolve_items(
+            DishModel,
+            validated_data["cooker"],
+            payload["dishes_items"],
+            "dishes_items",
+            ("dishID", "dishOrderedQuantity"),
+            ("dish", "dish_quantity"),
+        )
+        validated_data["drinks_items"] = self._resolve_items(
+            DrinkModel,
+            validated_data["cooker"],
+            payload.get("drinks_items", []),
+            "drinks_items",
+            ("drinkID", "drinkOrderedQuantity"),
+            ("drink", "drink_quantity"),
+        )
+
+        return validated_data
+
+    def _resolve_items(
+        self,
+        model: Type[Union[DishModel, DrinkModel]],
+        cooker: CookerModel,
+        items: list[dict],
+        field_name: str,
+        payload_keys: tuple[str, str],
+        model_keys: tuple[str, str],
+    ) -> list[dict]:
+        payload_id_key, payload_quantity_key = payload_keys
+        model_id_key, model_quantity_key = model_keys
+        items_ids = [item[payload_id_key] for item in items]
+
+        if len(items_ids) != len(set(items_ids)):
+            raise serializers.ValidationError({field_name: "Duplicated items."})
+
+        instances: dict = (
+            model.objects.filter(cooker=cooker, is_enabled=True)
+            .select_related("cooker")
+            .in_bulk(items_ids)
+        )
+        unknown_ids = [item_id for item_id in items_ids if item_id not in instances]
+
+        if unknown_ids:
+            raise serializers.ValidationError(
+                {field_name: f"Unknown or unavailable items {unknown_ids}."}
+            )
+
+        return [
+            {
+                model_id_key: instances[item[payload_id_key]],
+                model_quantity_key: item[payload_quantity_key],
+            }
+            for item in items
+        ]
+
+
 class DishCountriesGETSerializer(serializers.ModelSerializer):
     class Meta:
         model = DishModel
         fields = ("country",)
 
 
+def upsert_ratings(
+    rating_model: Type[Union[DishRatingModel, DrinkRatingModel]],
+    rated_field: str,
+    customer_id: int,
+    items_ratings: Iterable[tuple[int, float, Optional[str]]],
+) -> list[dict]:
+    """
+    Create or update the customer ratings of dishes or drinks in one INSERT ...
+    ON CONFLICT DO UPDATE, the last rating of an item sent twice winning
+
+    :return: the outcome of each item, created, updated or not_found
+    """
+    ratings = {item_id: (rating, comment) for item_id, rating, comment in items_ratings}
+    rated_model = rating_model._meta.get_field(rated_field).related_model
+    # Missing items would fail the whole INSERT on their foreign key
+    is_rated_by_item_id: dict[int, bool] = dict(
+        rated_model.objects.filter(pk__in=ratings)
+        .annotate(
+            is_rated=Exists(
+                rating_model.objects.filter(
+                    customer_id=customer_id, **{rated_field: OuterRef("pk")}
+                )
+            )
+        )
+        .values_list("pk", "is_rated")
+    )
+
+    rating_model.objects.bulk_create(
+        [
+            rating_model(
+                customer_id=customer_id,
+                rating=rating,
+                comment=comment,
+                **{f"{rated_field}_id": item_id},
+            )
+            for item_id, (rating, comment) in ratings.items()
+            if item_id in is_rated_by_item_id
+        ],
+        update_conflicts=True,
+        # Column names, Django 4.1 puts these names as is in ON CONFLICT
+        unique_fields=["customer_id", f"{rated_field}_id"],
+        update_fields=["rating", "comment", "modified"],
+    )
+
+    outcomes = []
+
+    for item_id in ratings:
+        if item_id not in is_rated_by_item_id:
+            outcome = "not_found"
+        elif is_rated_by_item_id[item_id]:
+            outcome = "updated"
+        else:
+            outcome = "created"
+
+        outcomes.append({f"{rated_field}_id": item_id, "outcome": outcome})
+
+    return outcomes
+
+
 class BulkDishRatingSerializer(serializers.Serializer):
     """Serializer for handling bulk dish ratings creation"""
 
@@ -234,7 +467,6 @@ class BulkDishRatingSerializer(serializers.Serializer):
         child=serializers.CharField(allow_blank=True),
         required=False,
     )
-    customer_id = serializers.IntegerField(required=True)
 
     def validate(self, attrs):
         dishes_ids = attrs.get("dishes_ids")
@@ -251,25 +483,17 @@ class BulkDishRatingSerializer(serializers.Serializer):
             )
         return attrs
 
-    def create(self, validated_data):
-        dishes_ids = validated_data["dishes_ids"]
-        ratings = validated_data["ratings"]
-        comments = validated_data.get("comments", [])
-        customer_id = validated_data["customer_id"]
-
-        dish_ratings = []
-        for idx, dish_id in enumerate(dishes_ids):
-            dish_ratings.append(
-                DishRatingModel(
-                    dish_id=dish_id,
-                    rating=ratings[idx],
-                    comment=comments[idx] if comments else None,
-                    customer_id=customer_id,
-                )
-            )
+    def create(self, validated_data) -> list[dict]:
+        comments = validated_data.get("comments") or [None] * len(
+            validated_data["dishes_ids"]
+        )
 
-        # Bulk create all dish ratings
-        return DishRatingModel.objects.bulk_create(dish_ratings)
+        return upsert_ratings(
+            DishRatingModel,
+            "dish",
+            validated_data["customer_id"],
+            zip(validated_data["dishes_ids"], validated_data["ratings"], comments),
+        )
 
 
 class BulkDrinkRatingSerializer(serializers.Serializer):
@@ -287,7 +511,6 @@ class BulkDrinkRatingSerializer(serializers.Serializer):
         child=serializers.CharField(allow_blank=True),
         required=False,
     )
-    customer_id = serializers.IntegerField(required=True)
 
     def validate(self, attrs):
         drink_ids = attrs.get("drink_ids")
@@ -304,22 +527,14 @@ class BulkDrinkRatingSerializer(serializers.Serializer):
             )
         return attrs
 
-    def create(self, validated_data):
-        drink_ids = validated_data["drink_ids"]
-        ratings = validated_data["ratings"]
-        comments = validated_data.get("comments", [])
-        customer_id = validated_data["customer_id"]
-
-        drink_ratings = []
-        for idx, drink_id in enumerate(drink_ids):
-            drink_ratings.append(
-                DrinkRatingModel(
-                    drink_id=drink_id,
-                    rating=ratings[idx],
-                    comment=comments[idx] if comments else None,
-                    customer_id=customer_id,
-                )
-            )
+    def create(self, validated_data) -> list[dict]:
+        comments = validated_data.get("comments") or [None] * len(
+            validated_data["drink_ids"]
+        )
 
-        # Bulk create all drink ratings
-        return DrinkRatingModel.objects.bulk_create(drink_ratings)
+        return upsert_ratings(
+            DrinkRatingModel,
+            "drink",
+            validated_data["customer_id"],
+            zip(validated_data["drink_ids"], validated_data["ratings"], comments),
+        )
@@ -4,6 +4,7 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Type, Union
 
+from asgiref.sync import sync_to_async
 from core_app.models import (
     AddressModel,
     CookerModel,
@@ -12,11 +13,13 @@ from core_app.models import (
     DishRatingModel,
     DrinkModel,
     DrinkRatingModel,
+    OrderEventModel,
     OrderModel,
 )
 from core_app.serializers import (
     DishGETSerializer,
     DrinkGETSerializer,
+    OrderEventGETSerializer,
     OrderPATCHSerializer,
     OrderRatingSerializer,
 )
@@ -27,9 +30,11 @@ from custom_renderers.renderers import (
     CustomRendererWithoutData,
     DishesCountriesCustomRendererWithData,
     OrderCustomRendererWithData,
+    RatingsCustomRendererWithData,
 )
 from django.conf import settings
 from django.db import IntegrityError
+from django.db.models import F
 from phonenumbers.phonenumberutil import NumberParseException
 from rest_framework import status
 from rest_framework.decorators import action
@@ -41,32 +46,40 @@ from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
 from rest_framework.serializers import BaseSerializer
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
+from utils.async_views import (
+    AsyncCreateModelMixin,
+    AsyncViewSetMixin,
+    run_external_call,
+)
 from utils.common import (
+    acreate_payment_intent,
     activate_user,
+    arequest_otp,
+    aupload_photo,
     compute_order_items_total_amount,
-    create_payment_intent,
     create_stripe_customer,
     create_stripe_refund,
-    delete_s3_object,
+    delete_photo,
     delete_stripe_customer,
     format_phone,
     get_delivery_fee,
     is_event_from_stripe,
     is_otp_valid,
-    send_otp,
+    request_otp,
     update_payment_intent,
-    upload_image_to_s3,
 )
 from utils.custom_permissions import (
     AnonymousPermission,
     CustomAPIKeyPermission,
     UserPermission,
 )
+from utils.custom_throttles import OtpRequestThrottle
 from utils.distance_computer import (
+    aget_closest_cookers_ids_from_customer_search_address,
     compute_distance,
-    get_closest_cookers_ids_from_customer_search_address,
 )
 from utils.enums import OrderStatusEnum
+from utils.parsers import BoundedJSONParser
 
 from .serializers import (
     AddressGETSerializer,
@@ -77,13 +90,14 @@ from .serializers import (
     CustomerSerializer,
     DishCountriesGETSerializer,
     OrderGETSerializer,
+    OrderJSONSerializer,
     OrderSerializer,
 )
 
 logger = logging.getLogger("watchtower-logger")
 
 
-class CustomerView(ModelViewSet):
+class CustomerView(AsyncViewSetMixin, ModelViewSet):
     parser_classes = [MultiPartParser]
     queryset = CustomerModel.objects.all()
 
@@ -119,6 +133,12 @@ class CustomerView(ModelViewSet):
 
         return [permission() for permission in permission_classes]
 
+    def get_throttles(self) -> list:
+        if self.action in ("auth", "ask_otp", "create"):
+            return [OtpRequestThrottle()]
+
+        return super().get_throttles()
+
     def perform_create(self, serializer: BaseSerializer) -> None:
         try:
             super().perform_create(serializer)
@@ -126,40 +146,36 @@ class CustomerView(ModelViewSet):
             logger.error(err)
             raise ValidationError("Integrity error occurred during customer creation.")
 
-        send_otp(serializer.validated_data.get("phone"))
+        request_otp(serializer.validated_data.get("phone"))
         create_stripe_customer(serializer.validated_data, "@customer-app.com")
 
-    def partial_update(self, request, *args, **kwargs) -> Response:
+    async def partial_update(self, request, *args, **kwargs) -> Response:
         kwargs.pop("pk")  # pk is unexpected in parent's partial_update method
-        customer: CustomerModel = self.get_object()
+        customer: CustomerModel = await sync_to_async(self.get_object)()
         old_photo_key: str = customer.photo
-        new_photo_key = None
+        photo_directory = None
 
         try:
             self.request.FILES["photo"]
         except KeyError:
             pass
         else:
-            new_photo_key = (
-                "customers"
-                + "/"
-                + str(customer.pk)
-                + "/"
-                + "profile_pics"
-                + "/"
-                + self.request.FILES["photo"].name
+            photo_directory = (
+                "customers" + "/" + str(customer.pk) + "/" + "profile_pics"
             )
 
-        if new_photo_key is not None:
-            upload_image_to_s3(self.request.FILES["photo"], new_photo_key)
+        if photo_directory is not None:
+            new_photo_key = await aupload_photo(
+                self.request.FILES["photo"], photo_directory
+            )
             customer.photo = new_photo_key
-            customer.save()
+            await sync_to_async(customer.save)()
 
             if not old_photo_key.endswith("default-profile-pic.jpg"):
                 if old_photo_key != new_photo_key:
-                    delete_s3_object(old_photo_key)
+                    await run_external_call(delete_photo, old_photo_key)
 
-        return super().partial_update(request, *args, **kwargs)
+        return await sync_to_async(super().partial_update)(request, *args, **kwargs)
 
     def destroy(self, request, *args, **kwargs) -> Response:
         instance: CustomerModel = self.get_object()
@@ -183,7 +199,7 @@ class CustomerView(ModelViewSet):
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
     @action(methods=["post"], detail=False, url_path="otp/ask")
-    def ask_otp(self, request) -> Response:
+    async def ask_otp(self, request) -> Response:
         phone = request.data.get("phone")
 
         try:
@@ -192,17 +208,17 @@ class CustomerView(ModelViewSet):
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            CustomerModel.objects.get(phone=e164_phone_format)
+            await CustomerModel.objects.aget(phone=e164_phone_format)
         except CustomerModel.DoesNotExist:
             logger.error(f"Customer with phone {e164_phone_format} does not exist.")
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        send_otp(e164_phone_format)
+        await arequest_otp(e164_phone_format, deduplicate=False)
 
         return Response(status=status.HTTP_200_OK)
 
     @action(methods=["post"], detail=False)
-    def auth(self, request) -> Response:
+    async def auth(self, request) -> Response:
         phone = request.data.get("phone")
 
         if phone is None:
@@ -216,7 +232,9 @@ class CustomerView(ModelViewSet):
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            customer: CustomerModel = CustomerModel.objects.get(phone=e164_phone_format)
+            customer: CustomerModel = await CustomerModel.objects.aget(
+                phone=e164_phone_format
+            )
         except CustomerModel.DoesNotExist:
             logger.error(f"Customer with phone {e164_phone_format} does not exist.")
             return Response(status=status.HTTP_400_BAD_REQUEST)
@@ -225,38 +243,7 @@ class CustomerView(ModelViewSet):
             logger.error(f"Customer with phone {e164_phone_format} is not activated.")
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        otp_response: Union[dict, None] = send_otp(e164_phone_format)
-
-        if otp_response is None:
-            logger.error(f"Failed to send an OTP to {e164_phone_format}")
-            return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
-
-        otp_response_status_code = (
-            otp_response.get("MessageResponse", {})
-            .get("Result", {})
-            .get(e164_phone_format, {})
-            .get("StatusCode")
-        )
-
-        if otp_response_status_code != status.HTTP_200_OK:
-            logger.error(f"Failed to send an OTP to {e164_phone_format}")
-            logger.error(
-                f"Expected {status.HTTP_200_OK} but got {otp_response_status_code} in otp response"
-            )
-            return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
-
-        otp_response_delivery_status = (
-            otp_response.get("MessageResponse", {})
-            .get("Result", {})
-            .get(e164_phone_format, {})
-            .get("DeliveryStatus")
-        )
-
-        if otp_response_delivery_status != "SUCCESSFUL":
-            logger.error(f"Failed to send an OTP to {e164_phone_format}")
-            logger.error(
-                f"Expected SUCCESSFUL but got {otp_response_delivery_status} in otp elivery status"
-            )
+        if not await arequest_otp(e164_phone_format):
             return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
         return Response(status=status.HTTP_200_OK)
@@ -304,13 +291,13 @@ class AddressView(ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class DishView(ListModelMixin, GenericViewSet):
+class DishView(AsyncViewSetMixin, ListModelMixin, GenericViewSet):
     serializer_class = DishGETSerializer
     renderer_classes = [CustomRendererWithData]
     parser_classes = [MultiPartParser]
     queryset = DishModel.objects.filter(category="dish").all()
 
-    def list(self, request, *args, **kwargs) -> Response:
+    async def list(self, request, *args, **kwargs) -> Response:
         request_sort: Union[str, None] = self.request.query_params.get("sort")
         request_name: Union[str, None] = self.request.query_params.get("name")
         request_category: Union[str, None] = self.request.query_params.get("category")
@@ -357,24 +344,26 @@ class DishView(ListModelMixin, GenericViewSet):
                 self.queryset = DishModel.objects.none()
 
         if request_address_id is not None:
-            customer_address: AddressModel = AddressModel.objects.get(
+            customer_address: AddressModel = await AddressModel.objects.aget(
                 pk=request_address_id
             )
-            closest_cookers_ids = get_closest_cookers_ids_from_customer_search_address(
-                str(customer_address),
-                CookerModel.objects.filter(
-                    postal_code__startswith=customer_address.postal_code[:2]
-                ),
-                (
-                    int(request_search_radius)
-                    if request_search_radius
-                    else settings.DEFAULT_SEARCH_RADIUS
-                ),
+            closest_cookers_ids = (
+                await aget_closest_cookers_ids_from_customer_search_address(
+                    str(customer_address),
+                    CookerModel.objects.filter(
+                        postal_code__startswith=customer_address.postal_code[:2]
+                    ).filter(in_flight_order_number__lt=F("max_order_number")),
+                    (
+                        int(request_search_radius)
+                        if request_search_radius
+                        else settings.DEFAULT_SEARCH_RADIUS
+                    ),
+                )
             )
 
         if not closest_cookers_ids:
             self.queryset = DishModel.objects.none()
-            return super().list(request, *args, **kwargs)
+            return await sync_to_async(super().list)(request, *args, **kwargs)
 
         if request_delivery_mode is not None:
             if request_delivery_mode == "now":
@@ -411,7 +400,7 @@ class DishView(ListModelMixin, GenericViewSet):
         else:
             self.queryset = self.queryset.order_by("-cooker__acceptance_rate")
 
-        return super().list(request, *args, **kwargs)
+        return await sync_to_async(super().list)(request, *args, **kwargs)
 
 
 class DrinkView(ListModelMixin, GenericViewSet):
@@ -506,7 +495,8 @@ class StarterView(ListModelMixin, GenericViewSet):
 
 
 class OrderView(
-    CreateModelMixin,
+    AsyncViewSetMixin,
+    AsyncCreateModelMixin,
     ListModelMixin,
     UpdateModelMixin,
     GenericViewSet,
@@ -515,20 +505,23 @@ class OrderView(
     queryset = OrderModel.objects.all()
     parser_classes = [MultiPartParser]
 
-    def perform_create(self, serializer: BaseSerializer) -> None:
-        distance_dict: dict = compute_distance(
+    async def perform_create(self, serializer: BaseSerializer) -> None:
+        # As on order is bound to only one cooker, fetch the first dishes's cooker is enough
+        cooker_address: str = await sync_to_async(
+            lambda: serializer.validated_data.get("dishes_items")[0][
+                "dish"
+            ].cooker.full_address
+        )()
+        distance_dict: dict = await run_external_call(
+            compute_distance,
             origins=[str(serializer.validated_data.get("address"))],
-            destinations=[
-                serializer.validated_data.get("dishes_items")[0][
-                    "dish"
-                ].cooker.full_address
-            ],  # As on order is bound to only one cooker, fetch the first dishes's cooker is enough
+            destinations=[cooker_address],
         )
         if distance_dict.get("status") == "KO":
             logger.error("Failed to compute distance")
             raise ValidationError("Failed to compute distance")
 
-        order_instance: OrderModel = serializer.save()
+        order_instance: OrderModel = await sync_to_async(serializer.save)()
         delivery_distance: float = distance_dict["rows"][0]["elements"][0]["distance"][
             "value"
         ]
@@ -538,13 +531,13 @@ class OrderView(
         if serializer.validated_data.get("scheduled_delivery_date"):
             order_instance.is_scheduled = True
 
-        order_instance.save()
+        await sync_to_async(order_instance.save)()
 
         # Create a payment intent and save the payment intent id in the order instance
-        stripe_response: dict = create_payment_intent(order_instance)
+        stripe_response: dict = await acreate_payment_intent(order_instance)
         order_instance.stripe_payment_intent_id = stripe_response["id"]
         order_instance.stripe_payment_intent_secret = stripe_response["client_secret"]
-        order_instance.save()
+        await sync_to_async(order_instance.save)()
 
     def perform_update(self, serializer: BaseSerializer) -> None:
         super().perform_update(serializer)
@@ -595,6 +588,9 @@ class OrderView(
         if self.request.method in ("GET", "POST", "PUT"):
             self.renderer_classes = [OrderCustomRendererWithData]
 
+        if self.action == "events":
+            self.renderer_classes = [CustomRendererWithData]
+
         return super().get_renderers()
 
     def get_serializer_class(self) -> type[BaseSerializer]:
@@ -628,6 +624,27 @@ class OrderView(
 
         return super().list(request, *args, **kwargs)
 
+    @action(methods=["get"], detail=True)
+    def events(self, request, pk=None) -> Response:
+        events = OrderEventModel.objects.filter(
+            order_id=pk,
+            order__customer_id=request.user.pk,
+        ).order_by("created", "id")
+
+        return Response(OrderEventGETSerializer(events, many=True).data)
+
+
+class OrderJSONView(OrderView):
+    """
+    Order creation accepting a size-capped JSON body instead of multipart form fields.
+    """
+
+    http_method_names = ["post"]
+    parser_classes = [BoundedJSONParser]
+
+    def get_serializer_class(self) -> type[BaseSerializer]:
+        return OrderJSONSerializer
+
 
 class CustomerOrderHistoryView(ListModelMixin, GenericViewSet):
     permission_classes = [UserPermission]
@@ -709,7 +726,19 @@ class StripeWebhookView(GenericViewSet):
             order_instance.paid_date = datetime.fromtimestamp(
                 event["created"], timezone.utc
             )
-            order_instance.transition_to(OrderStatusEnum.PENDING)
+
+            try:
+                order_instance.transition_to(OrderStatusEnum.PENDING)
+            except ValueError as e:
+                # The cooker got full since the order was created
+                logger.error(f"Order {order_instance.pk} not placed: {e}")
+                amount_to_refund_in_cents = Decimal(
+                    str(
+                        compute_order_items_total_amount(order_instance)
+                        + order_instance.delivery_fees
+                    )
+                ) * Decimal("100")
+                create_stripe_refund(int(amount_to_refund_in_cents), payment_intent_id)
 
         return Response(status=status.HTTP_200_OK)
 
@@ -717,7 +746,7 @@ class StripeWebhookView(GenericViewSet):
 class CustomerDishRatingView(CreateModelMixin, GenericViewSet):
     permission_classes = [UserPermission]
     parser_classes = [JSONParser]
-    renderer_classes = [CustomRendererWithoutData]
+    renderer_classes = [RatingsCustomRendererWithData]
     serializer_class = BulkDishRatingSerializer
 
     def get_queryset(self):
@@ -737,9 +766,9 @@ class CustomerDishRatingView(CreateModelMixin, GenericViewSet):
         # Call the custom `create` method from the serializer
         self.perform_create(serializer)
 
-        # Return a suitable response
+        # Outcome of each rated item, created, updated or not_found
         return Response(
-            {"detail": "Dish ratings created successfully."},
+            {"data": serializer.instance},
             status=status.HTTP_201_CREATED,
         )
 
@@ -747,14 +776,14 @@ class CustomerDishRatingView(CreateModelMixin, GenericViewSet):
         """
         Call the serializer's create method to handle data creation.
         """
-        serializer.save()
+        serializer.save(customer_id=self.request.user.pk)
 
 
 class CustomerDrinkRatingView(CreateModelMixin, GenericViewSet):
     permission_classes = [UserPermission]
     queryset = DrinkRatingModel.objects.all()
     parser_classes = [JSONParser]
-    renderer_classes = [CustomRendererWithoutData]
+    renderer_classes = [RatingsCustomRendererWithData]
     serializer_class = BulkDrinkRatingSerializer
 
     def get_queryset(self):
@@ -774,9 +803,9 @@ class CustomerDrinkRatingView(CreateModelMixin, GenericViewSet):
         # Call the custom `create` method from the serializer
         self.perform_create(serializer)
 
-        # Return a suitable response
+        # Outcome of each rated item, created, updated or not_found
         return Response(
-            {"detail": "Dish ratings created successfully."},
+            {"data": serializer.instance},
             status=status.HTTP_201_CREATED,
         )
 
@@ -784,7 +813,7 @@ class CustomerDrinkRatingView(CreateModelMixin, GenericViewSet):
         """
         Call the serializer's create method to handle data creation.
         """
-        serializer.save()
+        serializer.save(customer_id=self.request.user.pk)
 
 
 class CustomerOrderRatingView(UpdateModelMixin, GenericViewSet):
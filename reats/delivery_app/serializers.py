@@ -8,7 +8,7 @@ from utils.common import format_phone
 class DeliverSerializer(ModelSerializer):
     class Meta:
         model = DeliverModel
-        exclude = ("photo", "is_deleted", "is_online", "is_activated")
+        exclude = ("photo", "is_deleted", "is_online", "is_activated", "national_phone")
 
     def validate_phone(self, phone):
         try:
@@ -1,8 +1,10 @@
 import logging
-from typing import Type, Union
+from typing import Type
 
+from asgiref.sync import sync_to_async
 from core_app.models import DeliverModel, OrderModel
 from custom_renderers.renderers import (
+    CustomJSONRendererWithData,
     CustomRendererWithoutData,
     DeliverCustomRendererWithData,
     DeliveryStatsCustomRendererWithData,
@@ -11,6 +13,8 @@ from custom_renderers.renderers import (
 from customer_app.serializers import OrderGETSerializer
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import IntegrityError
+from django.db.models import Avg, Count, DurationField, F, Sum
+from django.db.models.functions import Coalesce
 from phonenumbers.phonenumberutil import NumberParseException
 from rest_framework import status
 from rest_framework.decorators import action
@@ -22,23 +26,30 @@ from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
 from rest_framework.serializers import BaseSerializer
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
+from utils.async_views import AsyncViewSetMixin, run_external_call
 from utils.common import (
     activate_user,
-    delete_s3_object,
+    arequest_otp,
+    aupload_photo,
+    delete_photo,
     format_phone,
     is_otp_valid,
-    send_otp,
-    upload_image_to_s3,
+    request_otp,
 )
 from utils.custom_permissions import CustomAPIKeyPermission, UserPermission
+from utils.custom_throttles import OtpRequestThrottle
 from utils.enums import OrderStatusEnum
+from utils.timeframe_stats import (
+    get_deliver_timeframe_stats,
+    get_timeframe_stats_response,
+)
 
 from .serializers import DeliverGETSerializer, DeliverSerializer
 
 logger = logging.getLogger("watchtower-logger")
 
 
-class DeliverView(ModelViewSet):
+class DeliverView(AsyncViewSetMixin, ModelViewSet):
     parser_classes = [MultiPartParser]
     queryset = DeliverModel.objects.all()
 
@@ -74,6 +85,12 @@ class DeliverView(ModelViewSet):
 
         return [permission() for permission in permission_classes]
 
+    def get_throttles(self) -> list:
+        if self.action in ("auth", "ask_otp", "create"):
+            return [OtpRequestThrottle()]
+
+        return super().get_throttles()
+
     def perform_create(self, serializer: BaseSerializer) -> None:
         try:
             super().perform_create(serializer)
@@ -81,39 +98,33 @@ class DeliverView(ModelViewSet):
             logger.error(err)
             raise ValidationError("Integrity error occurred during customer creation.")
 
-        send_otp(serializer.validated_data.get("phone"))
+        request_otp(serializer.validated_data.get("phone"))
 
-    def partial_update(self, request, *args, **kwargs) -> Response:
+    async def partial_update(self, request, *args, **kwargs) -> Response:
         kwargs.pop("pk")  # pk is unexpected in parent's partial_update method
-        customer: DeliverModel = self.get_object()
+        customer: DeliverModel = await sync_to_async(self.get_object)()
         old_photo_key: str = customer.photo
-        new_photo_key = None
+        photo_directory = None
 
         try:
             self.request.FILES["photo"]
         except KeyError:
             pass
         else:
-            new_photo_key = (
-                "delivers"
-                + "/"
-                + str(customer.pk)
-                + "/"
-                + "profile_pics"
-                + "/"
-                + self.request.FILES["photo"].name
-            )
+            photo_directory = "delivers" + "/" + str(customer.pk) + "/" + "profile_pics"
 
-        if new_photo_key is not None:
-            upload_image_to_s3(self.request.FILES["photo"], new_photo_key)
+        if photo_directory is not None:
+            new_photo_key = await aupload_photo(
+                self.request.FILES["photo"], photo_directory
+            )
             customer.photo = new_photo_key
-            customer.save()
+            await sync_to_async(customer.save)()
 
             if not old_photo_key.endswith("default-profile-pic.jpg"):
                 if old_photo_key != new_photo_key:
-                    delete_s3_object(old_photo_key)
+                    await run_external_call(delete_photo, old_photo_key)
 
-        return super().partial_update(request, *args, **kwargs)
+        return await sync_to_async(super().partial_update)(request, *args, **kwargs)
 
     def destroy(self, request, *args, **kwargs) -> Response:
         instance: DeliverModel = self.get_object()
@@ -139,7 +150,7 @@ class DeliverView(ModelViewSet):
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
     @action(methods=["post"], detail=False, url_path="otp/ask")
-    def ask_otp(self, request) -> Response:
+    async def ask_otp(self, request) -> Response:
         # return Response(status=status.HTTP_200_OK)
         phone = request.data.get("phone")
 
@@ -149,17 +160,17 @@ class DeliverView(ModelViewSet):
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            DeliverModel.objects.get(phone=e164_phone_format)
+            await DeliverModel.objects.aget(phone=e164_phone_format)
         except DeliverModel.DoesNotExist:
             logger.error(f"Customer with phone {e164_phone_format} does not exist.")
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        send_otp(e164_phone_format)
+        await arequest_otp(e164_phone_format, deduplicate=False)
 
         return Response(status=status.HTTP_200_OK)
 
     @action(methods=["post"], detail=False)
-    def auth(self, request) -> Response:
+    async def auth(self, request) -> Response:
         # return Response(status=status.HTTP_200_OK)
         phone = request.data.get("phone")
 
@@ -174,7 +185,9 @@ class DeliverView(ModelViewSet):
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            customer: DeliverModel = DeliverModel.objects.get(phone=e164_phone_format)
+            customer: DeliverModel = await DeliverModel.objects.aget(
+                phone=e164_phone_format
+            )
         except DeliverModel.DoesNotExist:
             logger.error(f"Customer with phone {e164_phone_format} does not exist.")
             return Response(status=status.HTTP_400_BAD_REQUEST)
@@ -183,38 +196,7 @@ class DeliverView(ModelViewSet):
             logger.error(f"Customer with phone {e164_phone_format} is not activated.")
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        otp_response: Union[dict, None] = send_otp(e164_phone_format)
-
-        if otp_response is None:
-            logger.error(f"Failed to send an OTP to {e164_phone_format}")
-            return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
-
-        otp_response_status_code = (
-            otp_response.get("MessageResponse", {})
-            .get("Result", {})
-            .get(e164_phone_format, {})
-            .get("StatusCode")
-        )
-
-        if otp_response_status_code != status.HTTP_200_OK:
-            logger.error(f"Failed to send an OTP to {e164_phone_format}")
-            logger.error(
-                f"Expected {status.HTTP_200_OK} but got {otp_response_status_code} in otp response"
-            )
-            return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
-
-        otp_response_delivery_status = (
-            otp_response.get("MessageResponse", {})
-            .get("Result", {})
-            .get(e164_phone_format, {})
-            .get("DeliveryStatus")
-        )
-
-        if otp_response_delivery_status != "SUCCESSFUL":
-            logger.error(f"Failed to send an OTP to {e164_phone_format}")
-            logger.error(
-                f"Expected SUCCESSFUL but got {otp_response_delivery_status} in otp elivery status"
-            )
+        if not await arequest_otp(e164_phone_format):
             return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
         return Response(status=status.HTTP_200_OK)
@@ -248,7 +230,22 @@ class DeliveryOrderStatsView(GenericViewSet, ListModelMixin):
                 logger.error(err)
                 self.queryset = OrderModel.objects.none()
 
-        if self.queryset.count() == 0:
+        stats: dict = self.queryset.aggregate(
+            total_number_of_deliveries=Count("id"),
+            total_delivery_fees=Sum(
+                Coalesce("delivery_fees", 0.0) + Coalesce("delivery_fees_bonus", 0.0)
+            ),
+            total_delivery_distance=Sum(
+                Coalesce("delivery_distance", 0.0)
+                + Coalesce("delivery_initial_distance", 0.0)
+            ),
+            delivery_mean_time=Avg(
+                F("delivered_date") - F("delivery_in_progress_date"),
+                output_field=DurationField(),
+            ),
+        )
+
+        if stats["total_number_of_deliveries"] == 0:
             return Response(
                 {
                     "ok": False,
@@ -256,29 +253,15 @@ class DeliveryOrderStatsView(GenericViewSet, ListModelMixin):
                 }
             )
 
-        stats = {}
-        stats["total_delivery_fees"] = 0.0
-        stats["total_delivery_time"] = 0.0
-        stats["total_delivery_distance"] = 0.0
-
-        for order in self.queryset:
-            stats["total_delivery_fees"] += (
-                order.delivery_fees + order.delivery_fees_bonus
-            )
-            stats["total_delivery_time"] += (
-                order.delivered_date - order.delivery_in_progress_date
-            ).total_seconds()
-            stats["total_delivery_distance"] += (
-                order.delivery_distance + order.delivery_initial_distance
-            )
-
-        stats["total_delivery_fees"] = round(stats["total_delivery_fees"], 2)
-        stats["total_delivery_distance"] = round(stats["total_delivery_distance"], 2)
-        stats["total_number_of_deliveries"] = self.queryset.count()
-        stats["delivery_mean_time"] = round(
-            stats["total_delivery_time"] / stats["total_number_of_deliveries"], 2
+        stats["total_delivery_fees"] = round(stats["total_delivery_fees"] or 0.0, 2)
+        stats["total_delivery_distance"] = round(
+            stats["total_delivery_distance"] or 0.0, 2
+        )
+        stats["delivery_mean_time"] = (
+            round(stats["delivery_mean_time"].total_seconds(), 2)
+            if stats["delivery_mean_time"] is not None
+            else 0.0
         )
-        del stats["total_delivery_time"]
 
         return Response(
             {
@@ -288,6 +271,15 @@ class DeliveryOrderStatsView(GenericViewSet, ListModelMixin):
             }
         )
 
+    @action(
+        methods=["get"], detail=False, renderer_classes=[CustomJSONRendererWithData]
+    )
+    def timeframe(self, request) -> Response:
+        return get_timeframe_stats_response(
+            request.query_params.get("timeframe"),
+            lambda timeframe: get_deliver_timeframe_stats(request.user.pk, timeframe),
+        )
+
 
 class DeliveryHistoryView(ListModelMixin, GenericViewSet):
     permission_classes = [UserPermission]
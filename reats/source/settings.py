@@ -17,7 +17,7 @@ from typing import Any
 
 import boto3
 from dotenv import load_dotenv
-from utils.get_secrets import fetch_aws_secrets
+from utils.get_secrets import load_secrets
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -32,9 +32,6 @@ load_dotenv(os.path.join(BASE_DIR, env_file))
 
 
 boto3.set_stream_logger(name="botocore.credentials", level=logging.ERROR)
-session = boto3.session.Session()
-
-ssm_client = boto3.client("ssm", region_name=os.getenv("AWS_REGION"))
 boto3_logs_client = boto3.client("logs", region_name=os.getenv("AWS_REGION"))
 
 
@@ -101,7 +98,7 @@ WSGI_APPLICATION = "source.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
 
-secret_data = fetch_aws_secrets(os.environ["AWS_SECRET_NAME"])
+secret_data = load_secrets(os.environ["AWS_SECRET_NAME"])
 
 if secret_data:
     print("Secrets loaded successfully")
@@ -115,7 +112,7 @@ if secret_data:
     STRIPE_WEBHOOK_ENDPOINT_SIGNATURE = secret_data["STRIPE_WEBHOOK_ENDPOINT_SIGNATURE"]
     SECRET_KEY = secret_data["DJANGO_SECRET_KEY"]
 else:
-    raise RuntimeError("Failed to load secrets from AWS Secrets Manager")
+    raise RuntimeError("Failed to load secrets")
 
 
 DATABASES = {
@@ -136,6 +133,24 @@ else:
     DATABASES["default"]["PASSWORD"] = os.environ["POSTGRES_PASSWORD"]
     DATABASES["default"]["NAME"] = os.environ["POSTGRES_DB"]
 
+# Keep connections open between requests, checked before being reused
+DATABASES["default"]["CONN_MAX_AGE"] = int(
+    os.getenv("DB_CONN_MAX_AGE", 600)
+)  # in seconds
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Per worker process, 0 to disable the pool, the gunicorn threads number is enough
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 0))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))  # in seconds
+DB_POOL_HEALTH_CHECK_AGE = float(
+    os.getenv("DB_POOL_HEALTH_CHECK_AGE", 30)
+)  # in seconds
+
+if DB_POOL_MAX_SIZE:
+    DATABASES["default"]["ENGINE"] = "utils.postgresql_pool"
+    # Connections go back to the pool at the end of each request
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -182,9 +197,10 @@ REST_FRAMEWORK = {
     "EXCEPTION_HANDLER": "utils.custom_middlewares.custom_exception_handler",
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTStatelessUserAuthentication",
+        "utils.authentication.CachedJWTStatelessUserAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("utils.custom_permissions.UserPermission",),
+    "NUM_PROXIES": 1,  # The load balancer
 }
 
 
@@ -202,9 +218,61 @@ SIMPLE_JWT = {
     "TOKEN_OBTAIN_SERIALIZER": "cookers_app.serializers.TokenObtainPairWithoutPasswordSerializer",
 }
 
+OTP_IP_BUCKET_CAPACITY = 20
+OTP_IP_BUCKET_REFILL_TIME = 30  # in seconds, per token
+OTP_PHONE_BUCKET_CAPACITY = 3
+OTP_PHONE_BUCKET_REFILL_TIME = 5 * 60  # in seconds, per token
+
+JWT_VERIFIED_TOKENS_CACHE_SIZE = 10_000  # per process
+
+# Google, Stripe, S3 and Pinpoint calls in flight at once in the async views
+EXTERNAL_CALLS_MAX_CONCURRENCY = int(
+    os.getenv("EXTERNAL_CALLS_MAX_CONCURRENCY", 200)
+)  # per process
+
 SERVICE_FEES_RATE = 0.07
 DEFAULT_CURRENCY = "EUR"
 
+MAX_JSON_BODY_SIZE = 16 * 1024  # in bytes
+ORDER_MAX_ITEMS = 30  # per dishes_items / drinks_items list
+ORDER_ITEM_MAX_QUANTITY = 20
+
+# Longest side of each WebP rendition of the uploaded photos, in pixels
+PHOTO_VARIANTS = {"thumbnail": 256, "medium": 640, "large": 1280}
+PHOTO_ORIGINAL_MAX_SIZE = (2048, 2048)  # in pixels, JPEG rendition
+# Photo keys hold a hash of their content, which never changes
+PHOTO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# CDN in front of the bucket, e.g. https://photos.reats.fr, presigned URLs if empty
+PHOTO_URL_BASE = os.getenv("PHOTO_URL_BASE", "").rstrip("/")
+PHOTO_URL_CACHE_TIME = 12 * 60 * 60  # in seconds, presigned URLs reuse
+
+# Photo uploads run after the response, 0 runs them in the request
+S3_UPLOADS_MAX_CONCURRENCY = int(
+    os.getenv("S3_UPLOADS_MAX_CONCURRENCY", 8)
+)  # per process
+S3_UPLOADS_MAX_PENDING = 64  # uploads queued or running before requests wait
+S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024  # in bytes
+S3_MULTIPART_CHUNKSIZE = 8 * 1024 * 1024  # in bytes
+S3_MULTIPART_MAX_CONCURRENCY = 4  # parts in flight per upload
+# Deleted keys are batched for this long, 0 deletes them right away
+S3_DELETES_FLUSH_INTERVAL = float(
+    os.getenv("S3_DELETES_FLUSH_INTERVAL", 2)
+)  # in seconds
+
+# Where photos are stored, utils.storage.filesystem.FileSystemStorage keeps them
+# on the local disk and serves them under STORAGE_FILESYSTEM_URL
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "utils.storage.s3.S3Storage")
+STORAGE_FILESYSTEM_ROOT = os.getenv(
+    "STORAGE_FILESYSTEM_ROOT", os.path.join(BASE_DIR, "storage")
+)
+STORAGE_FILESYSTEM_URL = os.getenv(
+    "STORAGE_FILESYSTEM_URL", "http://localhost:8000/storage"
+)
+
+# Past buckets of the timeframe stats are dropped on writes in this process,
+# other processes holding a local memory cache see the change after this long
+TIMEFRAME_STATS_CACHE_TIME = 60 * 60  # in seconds
+
 ACCEPTANCE_RATE_INCREASE_VALUE = 2
 ACCEPTANCE_RATE_DECREASE_VALUE = 10
 
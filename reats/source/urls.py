@@ -5,7 +5,7 @@ from delivery_app import views as delivery_app_views
 from django.conf import settings
 from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import include, path
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import DefaultRouter, SimpleRouter
 
 router = DefaultRouter()
 router.register(r"cookers", cooker_app_views.CookerView, basename="cookers")
@@ -77,9 +77,17 @@ router.register(
     delivery_app_views.DeliveryHistoryView,
     basename="delivers-history",
 )
+
+router_v2 = SimpleRouter()
+router_v2.register(
+    r"customers-orders",
+    customer_app_views.OrderJSONView,
+    basename="orders-v2",
+)
 # The API URLs are now determined automatically by the router.
 urlpatterns = [
     path("api/v1/", include(router.urls)),
+    path("api/v2/", include(router_v2.urls)),
     path("api/v1/health/", CoreAppViews.HealthCheckView.as_view(), name="health-check"),
     path(
         "api/v1/token/",
@@ -91,6 +99,11 @@ urlpatterns = [
         cooker_app_views.TokenObtainRefreshWithoutPasswordView.as_view(),
         name="token_refresh",
     ),
+    path(
+        "storage/<path:key>",
+        CoreAppViews.serve_storage_object,
+        name="storage-object",
+    ),
     path(
         "api/v1/stripe/webhook/",
         customer_app_views.StripeWebhookView.as_view({"post": "create"}),
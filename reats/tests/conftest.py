@@ -1,20 +1,24 @@
+import hashlib
 import json
 import os
 from datetime import datetime, timedelta, timezone
 from io import BytesIO
 from typing import Iterator
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 import jwt
 import pytest
 import stripe
+from botocore.exceptions import ClientError
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives.serialization import load_pem_private_key
+from django.core.cache import cache
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.core.management import call_command
 from PIL import Image
 from rest_framework.test import APIClient
+from utils.otp_throttling import otp_sends, otp_throttle_buckets
 
 
 @pytest.fixture(scope="session")
@@ -22,7 +26,7 @@ def client():
     return APIClient()
 
 
-@pytest.fixture(scope="session")
+@pytest.fixture
 def image() -> InMemoryUploadedFile:
     im = Image.new(mode="RGB", size=(200, 200))  # create a new image using PIL
     im_io = BytesIO()  # a BytesIO object for saving image
@@ -36,16 +40,41 @@ def image() -> InMemoryUploadedFile:
     return image
 
 
+@pytest.fixture(autouse=True)
+def s3_transfers_in_request(settings) -> None:
+    """
+    The API tests check S3 calls right after the response, see
+    utils.s3_transfers
+    """
+    settings.S3_UPLOADS_MAX_CONCURRENCY = 0
+    settings.S3_DELETES_FLUSH_INTERVAL = 0
+
+
+@pytest.fixture
+def image_hash(image: InMemoryUploadedFile) -> str:
+    return hashlib.sha256(image.file.getvalue()).hexdigest()
+
+
+@pytest.fixture
+def head_object() -> Iterator:
+    patcher = patch(
+        "utils.storage.s3.s3.head_object",
+        side_effect=ClientError({"Error": {"Code": "404"}}, "HeadObject"),
+    )
+    yield patcher.start()
+    patcher.stop()
+
+
 @pytest.fixture
-def upload_fileobj() -> Iterator:
-    patcher = patch("utils.common.s3.upload_fileobj")
+def upload_fileobj(head_object: MagicMock) -> Iterator:
+    patcher = patch("utils.storage.s3.s3.upload_fileobj")
     yield patcher.start()
     patcher.stop()
 
 
 @pytest.fixture
-def delete_object() -> Iterator:
-    patcher = patch("utils.common.s3.delete_object")
+def delete_objects() -> Iterator:
+    patcher = patch("utils.storage.s3.s3.delete_objects")
     yield patcher.start()
     patcher.stop()
 
@@ -220,6 +249,23 @@ def auth_headers(token_with_bearer: str) -> dict:
     return {"HTTP_AUTHORIZATION": token_with_bearer}
 
 
+@pytest.fixture
+def empty_cache() -> Iterator:
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def empty_otp_throttling_local_caches() -> Iterator:
+    # Database rows are rolled back after each test, not the in-memory copies
+    otp_throttle_buckets.clear_local()
+    otp_sends.clear_local()
+    yield
+    otp_throttle_buckets.clear_local()
+    otp_sends.clear_local()
+
+
 @pytest.fixture(autouse=True)
 def customer_app_api_key(settings) -> None:
     settings.CUSTOMER_APP_API_KEY = "some-api-key-for-customer-app"
@@ -284,6 +330,8 @@ def django_db_setup(django_db_blocker):
 
     with django_db_blocker.unblock():
         call_command("loaddata", *fixtures)
+        # loaddata bypasses OrderModel.save, so rollups are computed afterwards
+        call_command("rebuild_cooker_daily_rollups")
 
 
 @pytest.fixture(autouse=True)
@@ -525,6 +573,11 @@ def customer_order_path() -> str:
     return "/api/v1/customers-orders/"
 
 
+@pytest.fixture(scope="session")
+def customer_order_json_path() -> str:
+    return "/api/v2/customers-orders/"
+
+
 @pytest.fixture
 def mock_transition_to():
     patcher = patch(
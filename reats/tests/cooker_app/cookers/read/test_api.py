@@ -1,4 +1,7 @@
+from unittest.mock import patch
+
 import pytest
+from core_app.models import CookerModel
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -58,6 +61,31 @@ def test_get_existing_cooker_data(
     }
 
 
+@pytest.mark.django_db
+def test_get_cooker_data_with_stored_national_phone(
+    auth_headers: dict,
+    client: APIClient,
+    cooker_id: int,
+    path: str,
+) -> None:
+    cooker = CookerModel.objects.get(pk=cooker_id)
+    cooker.phone = "+33611223344"
+    cooker.save()
+
+    with patch("utils.phones.phonenumbers.parse") as parse:
+        response = client.get(
+            f"{path}{cooker_id}/",
+            follow=False,
+            **auth_headers,
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"]["personal_infos_section"]["data"]["phone"] == (
+        "0611223344"
+    )
+    parse.assert_not_called()
+
+
 @pytest.mark.django_db
 def test_get_missing_cooker_data(
     auth_headers: dict,
@@ -1,3 +1,4 @@
+import hashlib
 import os
 from datetime import datetime, timedelta
 from io import BytesIO
@@ -58,7 +59,7 @@ class TestUpdateCookerAddressInfo:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         cooker_id: int,
         path: str,
         post_address_data: dict,
@@ -85,7 +86,7 @@ class TestUpdateCookerAddressInfo:
             assert cooker.address_complement == "résidence de la brume"
 
             upload_fileobj.assert_not_called()
-            delete_object.assert_not_called()
+            delete_objects.assert_not_called()
 
 
 @pytest.mark.django_db
@@ -94,7 +95,7 @@ class TestUpdateCookerAccountInfoWithoutPhoto:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         cooker_id: int,
         path: str,
         post_personal_information_data_without_photo: dict,
@@ -121,7 +122,7 @@ class TestUpdateCookerAccountInfoWithoutPhoto:
             assert cooker.max_order_number == 12
 
             upload_fileobj.assert_not_called()
-            delete_object.assert_not_called()
+            delete_objects.assert_not_called()
 
 
 @pytest.mark.django_db
@@ -135,11 +136,12 @@ class TestUpdateCookerAccountInfoWithPhotoV1:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         cooker_id: int,
         path: str,
         post_personal_information_data_with_photo: dict,
         upload_fileobj: MagicMock,
+        image_hash: str,
     ) -> None:
         with freeze_time("2023-10-14T22:00:00+00:00"):
             response = client.patch(
@@ -158,18 +160,18 @@ class TestUpdateCookerAccountInfoWithPhotoV1:
             assert cooker.firstname == "John"
             assert cooker.lastname == "DOE"
             assert cooker.max_order_number == 12
-            assert cooker.photo == "cookers/1/profile_pics/test.jpg"
+            assert cooker.photo == f"cookers/1/profile_pics/{image_hash}/original.jpg"
 
-            upload_fileobj.assert_called_once()
-            assert len(upload_fileobj.call_args.args) == 3
-
-            arg1, arg2, arg3 = upload_fileobj.call_args.args
-
-            assert isinstance(arg1, InMemoryUploadedFile)
-            assert arg1.name == "test.jpg"
-            assert arg2 == "reats-dev-bucket"
-            assert arg3 == "cookers/1/profile_pics/test.jpg"
-            delete_object.assert_not_called()
+            assert [upload.args[1:] for upload in upload_fileobj.call_args_list] == [
+                ("reats-dev-bucket", f"cookers/1/profile_pics/{image_hash}/{name}")
+                for name in [
+                    "original.jpg",
+                    "large.webp",
+                    "medium.webp",
+                    "thumbnail.webp",
+                ]
+            ]
+            delete_objects.assert_not_called()
 
 
 @pytest.mark.django_db
@@ -180,7 +182,8 @@ class TestUpdateCookerAccountInfoWithPhotoV2:
 
     @pytest.fixture
     def second_profile_pic(self) -> InMemoryUploadedFile:
-        im = Image.new(mode="RGB", size=(200, 200))  # create a new image using PIL
+        # create a new image using PIL, unlike the image fixture
+        im = Image.new(mode="RGB", size=(200, 200), color="white")
         im_io = BytesIO()  # a BytesIO object for saving image
         im.save(im_io, "JPEG")  # save the image to im_io
         im_io.seek(0)  # seek to the beginning
@@ -196,6 +199,10 @@ class TestUpdateCookerAccountInfoWithPhotoV2:
 
         return image
 
+    @pytest.fixture
+    def second_profile_pic_hash(self, second_profile_pic: InMemoryUploadedFile) -> str:
+        return hashlib.sha256(second_profile_pic.file.getvalue()).hexdigest()
+
     @pytest.fixture
     def second_post_personal_information_data_with_photo(
         self,
@@ -212,7 +219,7 @@ class TestUpdateCookerAccountInfoWithPhotoV2:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         cooker_id: int,
         path: str,
         post_personal_information_data_with_photo: dict,
@@ -220,6 +227,8 @@ class TestUpdateCookerAccountInfoWithPhotoV2:
         upload_fileobj: MagicMock,
         second_profile_pic: InMemoryUploadedFile,
         image: InMemoryUploadedFile,
+        image_hash: str,
+        second_profile_pic_hash: str,
     ) -> None:
         with freeze_time("2023-10-14T22:00:00+00:00"):
             response = client.patch(
@@ -241,18 +250,18 @@ class TestUpdateCookerAccountInfoWithPhotoV2:
             assert cooker.firstname == "John"
             assert cooker.lastname == "DOE"
             assert cooker.max_order_number == 12
-            assert cooker.photo == "cookers/1/profile_pics/test.jpg"
-
-            upload_fileobj.call_count == 1
-            assert len(upload_fileobj.call_args.args) == 3
-
-            arg1, arg2, arg3 = upload_fileobj.call_args.args
-
-            assert isinstance(arg1, InMemoryUploadedFile)
-            assert arg1.name == "test.jpg"
-            assert arg2 == "reats-dev-bucket"
-            assert arg3 == "cookers/1/profile_pics/test.jpg"
-            delete_object.assert_not_called()
+            assert cooker.photo == f"cookers/1/profile_pics/{image_hash}/original.jpg"
+
+            assert [upload.args[1:] for upload in upload_fileobj.call_args_list] == [
+                ("reats-dev-bucket", f"cookers/1/profile_pics/{image_hash}/{name}")
+                for name in [
+                    "original.jpg",
+                    "large.webp",
+                    "medium.webp",
+                    "thumbnail.webp",
+                ]
+            ]
+            delete_objects.assert_not_called()
 
         # SECOND CALL #
         with freeze_time("2023-10-22T22:00:00+00:00"):
@@ -275,21 +284,40 @@ class TestUpdateCookerAccountInfoWithPhotoV2:
             assert cooker.firstname == "John"
             assert cooker.lastname == "DOE"
             assert cooker.max_order_number == 12
-            assert cooker.photo == "cookers/1/profile_pics/second_profile_pic.jpg"
-
-            upload_fileobj.call_count == 2
-            assert len(upload_fileobj.call_args.args) == 3
-
-            arg1, arg2, arg3 = upload_fileobj.call_args.args
-
-            assert isinstance(arg1, InMemoryUploadedFile)
-            assert arg1.name == "second_profile_pic.jpg"
-            assert arg2 == "reats-dev-bucket"
-            assert arg3 == "cookers/1/profile_pics/second_profile_pic.jpg"
+            assert (
+                cooker.photo
+                == f"cookers/1/profile_pics/{second_profile_pic_hash}/original.jpg"
+            )
 
-            delete_object.assert_called_once_with(
+            assert [
+                upload.args[1:] for upload in upload_fileobj.call_args_list[4:]
+            ] == [
+                (
+                    "reats-dev-bucket",
+                    f"cookers/1/profile_pics/{second_profile_pic_hash}/{name}",
+                )
+                for name in [
+                    "original.jpg",
+                    "large.webp",
+                    "medium.webp",
+                    "thumbnail.webp",
+                ]
+            ]
+
+            delete_objects.assert_called_once_with(
                 Bucket="reats-dev-bucket",
-                Key="cookers/1/profile_pics/test.jpg",
+                Delete={
+                    "Objects": [
+                        {"Key": f"cookers/1/profile_pics/{image_hash}/{name}"}
+                        for name in [
+                            "original.jpg",
+                            "thumbnail.webp",
+                            "medium.webp",
+                            "large.webp",
+                        ]
+                    ],
+                    "Quiet": True,
+                },
             )
 
 
@@ -311,7 +339,7 @@ class TestUpdateCookerOnlineStatus:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         cooker_id: int,
         path: str,
         post_switch_cooker_offline: dict,
@@ -338,7 +366,7 @@ class TestUpdateCookerOnlineStatus:
             assert cooker.is_online is True
 
             upload_fileobj.assert_not_called()
-            delete_object.assert_not_called()
+            delete_objects.assert_not_called()
 
         with freeze_time("2023-10-14T23:00:00+00:00"):
             response = client.patch(
@@ -357,7 +385,7 @@ class TestUpdateCookerOnlineStatus:
             assert cooker.is_online is False
 
             upload_fileobj.assert_not_called()
-            delete_object.assert_not_called()
+            delete_objects.assert_not_called()
 
 
 @pytest.mark.django_db
@@ -1,10 +1,16 @@
+from io import StringIO
 from typing import Callable
 
 import pytest
-from core_app.models import OrderModel
+from core_app.models import CookerDailyRollupModel, OrderModel
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count
+from freezegun import freeze_time
 from rest_framework import status
 from rest_framework.test import APIClient
 from utils.enums import OrderStatusEnum
+from utils.timeframe_stats_cache import get_series_cache_key
 
 
 @pytest.fixture
@@ -108,3 +114,192 @@ def test_get_dashboard_data_fails_when_a_date_is_missing(
         "ok": False,
         "status_code": status.HTTP_400_BAD_REQUEST,
     }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query_parameter,expected_data",
+    [
+        (
+            {"start_date": "2024-12-01", "end_date": "2024-12-31"},
+            {
+                OrderStatusEnum.PENDING.value: 1,
+                OrderStatusEnum.PROCESSING.value: 2,
+                OrderStatusEnum.COMPLETED.value: 1,
+                OrderStatusEnum.CANCELLED_BY_COOKER.value: 1,
+                OrderStatusEnum.DELIVERED.value: 3,
+            },
+        ),
+        (
+            {"start_date": "2024-12-11T20:00:00Z", "end_date": "2024-12-12T10:00:00Z"},
+            {
+                OrderStatusEnum.PENDING.value: 1,
+                OrderStatusEnum.PROCESSING.value: 2,
+                OrderStatusEnum.COMPLETED.value: 1,
+                OrderStatusEnum.CANCELLED_BY_COOKER.value: 1,
+                OrderStatusEnum.DELIVERED.value: 3,
+            },
+        ),
+        (
+            {"start_date": "2024-12-11T21:00:00Z", "end_date": "2024-12-31"},
+            {},
+        ),
+    ],
+    ids=[
+        "full days read from rollups",
+        "partial days read from orders",
+        "orders before the start of a partial day are ignored",
+    ],
+)
+def test_get_dashboard_data_after_orders_transitions_and_deletion(
+    auth_headers: dict,
+    client: APIClient,
+    dashboard_path: str,
+    query_parameter: dict,
+    expected_data: dict,
+) -> None:
+    OrderModel.objects.get(pk=9).transition_to(OrderStatusEnum.PROCESSING)
+    OrderModel.objects.filter(pk=17).delete()
+
+    # Rollups must match a full scan of the orders table
+    expected_rollups = (
+        OrderModel.objects.filter(cooker_id=1)
+        .exclude(status=OrderStatusEnum.DRAFT)
+        .values("status")
+        .annotate(count=Count("id"))
+        .values_list("status", "count")
+    )
+    rollups = CookerDailyRollupModel.objects.filter(
+        cooker_id=1, count__gt=0
+    ).values_list("status", "count")
+    assert dict(rollups) == dict(expected_rollups)
+
+    response = client.get(
+        dashboard_path,
+        query_parameter,
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.json() == {
+        "ok": True,
+        "status_code": status.HTTP_200_OK,
+        "data": expected_data,
+    }
+
+
+@pytest.mark.django_db
+@freeze_time("2024-12-13T10:00:00Z")
+def test_get_dashboard_timeframe_stats_for_a_week(
+    auth_headers: dict,
+    client: APIClient,
+    dashboard_path: str,
+    empty_cache: None,
+) -> None:
+    revenue = sum(
+        CookerDailyRollupModel.objects.filter(cooker_id=1, day="2024-12-11")
+        .exclude(
+            status__in=[
+                OrderStatusEnum.CANCELLED_BY_COOKER,
+                OrderStatusEnum.CANCELLED_BY_CUSTOMER,
+            ]
+        )
+        .values_list("revenue", flat=True)
+    )
+    empty_bucket = {"orders_number": 0, "revenue": 0.0}
+
+    response = client.get(
+        f"{dashboard_path}timeframe/",
+        {"timeframe": "week"},
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.json() == {
+        "ok": True,
+        "status_code": status.HTTP_200_OK,
+        "data": [
+            {"start_date": "2024-12-09", **empty_bucket},
+            {"start_date": "2024-12-10", **empty_bucket},
+            {
+                "start_date": "2024-12-11",
+                "orders_number": 7,
+                "revenue": round(revenue, 2),
+            },
+            {"start_date": "2024-12-12", **empty_bucket},
+            {"start_date": "2024-12-13", **empty_bucket},
+        ],
+    }
+
+    # Past buckets without any order in flight are cached, the current one never is
+    cache_key = get_series_cache_key("cooker:1")
+    assert cache.get(f"{cache_key}:week:2024-12-10") is not None
+    assert cache.get(f"{cache_key}:week:2024-12-11") is None
+    assert cache.get(f"{cache_key}:week:2024-12-13") is None
+
+
+@pytest.mark.django_db
+@freeze_time("2024-12-13T10:00:00Z")
+def test_get_dashboard_timeframe_stats_after_past_orders_change(
+    auth_headers: dict,
+    client: APIClient,
+    dashboard_path: str,
+    empty_cache: None,
+    django_capture_on_commit_callbacks: Callable,
+) -> None:
+    with freeze_time("2024-12-10T12:00:00Z"):
+        order = OrderModel.objects.create(
+            cooker_id=1,
+            customer_id=1,
+            address_id=2,
+            status=OrderStatusEnum.DRAFT,
+        )
+
+    def get_orders_number() -> int:
+        response = client.get(
+            f"{dashboard_path}timeframe/",
+            {"timeframe": "week"},
+            follow=False,
+            **auth_headers,
+        )
+        return response.json()["data"][1]["orders_number"]  # 2024-12-10
+
+    assert get_orders_number() == 0  # Drafts are not counted
+
+    # The draft of a past day is paid, then delivered
+    with django_capture_on_commit_callbacks(execute=True):
+        order.status = OrderStatusEnum.DELIVERED
+        order.save()
+
+    assert get_orders_number() == 1
+
+    # The rollups are rebuilt from the orders table
+    OrderModel.objects.filter(pk=order.pk).update(
+        status=OrderStatusEnum.CANCELLED_BY_COOKER
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("rebuild_cooker_daily_rollups", stdout=StringIO())
+
+    assert get_orders_number() == 0
+
+
+@pytest.mark.django_db
+def test_get_dashboard_timeframe_stats_fails_with_invalid_timeframe(
+    auth_headers: dict,
+    client: APIClient,
+    dashboard_path: str,
+) -> None:
+    response = client.get(
+        f"{dashboard_path}timeframe/",
+        {"timeframe": "decade"},
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {
+        "ok": False,
+        "status_code": status.HTTP_400_BAD_REQUEST,
+        "error": "Invalid timeframe. Expected one of week, month or year.",
+    }
@@ -6,6 +6,7 @@ from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
 from rest_framework import status
 from rest_framework.test import APIClient
+from utils.s3_transfers import transfer_config
 
 
 @pytest.fixture(params=["starter", "dish", "dessert"])
@@ -35,6 +36,7 @@ class TestCreateDishSuccess:
         path: str,
         post_data: dict,
         upload_fileobj: MagicMock,
+        image_hash: str,
     ) -> None:
         pre_create_count = DishModel.objects.count()
 
@@ -49,20 +51,32 @@ class TestCreateDishSuccess:
         assert response.status_code == status.HTTP_201_CREATED
         assert (
             DishModel.objects.latest("pk").photo
-            == f"cookers/1/dishes/{post_data.get('category')}/test.jpg"
+            == f"cookers/1/dishes/{post_data.get('category')}/{image_hash}/original.jpg"
         )
-        upload_fileobj.assert_called_once()
         post_create_count = DishModel.objects.count()
 
         assert post_create_count - pre_create_count == 1
-        assert len(upload_fileobj.call_args.args) == 3
-
-        arg1, arg2, arg3 = upload_fileobj.call_args.args
-
-        assert isinstance(arg1, InMemoryUploadedFile)
-        assert arg1.name == "test.jpg"
-        assert arg2 == "reats-dev-bucket"
-        assert arg3 == f"cookers/1/dishes/{post_data.get('category')}/test.jpg"
+        assert [upload.args[1:] for upload in upload_fileobj.call_args_list] == [
+            (
+                "reats-dev-bucket",
+                f"cookers/1/dishes/{post_data.get('category')}/{image_hash}/{name}",
+            )
+            for name in ["original.jpg", "large.webp", "medium.webp", "thumbnail.webp"]
+        ]
+        assert upload_fileobj.call_args_list[0].kwargs == {
+            "ExtraArgs": {
+                "ContentType": "image/jpeg",
+                "CacheControl": "public, max-age=31536000, immutable",
+            },
+            "Config": transfer_config,
+        }
+        assert upload_fileobj.call_args.kwargs == {
+            "ExtraArgs": {
+                "ContentType": "image/webp",
+                "CacheControl": "public, max-age=31536000, immutable",
+            },
+            "Config": transfer_config,
+        }
 
 
 @pytest.mark.django_db
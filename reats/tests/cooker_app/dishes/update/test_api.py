@@ -79,11 +79,12 @@ class TestUpdateDishWithPhotoSuccess:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         dish_id: int,
         path: str,
         post_data_with_photo: dict,
         upload_fileobj: MagicMock,
+        image_hash: str,
     ) -> None:
         with freeze_time("2023-10-14T22:00:00+00:00"):
             response = client.put(
@@ -104,22 +105,28 @@ class TestUpdateDishWithPhotoSuccess:
             assert dish_object.name == "New name"
             assert dish_object.price == 14.0
             assert dish_object.is_enabled is True
-            assert dish_object.photo == "cookers/1/dishes/dessert/test.jpg"
+            assert (
+                dish_object.photo
+                == f"cookers/1/dishes/dessert/{image_hash}/original.jpg"
+            )
             assert dish_object.modified.isoformat() == "2023-10-14T22:00:00+00:00"
 
-            upload_fileobj.assert_called_once()
-            assert len(upload_fileobj.call_args.args) == 3
-
-            arg1, arg2, arg3 = upload_fileobj.call_args.args
-
-            assert isinstance(arg1, InMemoryUploadedFile)
-            assert arg1.name == "test.jpg"
-            assert arg2 == "reats-dev-bucket"
-            assert arg3 == "cookers/1/dishes/dessert/test.jpg"
-
-            delete_object.assert_called_once_with(
+            assert [upload.args[1:] for upload in upload_fileobj.call_args_list] == [
+                ("reats-dev-bucket", f"cookers/1/dishes/dessert/{image_hash}/{name}")
+                for name in [
+                    "original.jpg",
+                    "large.webp",
+                    "medium.webp",
+                    "thumbnail.webp",
+                ]
+            ]
+
+            delete_objects.assert_called_once_with(
                 Bucket="reats-dev-bucket",
-                Key="cookers/1/dishes/dish/poulet-braise.jpg",
+                Delete={
+                    "Objects": [{"Key": "cookers/1/dishes/dish/poulet-braise.jpg"}],
+                    "Quiet": True,
+                },
             )
 
 
@@ -1,3 +1,4 @@
+from io import BytesIO
 from unittest.mock import MagicMock
 
 import pytest
@@ -6,6 +7,7 @@ from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
 from rest_framework import status
 from rest_framework.test import APIClient
+from utils.s3_transfers import transfer_config
 
 
 @pytest.fixture
@@ -31,6 +33,7 @@ class TestCreateDrinkSuccess:
         path: str,
         post_data: dict,
         upload_fileobj: MagicMock,
+        image_hash: str,
     ) -> None:
         pre_create_count = DrinkModel.objects.count()
 
@@ -39,20 +42,64 @@ class TestCreateDrinkSuccess:
             encode_multipart(BOUNDARY, post_data),
             content_type=MULTIPART_CONTENT,
             follow=False,
-            **auth_headers
+            **auth_headers,
         )
 
         assert response.status_code == status.HTTP_201_CREATED
-        assert DrinkModel.objects.latest("pk").photo == "cookers/1/drinks/test.jpg"
-        upload_fileobj.assert_called_once()
+        assert (
+            DrinkModel.objects.latest("pk").photo
+            == f"cookers/1/drinks/{image_hash}/original.jpg"
+        )
         post_create_count = DrinkModel.objects.count()
 
         assert post_create_count - pre_create_count == 1
-        assert len(upload_fileobj.call_args.args) == 3
+        assert [upload.args[1:] for upload in upload_fileobj.call_args_list] == [
+            ("reats-dev-bucket", f"cookers/1/drinks/{image_hash}/{name}")
+            for name in ["original.jpg", "large.webp", "medium.webp", "thumbnail.webp"]
+        ]
+        assert upload_fileobj.call_args_list[0].kwargs == {
+            "ExtraArgs": {
+                "ContentType": "image/jpeg",
+                "CacheControl": "public, max-age=31536000, immutable",
+            },
+            "Config": transfer_config,
+        }
+        assert upload_fileobj.call_args.kwargs == {
+            "ExtraArgs": {
+                "ContentType": "image/webp",
+                "CacheControl": "public, max-age=31536000, immutable",
+            },
+            "Config": transfer_config,
+        }
+
+
+@pytest.mark.django_db
+class TestCreateDrinkFailedNotAnImage:
+    @pytest.fixture
+    def not_an_image(self) -> InMemoryUploadedFile:
+        return InMemoryUploadedFile(
+            BytesIO(b"%PDF-1.4"), None, "test.jpg", "image/jpeg", 8, None
+        )
+
+    def test_response(
+        self,
+        auth_headers: dict,
+        client: APIClient,
+        not_an_image: InMemoryUploadedFile,
+        path: str,
+        post_data: dict,
+        upload_fileobj: MagicMock,
+    ) -> None:
+        pre_create_count = DrinkModel.objects.count()
 
-        arg1, arg2, arg3 = upload_fileobj.call_args.args
+        response = client.post(
+            path,
+            encode_multipart(BOUNDARY, {**post_data, "photo": not_an_image}),
+            content_type=MULTIPART_CONTENT,
+            follow=False,
+            **auth_headers,
+        )
 
-        assert isinstance(arg1, InMemoryUploadedFile)
-        assert arg1.name == "test.jpg"
-        assert arg2 == "reats-dev-bucket"
-        assert arg3 == "cookers/1/drinks/test.jpg"
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert DrinkModel.objects.count() == pre_create_count
+        upload_fileobj.assert_not_called()
@@ -79,11 +79,12 @@ class TestUpdateDrinkWithPhotoSuccess:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         drink_id: int,
         path: str,
         post_data_with_photo: dict,
         upload_fileobj: MagicMock,
+        image_hash: str,
     ) -> None:
         with freeze_time("2023-10-14T22:00:00+00:00"):
             response = client.put(
@@ -103,22 +104,25 @@ class TestUpdateDrinkWithPhotoSuccess:
             assert drink_object.name == "New name"
             assert drink_object.price == 3.0
             assert drink_object.is_enabled is True
-            assert drink_object.photo == "cookers/1/drinks/test.jpg"
+            assert drink_object.photo == f"cookers/1/drinks/{image_hash}/original.jpg"
             assert drink_object.modified.isoformat() == "2023-10-14T22:00:00+00:00"
 
-            upload_fileobj.assert_called_once()
-            assert len(upload_fileobj.call_args.args) == 3
-
-            arg1, arg2, arg3 = upload_fileobj.call_args.args
-
-            assert isinstance(arg1, InMemoryUploadedFile)
-            assert arg1.name == "test.jpg"
-            assert arg2 == "reats-dev-bucket"
-            assert arg3 == "cookers/1/drinks/test.jpg"
-
-            delete_object.assert_called_once_with(
+            assert [upload.args[1:] for upload in upload_fileobj.call_args_list] == [
+                ("reats-dev-bucket", f"cookers/1/drinks/{image_hash}/{name}")
+                for name in [
+                    "original.jpg",
+                    "large.webp",
+                    "medium.webp",
+                    "thumbnail.webp",
+                ]
+            ]
+
+            delete_objects.assert_called_once_with(
                 Bucket="reats-dev-bucket",
-                Key="cookers/1/drinks/gingembre.jpg",
+                Delete={
+                    "Objects": [{"Key": "cookers/1/drinks/gingembre.jpg"}],
+                    "Quiet": True,
+                },
             )
 
 
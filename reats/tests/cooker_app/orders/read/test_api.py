@@ -1,5 +1,5 @@
 import pytest
-from core_app.models import OrderModel
+from core_app.models import OrderEventModel, OrderModel
 from deepdiff import DeepDiff
 from freezegun import freeze_time
 from rest_framework import status
@@ -472,3 +472,69 @@ def test_orders_list_success_with_no_filters(
     diff = DeepDiff(response.json().get("data"), expected_data, ignore_order=True)
 
     assert not diff
+
+
+@pytest.mark.django_db
+def test_order_events_success(
+    auth_headers: dict,
+    client: APIClient,
+    cookers_order_path: str,
+) -> None:
+    order: OrderModel = OrderModel.objects.get(pk=9)
+
+    with freeze_time("2024-12-11T21:00:00Z"):
+        order.transition_to(OrderStatusEnum.PROCESSING)
+
+    with freeze_time("2024-12-11T21:20:00Z"):
+        order.transition_to(OrderStatusEnum.COMPLETED)
+
+    response = client.get(
+        f"{cookers_order_path}{order.pk}/events/",
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "ok": True,
+        "status_code": status.HTTP_200_OK,
+        "data": [
+            {
+                "previous_status": "pending",
+                "status": "processing",
+                "created": "2024-12-11T21:00:00Z",
+            },
+            {
+                "previous_status": "processing",
+                "status": "completed",
+                "created": "2024-12-11T21:20:00Z",
+            },
+        ],
+    }
+
+    # Events are append-only
+    event: OrderEventModel = order.events.first()
+    event.status = OrderStatusEnum.DELIVERED
+    with pytest.raises(ValueError):
+        event.save()
+
+
+@pytest.mark.django_db
+def test_order_events_of_another_cooker_are_not_returned(
+    auth_headers: dict,
+    client: APIClient,
+    cookers_order_path: str,
+) -> None:
+    order: OrderModel = OrderModel.objects.get(pk=1)
+    assert order.cooker_id != 1
+
+    order.transition_to(OrderStatusEnum.PROCESSING)
+
+    response = client.get(
+        f"{cookers_order_path}{order.pk}/events/",
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get("data") == []
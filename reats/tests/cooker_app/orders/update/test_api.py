@@ -9,6 +9,7 @@ from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
 from freezegun import freeze_time
 from rest_framework import status
 from rest_framework.test import APIClient
+from utils.common import update_cookers_acceptance_rates
 from utils.enums import OrderStatusEnum
 
 # Add this line to ignore E501 errors
@@ -576,3 +577,59 @@ def test_update_cooker_acceptance_rate(
             amount=2319,
             payment_intent="pi_3Q6VU7EEYeaFww1W0xCZEUxw",
         )
+
+
+@pytest.mark.django_db
+@freeze_time("2024-05-08T10:41:00+00:00")
+def test_update_cookers_acceptance_rates_in_batch(django_assert_num_queries) -> None:
+    CookerModel.objects.filter(id=2).update(acceptance_rate=5.0)
+    CookerModel.objects.filter(id=3).update(acceptance_rate=50.0)
+    untouched_cooker: CookerModel = CookerModel.objects.get(id=4)
+
+    with django_assert_num_queries(1):
+        updated_cookers_number = update_cookers_acceptance_rates(
+            [
+                (1, OrderStatusEnum.DELIVERED),
+                (2, OrderStatusEnum.CANCELLED_BY_COOKER),
+                (3, OrderStatusEnum.CANCELLED_BY_COOKER),
+                (3, OrderStatusEnum.CANCELLED_BY_COOKER),
+                (3, OrderStatusEnum.DELIVERED),
+                (4, OrderStatusEnum.PROCESSING),
+            ]
+        )
+
+    assert updated_cookers_number == 3
+    assert dict(
+        CookerModel.objects.filter(id__in=[1, 2, 3, 4]).values_list(
+            "id", "acceptance_rate"
+        )
+    ) == {1: 100.0, 2: 0.0, 3: 32.0, 4: untouched_cooker.acceptance_rate}
+    assert CookerModel.objects.get(id=3).last_acceptance_rate_update_date == datetime(
+        2024, 5, 8, 10, 41, 0, tzinfo=timezone.utc
+    )
+    assert (
+        CookerModel.objects.get(id=4).last_acceptance_rate_update_date
+        == untouched_cooker.last_acceptance_rate_update_date
+    )
+
+
+@pytest.mark.django_db
+def test_update_cookers_acceptance_rates_clamps_each_adjustment(settings) -> None:
+    settings.ACCEPTANCE_RATE_INCREASE_VALUE = 10
+    settings.ACCEPTANCE_RATE_DECREASE_VALUE = 10
+    CookerModel.objects.filter(id=1).update(acceptance_rate=95.0)
+    CookerModel.objects.filter(id=2).update(acceptance_rate=5.0)
+
+    update_cookers_acceptance_rates(
+        [
+            (1, OrderStatusEnum.DELIVERED),
+            (1, OrderStatusEnum.CANCELLED_BY_COOKER),
+            (2, OrderStatusEnum.CANCELLED_BY_COOKER),
+            (2, OrderStatusEnum.DELIVERED),
+        ]
+    )
+
+    # Same rates as when the adjustments are applied one after the other
+    assert dict(
+        CookerModel.objects.filter(id__in=[1, 2]).values_list("id", "acceptance_rate")
+    ) == {1: 90.0, 2: 10.0}
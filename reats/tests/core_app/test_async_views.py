@@ -0,0 +1,150 @@
+import asyncio
+import threading
+from time import monotonic, sleep
+from typing import Iterator
+from unittest.mock import DEFAULT, MagicMock
+
+import pytest
+from asgiref.sync import async_to_sync
+from core_app.models import CustomerModel
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
+from django.test import AsyncClient
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import resolve
+from rest_framework import status
+from utils.async_views import run_external_call
+from utils.postgresql_pool.base import pools
+
+
+@pytest.mark.parametrize(
+    "path, is_async",
+    [
+        ("/api/v1/customers/auth/", True),
+        ("/api/v1/cookers/otp/ask/", True),
+        ("/api/v1/delivers/auth/", True),
+        ("/api/v1/customers-dishes/", True),
+        ("/api/v1/customers-orders/", True),
+        ("/api/v1/dishes/", True),
+        ("/api/v1/customers-addresses/", False),
+    ],
+)
+def test_views_dispatch(path: str, is_async: bool) -> None:
+    assert asyncio.iscoroutinefunction(resolve(path).func) is is_async
+
+
+def test_external_calls_run_outside_of_the_event_loop_thread() -> None:
+    thread_name = async_to_sync(run_external_call)(
+        lambda: threading.current_thread().name
+    )
+
+    assert thread_name.startswith("external-calls")
+
+
+def test_external_calls_are_in_flight_together() -> None:
+    async def call_slow_services() -> list:
+        return await asyncio.gather(*(run_external_call(sleep, 0.2) for _ in range(50)))
+
+    start = monotonic()
+    async_to_sync(call_slow_services)()
+
+    assert monotonic() - start < 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dish_search_through_asgi(token_with_bearer: str) -> None:
+    response = async_to_sync(AsyncClient().get)(
+        "/api/v1/customers-dishes/", Authorization=token_with_bearer
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"ok": False, "status_code": status.HTTP_400_BAD_REQUEST}
+
+
+@pytest.fixture
+def e164_phone() -> str:
+    return "+33700000099"
+
+
+@pytest.fixture
+def pooled_database(settings, monkeypatch) -> Iterator:
+    """
+    Connections of the requests threads lent by a pool of 2
+    """
+    settings.DB_POOL_MAX_SIZE = 2
+    settings.DB_POOL_TIMEOUT = 0.5
+    monkeypatch.setitem(
+        connections.settings["default"], "ENGINE", "utils.postgresql_pool"
+    )
+    monkeypatch.setitem(connections.settings["default"], "CONN_MAX_AGE", 0)
+
+    yield
+
+    if "default" in pools:
+        pools.pop("default").close_idle_connections()
+
+
+async def post_through_asgi(path: str, data: dict, headers: dict) -> int:
+    """
+    Serve a request like the uvicorn worker, in a thread of its own
+    """
+    body = encode_multipart(BOUNDARY, data)
+    messages: list[dict] = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    await ASGIHandler()(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": path,
+            "query_string": b"",
+            "headers": [
+                (b"content-type", MULTIPART_CONTENT.encode()),
+                (b"content-length", str(len(body)).encode()),
+                *((name.encode(), value.encode()) for name, value in headers.items()),
+            ],
+        },
+        receive,
+        send,
+    )
+
+    return messages[0]["status"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_external_calls_do_not_hold_pooled_connections(
+    e164_phone: str,
+    pooled_database,
+    send_otp_message_success: MagicMock,
+    settings,
+) -> None:
+    def send_slowly(**kwargs) -> object:
+        sleep(1)  # Longer than DB_POOL_TIMEOUT
+        return DEFAULT
+
+    CustomerModel.objects.create(
+        firstname="Adam", lastname="Smith", phone=e164_phone, is_activated=True
+    )
+    send_otp_message_success.side_effect = send_slowly
+    settings.OTP_PHONE_BUCKET_CAPACITY = 6
+    headers = {"x-api-key": settings.CUSTOMER_APP_API_KEY, "app-origin": "customer"}
+
+    async def ask_otps() -> list[int]:
+        return await asyncio.gather(
+            *(
+                post_through_asgi(
+                    "/api/v1/customers/otp/ask/", {"phone": "0700000099"}, headers
+                )
+                for _ in range(6)
+            )
+        )
+
+    # Without a calling sync thread, like uvicorn, each request has a thread
+    assert asyncio.run(ask_otps()) == [status.HTTP_200_OK] * 6
+    assert send_otp_message_success.call_count == 6
+    assert pools["default"].get_metrics()["size"] <= 2
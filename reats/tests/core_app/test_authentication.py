@@ -0,0 +1,89 @@
+from time import time
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from utils.authentication import VerifiedTokenCache, verified_tokens
+
+
+@pytest.fixture
+def empty_verified_tokens() -> None:
+    verified_tokens.clear()
+
+
+@pytest.mark.django_db
+def test_token_signature_verified_once(
+    auth_headers: dict,
+    client: APIClient,
+    empty_verified_tokens: None,
+) -> None:
+    with patch.object(
+        JWTStatelessUserAuthentication,
+        "get_validated_token",
+        autospec=True,
+        side_effect=JWTStatelessUserAuthentication.get_validated_token,
+    ) as get_validated_token:
+        for _ in range(3):
+            response = client.get(
+                "/api/v1/customers-addresses/", follow=False, **auth_headers
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+    assert get_validated_token.call_count == 1
+    assert len(verified_tokens) == 1
+
+
+@pytest.mark.django_db
+def test_invalid_token_is_not_cached(
+    client: APIClient,
+    empty_verified_tokens: None,
+) -> None:
+    response = client.get(
+        "/api/v1/customers-addresses/",
+        follow=False,
+        HTTP_AUTHORIZATION="Bearer not-a-token",
+    )
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert len(verified_tokens) == 0
+
+
+def test_verified_token_cache_bounds_and_expiry() -> None:
+    cache = VerifiedTokenCache(max_size=2)
+    tokens = {
+        raw_token: AccessToken(verify=False, token=None)
+        for raw_token in (b"first", b"second", b"third", b"expired")
+    }
+
+    for raw_token, token in tokens.items():
+        token["exp"] = int(time()) + 60
+
+    tokens[b"expired"]["exp"] = int(time()) - 1
+
+    cache.set(b"first", tokens[b"first"])
+    cache.set(b"second", tokens[b"second"])
+    assert cache.get(b"first") is tokens[b"first"]
+
+    # "second" is the least recently used entry
+    cache.set(b"third", tokens[b"third"])
+    assert cache.get(b"second") is None
+    assert cache.get(b"first") is tokens[b"first"]
+    assert cache.get(b"third") is tokens[b"third"]
+
+    cache.set(b"expired", tokens[b"expired"])
+    assert cache.get(b"expired") is None
+    assert len(cache) == 1
+
+
+def test_benchmark_authentication_command(capsys) -> None:
+    call_command("benchmark_authentication", "--requests", "5")
+
+    output = capsys.readouterr().out
+
+    assert "double verification" in output
+    assert "single verification" in output
+    assert "cached verification" in output
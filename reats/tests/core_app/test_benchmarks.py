@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from core_app.models import CookerModel, DishModel, OrderModel
+from utils.benchmarks.dataset import get_dataset_sizes, seed_dataset
+from utils.benchmarks.endpoints import (
+    BASELINE_PATH,
+    benchmark_endpoints,
+    compare_with_baseline,
+    get_context,
+    get_router_endpoints,
+    get_scenarios_endpoints,
+)
+from utils.benchmarks.stand_ins import external_services_stand_ins
+from utils.enums import OrderStatusEnum
+
+BENCHMARK_SCALE = 0.001
+
+
+@pytest.fixture
+def benchmark_dataset() -> dict[str, int]:
+    counts = {
+        "cookers": CookerModel.objects.count(),
+        "dishes": DishModel.objects.count(),
+        "orders": OrderModel.objects.count(),
+    }
+    seed_dataset(BENCHMARK_SCALE)
+    return counts
+
+
+@pytest.mark.django_db
+def test_seed_dataset(benchmark_dataset: dict[str, int]) -> None:
+    sizes = get_dataset_sizes(BENCHMARK_SCALE)
+
+    assert (
+        CookerModel.objects.count() == benchmark_dataset["cookers"] + sizes["cookers"]
+    )
+    assert DishModel.objects.count() == benchmark_dataset["dishes"] + sizes["dishes"]
+    assert OrderModel.objects.count() == benchmark_dataset["orders"] + sizes["orders"]
+
+    context = get_context()
+    pending_order = OrderModel.objects.get(pk=context["pending_order_id"])
+
+    assert pending_order.status == OrderStatusEnum.PENDING
+    assert pending_order.cooker.in_flight_order_number > 0
+    assert (
+        OrderModel.objects.get(pk=context["delivered_order_id"]).status
+        == OrderStatusEnum.DELIVERED
+    )
+
+
+@pytest.mark.django_db
+def test_every_router_endpoint_is_benchmarked(benchmark_dataset) -> None:
+    assert get_scenarios_endpoints(get_context()) == get_router_endpoints()
+
+
+@pytest.mark.django_db
+def test_benchmark_endpoints_statuses(benchmark_dataset, tmp_path) -> None:
+    baseline = json.loads(BASELINE_PATH.read_text())["endpoints"]
+
+    with external_services_stand_ins(str(tmp_path)):
+        results = benchmark_endpoints(1)
+
+    assert {name: result["status"] for name, result in results.items()} == {
+        name: expected["status"] for name, expected in baseline.items()
+    }
+
+    for result in results.values():
+        assert result["queries"] > 0 or result["status"] >= 400
+        assert result["p50_ms"] > 0
+        assert result["peak_kb"] > 0
+
+
+def test_compare_with_baseline() -> None:
+    expected = {"status": 200, "p50_ms": 10, "p95_ms": 12, "queries": 3, "peak_kb": 500}
+    baseline = {"GET /api/v1/dishes/": expected}
+
+    assert (
+        compare_with_baseline({"GET /api/v1/dishes/": expected}, baseline, 0.5, 0.25)
+        == []
+    )
+    assert (
+        compare_with_baseline(
+            {"GET /api/v1/dishes/": {**expected, "p50_ms": 15.9, "peak_kb": 689}},
+            baseline,
+            0.5,
+            0.25,
+        )
+        == []
+    )
+    assert compare_with_baseline(
+        {
+            "GET /api/v1/dishes/": {
+                "status": 500,
+                "p50_ms": 17,
+                "p95_ms": 30,
+                "queries": 12,
+                "peak_kb": 700,
+            },
+            "GET /api/v1/new/": expected,
+        },
+        baseline,
+        0.5,
+        0.25,
+    ) == [
+        "GET /api/v1/dishes/: status 500 instead of 200",
+        "GET /api/v1/dishes/: 12 queries instead of 3",
+        "GET /api/v1/dishes/: 17 ms instead of 10 ms",
+        "GET /api/v1/dishes/: 700 KB allocated instead of 500 KB",
+    ]
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# The settings import boto3 for the CloudWatch logs handler
+HEAVY_MODULES = ["googlemaps", "stripe", "numpy", "scipy", "PIL"]
+
+BOOT_SCRIPT = f"""
+import sys
+
+import django
+
+django.setup()
+
+print([module for module in {HEAVY_MODULES} if module in sys.modules])
+
+import source.urls  # noqa: E402, imports the views of every app
+from utils.common import pinpoint_client  # noqa: E402
+from utils.distance_computer import google_map_client  # noqa: E402
+from utils.storage.base import storage  # noqa: E402
+from utils.storage.s3 import s3  # noqa: E402
+
+clients = (storage, s3, pinpoint_client, google_map_client)
+print([client.is_created for client in clients])
+"""
+
+OFFLINE_CLIENTS_SCRIPT = """
+import django
+
+django.setup()
+
+from utils.common import pinpoint_client  # noqa: E402
+from utils.distance_computer import google_map_client  # noqa: E402
+from utils.storage.base import storage  # noqa: E402
+from utils.storage.s3 import s3  # noqa: E402
+
+for client in (storage, s3, pinpoint_client, google_map_client):
+    client.get_client()
+"""
+
+
+def test_worker_boot_skips_heavy_imports() -> None:
+    result = subprocess.run(
+        [sys.executable, "-c", BOOT_SCRIPT],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parents[2],
+    )
+    assert result.returncode == 0, result.stderr
+
+    loaded_heavy_modules, clients_created = result.stdout.splitlines()[-2:]
+
+    # Heavy libraries are only imported along with the views using them
+    assert loaded_heavy_modules == "[]"
+    # API clients are created on first use, never while booting
+    assert clients_created == "[False, False, False, False]"
+
+
+def test_worker_boots_with_offline_secrets() -> None:
+    result = subprocess.run(
+        [sys.executable, "-c", OFFLINE_CLIENTS_SCRIPT],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parents[2],
+        env={**os.environ, "OFFLINE_SECRETS": "1"},
+    )
+    assert result.returncode == 0, result.stderr
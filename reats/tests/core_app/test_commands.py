@@ -0,0 +1,122 @@
+from io import StringIO
+
+import pytest
+from core_app.models import CookerModel, DeliverModel, OrderModel
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from utils.dispatcher import dispatch_completed_orders
+from utils.enums import OrderStatusEnum
+
+
+@pytest.mark.django_db
+def test_reconcile_in_flight_orders_command() -> None:
+    CookerModel.objects.update(in_flight_order_number=42)
+    out = StringIO()
+
+    call_command("reconcile_in_flight_orders", stdout=out)
+
+    assert f"{CookerModel.objects.count()} cookers" in out.getvalue()
+
+    for cooker in CookerModel.objects.all():
+        assert (
+            cooker.in_flight_order_number
+            == OrderModel.objects.filter(
+                cooker=cooker,
+                status__in=OrderStatusEnum.in_flight_statuses(),
+            ).count()
+        )
+
+
+@pytest.fixture
+def located_cookers_and_delivers() -> None:
+    # Cooker 1 and deliver 1 are in Evry, cooker 4 and deliver 2 in Corbeil
+    CookerModel.objects.filter(pk=1).update(latitude=48.6295, longitude=2.4411)
+    CookerModel.objects.filter(pk=4).update(latitude=48.6139, longitude=2.4820)
+    DeliverModel.objects.filter(pk=1).update(
+        is_online=True, latitude=48.6310, longitude=2.4400
+    )
+    DeliverModel.objects.filter(pk=2).update(
+        is_online=True, latitude=48.6120, longitude=2.4830
+    )
+
+
+@pytest.mark.django_db
+def test_dispatch_completed_orders_command(
+    located_cookers_and_delivers: None,
+) -> None:
+    out = StringIO()
+
+    call_command("dispatch_completed_orders", stdout=out)
+
+    assert "2 orders dispatched" in out.getvalue()
+
+    orders = OrderModel.objects.filter(status=OrderStatusEnum.COMPLETED)
+    assert {order.cooker_id: order.delivery_man_id for order in orders} == {
+        1: 1,
+        4: 2,
+    }
+    for order in orders:
+        assert 0 < order.delivery_initial_distance < 1000  # in meters
+
+    # Both delivery men are now busy, nothing left to dispatch
+    call_command("dispatch_completed_orders", stdout=out)
+
+    assert "0 orders dispatched" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_dispatch_completed_orders_locks_orders_and_delivers(
+    located_cookers_and_delivers: None,
+) -> None:
+    with CaptureQueriesContext(connection) as context:
+        dispatch_completed_orders()
+
+    locking_queries = [
+        query["sql"]
+        for query in context.captured_queries
+        if "FOR UPDATE" in query["sql"]
+    ]
+
+    # Concurrent runs skip the orders and delivery men being dispatched
+    assert len(locking_queries) == 2
+    assert 'FROM "orders"' in locking_queries[0]
+    assert 'FROM "delivers"' in locking_queries[1]
+    assert all("SKIP LOCKED" in sql for sql in locking_queries)
+
+
+@pytest.mark.django_db
+def test_dispatch_completed_orders_command_out_of_delivery_radius(
+    located_cookers_and_delivers: None,
+) -> None:
+    DeliverModel.objects.update(delivery_radius=0)
+    out = StringIO()
+
+    call_command("dispatch_completed_orders", stdout=out)
+
+    assert "0 orders dispatched" in out.getvalue()
+    assert not OrderModel.objects.filter(
+        status=OrderStatusEnum.COMPLETED, delivery_man__isnull=False
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_rebuild_rating_aggregates_command() -> None:
+    # Queryset updates bypass OrderModel.save, like the fixtures loading
+    OrderModel.objects.filter(cooker_id=4, delivery_man_id=1).update(rating=4.0)
+    OrderModel.objects.filter(cooker_id=1).update(rating=1.0)
+    CookerModel.objects.update(rating_sum=42.0, rating_count=42)
+    DeliverModel.objects.update(rating_sum=42.0, rating_count=42, grades=1.0)
+    out = StringIO()
+
+    call_command("rebuild_rating_aggregates", stdout=out)
+
+    assert f"{CookerModel.objects.count()} cookers" in out.getvalue()
+    assert {
+        cooker.id: (cooker.rating_sum, cooker.rating_count, cooker.rating)
+        for cooker in CookerModel.objects.filter(pk__in=[1, 2, 4])
+    } == {1: (9.0, 9, 1.0), 2: (0.0, 0, 0.0), 4: (8.0, 2, 4.0)}
+    assert {
+        deliver.id: (deliver.rating_sum, deliver.rating_count, deliver.grades)
+        for deliver in DeliverModel.objects.filter(pk__in=[1, 2])
+    } == {1: (8.0, 2, 4.0), 2: (0.0, 0, 0.0)}
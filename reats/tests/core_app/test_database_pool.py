@@ -0,0 +1,116 @@
+from threading import Thread
+from time import sleep
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+from utils.postgresql_pool.base import (
+    ConnectionPool,
+    DatabaseWrapper,
+    PoolTimeout,
+    pools,
+)
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.closed = 0
+        self.info = SimpleNamespace(transaction_status=TRANSACTION_STATUS_IDLE)
+
+    def rollback(self) -> None:
+        self.info.transaction_status = TRANSACTION_STATUS_IDLE
+
+    def close(self) -> None:
+        self.closed = 1
+
+
+def test_pool_reuses_connections() -> None:
+    pool = ConnectionPool(max_size=2, timeout=1, health_check_age=60)
+
+    first_connection = pool.get_connection(FakeConnection)
+    assert pool.get_metrics() == {
+        "max_size": 2,
+        "size": 1,
+        "in_use": 1,
+        "idle": 0,
+        "waiting": 0,
+        "created": 1,
+    }
+
+    pool.put_connection(first_connection)
+    assert pool.get_connection(FakeConnection) is first_connection
+    assert pool.get_metrics()["created"] == 1
+
+
+def test_pool_rolls_back_given_back_transactions() -> None:
+    pool = ConnectionPool(max_size=1, timeout=1, health_check_age=60)
+    fake_connection = pool.get_connection(FakeConnection)
+    fake_connection.info.transaction_status = TRANSACTION_STATUS_INTRANS
+
+    pool.put_connection(fake_connection)
+
+    assert fake_connection.info.transaction_status == TRANSACTION_STATUS_IDLE
+    assert pool.get_metrics()["idle"] == 1
+
+
+def test_pool_replaces_closed_connections() -> None:
+    pool = ConnectionPool(max_size=1, timeout=1, health_check_age=60)
+    first_connection = pool.get_connection(FakeConnection)
+    pool.put_connection(first_connection)
+    first_connection.close()
+
+    second_connection = pool.get_connection(FakeConnection)
+
+    assert second_connection is not first_connection
+    assert pool.get_metrics()["size"] == 1
+    assert pool.get_metrics()["created"] == 2
+
+
+def test_full_pool_waits_for_a_connection() -> None:
+    pool = ConnectionPool(max_size=1, timeout=5, health_check_age=60)
+    first_connection = pool.get_connection(FakeConnection)
+
+    def give_back() -> None:
+        while pool.get_metrics()["waiting"] == 0:
+            sleep(0.01)
+        pool.put_connection(first_connection)
+
+    thread = Thread(target=give_back)
+    thread.start()
+    assert pool.get_connection(FakeConnection) is first_connection
+    thread.join()
+
+
+def test_full_pool_times_out() -> None:
+    pool = ConnectionPool(max_size=1, timeout=0.05, health_check_age=60)
+    pool.get_connection(FakeConnection)
+
+    with pytest.raises(PoolTimeout):
+        pool.get_connection(FakeConnection)
+
+    assert pool.get_metrics()["waiting"] == 0
+
+
+@pytest.mark.django_db
+def test_pooled_backend_gives_connections_back(settings) -> None:
+    settings.DB_POOL_MAX_SIZE = 1
+    wrapper = DatabaseWrapper({**connection.settings_dict}, alias="pool_test")
+
+    try:
+        for _ in range(3):
+            with wrapper.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                assert cursor.fetchone() == (1,)
+            wrapper.close()
+
+        assert pools["pool_test"].get_metrics()["created"] == 1
+        assert pools["pool_test"].get_metrics()["idle"] == 1
+    finally:
+        pools.pop("pool_test").close_idle_connections()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_database_connections_command() -> None:
+    call_command("benchmark_database_connections", requests=8, threads=2)
@@ -11,3 +11,4 @@ class HealthCheckTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("status", response.data)
         self.assertIn("database", response.data)
+        self.assertIn("photo_transfers", response.data)
@@ -0,0 +1,82 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image, UnidentifiedImageError
+from utils.images import (
+    get_original_photo_key,
+    get_photo_keys,
+    get_photo_variant_key,
+    process_photo,
+)
+
+
+@pytest.fixture
+def phone_photo() -> BytesIO:
+    # Noise compresses like a real photo, unlike a plain color
+    photo = Image.effect_noise((4032, 3024), 64).convert("RGB")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotated 90 degrees
+    exif[0x010F] = "Phone maker"
+    photo_io = BytesIO()
+    photo.save(photo_io, "JPEG", quality=95, exif=exif)
+    photo_io.seek(0)
+
+    return photo_io
+
+
+def test_process_photo(phone_photo: BytesIO) -> None:
+    original_size = len(phone_photo.getvalue())
+
+    renditions = process_photo(phone_photo)
+
+    assert set(renditions) == {
+        "original.jpg",
+        "thumbnail.webp",
+        "medium.webp",
+        "large.webp",
+    }
+    assert renditions["original.jpg"][1] == "image/jpeg"
+    assert renditions["medium.webp"][1] == "image/webp"
+
+    for name, expected_size in [
+        ("original.jpg", (1536, 2048)),
+        ("large.webp", (960, 1280)),
+        ("medium.webp", (480, 640)),
+        ("thumbnail.webp", (192, 256)),
+    ]:
+        with Image.open(BytesIO(renditions[name][0])) as rendition:
+            assert rendition.size == expected_size  # Portrait, from the orientation
+            assert not rendition.getexif()
+
+    assert len(renditions["medium.webp"][0]) * 10 < original_size
+
+
+def test_process_photo_rejects_other_files() -> None:
+    with pytest.raises(UnidentifiedImageError):
+        process_photo(BytesIO(b"not an image"))
+
+
+def test_photo_keys() -> None:
+    photo_key = "cookers/1/dishes/dish/test/original.jpg"
+
+    assert (
+        get_photo_variant_key(photo_key, "thumbnail")
+        == "cookers/1/dishes/dish/test/thumbnail.webp"
+    )
+    assert get_photo_keys(photo_key) == [
+        "cookers/1/dishes/dish/test/original.jpg",
+        "cookers/1/dishes/dish/test/thumbnail.webp",
+        "cookers/1/dishes/dish/test/medium.webp",
+        "cookers/1/dishes/dish/test/large.webp",
+    ]
+    assert all(
+        get_original_photo_key(key) == photo_key for key in get_photo_keys(photo_key)
+    )
+
+
+def test_photo_keys_uploaded_without_renditions() -> None:
+    photo_key = "cookers/1/dishes/dish/poulet-braise.jpg"
+
+    assert get_photo_variant_key(photo_key, "thumbnail") == photo_key
+    assert get_photo_keys(photo_key) == [photo_key]
+    assert get_original_photo_key(photo_key) == photo_key
@@ -0,0 +1,39 @@
+import pytest
+from core_app.models import CookerModel, OrderModel
+from utils.enums import OrderStatusEnum
+
+
+def get_in_flight_order_number(order: OrderModel) -> int:
+    return CookerModel.objects.get(pk=order.cooker_id).in_flight_order_number
+
+
+@pytest.mark.django_db
+def test_deleted_order_leaves_the_in_flight_orders() -> None:
+    order = OrderModel.objects.filter(status=OrderStatusEnum.PENDING).first()
+    CookerModel.objects.filter(pk=order.cooker_id).update(in_flight_order_number=3)
+
+    order.delete()
+
+    assert get_in_flight_order_number(order) == 2
+
+
+@pytest.mark.django_db
+def test_full_cooker_rejects_paid_orders() -> None:
+    order = OrderModel.objects.filter(status=OrderStatusEnum.DRAFT).first()
+    CookerModel.objects.filter(pk=order.cooker_id).update(
+        in_flight_order_number=2, max_order_number=2
+    )
+
+    with pytest.raises(ValueError):
+        order.transition_to(OrderStatusEnum.PENDING)
+
+    order.refresh_from_db()
+    assert order.status == OrderStatusEnum.DRAFT
+    assert get_in_flight_order_number(order) == 2
+
+    CookerModel.objects.filter(pk=order.cooker_id).update(max_order_number=3)
+    order.transition_to(OrderStatusEnum.PENDING)
+
+    order.refresh_from_db()
+    assert order.status == OrderStatusEnum.PENDING
+    assert get_in_flight_order_number(order) == 3
@@ -0,0 +1,120 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from core_app.models import OtpSendModel, OtpThrottleBucketModel
+from django.core.management import call_command
+from freezegun import freeze_time
+from utils.otp_throttling import OtpSendStore, TokenBucketStore
+
+
+@pytest.mark.django_db
+def test_token_bucket_refills_over_time(django_assert_num_queries) -> None:
+    buckets = TokenBucketStore()
+
+    with freeze_time("2024-05-08T10:00:00Z") as frozen_time:
+        assert buckets.consume("ip:127.0.0.1", 2, 60) == 0
+        assert buckets.consume("ip:127.0.0.1", 2, 60) == 0
+        assert buckets.consume("ip:127.0.0.1", 2, 60) == 60
+
+        # The local copy has no token left, the database is not reached
+        with django_assert_num_queries(0):
+            assert buckets.consume("ip:127.0.0.1", 2, 60) == 60
+
+        frozen_time.tick(timedelta(seconds=30))
+        assert buckets.consume("ip:127.0.0.1", 2, 60) == 30
+
+        frozen_time.tick(timedelta(seconds=30))
+        assert buckets.consume("ip:127.0.0.1", 2, 60) == 0
+
+    assert OtpThrottleBucketModel.objects.get(key="ip:127.0.0.1").tokens == 0
+
+
+@pytest.mark.django_db
+def test_token_bucket_is_shared_between_processes() -> None:
+    first_process_buckets = TokenBucketStore()
+    second_process_buckets = TokenBucketStore()
+
+    with freeze_time("2024-05-08T10:00:00Z"):
+        assert first_process_buckets.consume("phone:+33700000003", 1, 300) == 0
+        assert second_process_buckets.consume("phone:+33700000003", 1, 300) == 300
+
+
+@pytest.mark.django_db
+def test_otp_send_deduplication_window() -> None:
+    sends = OtpSendStore()
+
+    with freeze_time("2024-05-08T10:00:00Z") as frozen_time:
+        assert not sends.is_recently_sent("+33700000003", timedelta(minutes=10))
+
+        sends.mark_sent("+33700000003")
+        assert sends.is_recently_sent("+33700000003", timedelta(minutes=10))
+
+        # Another process only sees the database row
+        assert OtpSendStore().is_recently_sent("+33700000003", timedelta(minutes=10))
+
+        frozen_time.tick(timedelta(minutes=10))
+        assert not sends.is_recently_sent("+33700000003", timedelta(minutes=10))
+
+    assert OtpSendModel.objects.filter(phone="+33700000003").count() == 1
+
+
+@pytest.mark.django_db
+def test_otp_send_is_cleared_once_used() -> None:
+    first_process_sends = OtpSendStore()
+    second_process_sends = OtpSendStore()
+
+    with freeze_time("2024-05-08T10:00:00Z") as frozen_time:
+        first_process_sends.mark_sent("+33700000003")
+        assert second_process_sends.is_recently_sent(
+            "+33700000003", timedelta(minutes=10)
+        )
+
+        first_process_sends.mark_used("+33700000003")
+        assert not first_process_sends.is_recently_sent(
+            "+33700000003", timedelta(minutes=10)
+        )
+
+        # The local copy of the other process is only trusted for a while
+        frozen_time.tick(OtpSendStore.local_ttl)
+        assert not second_process_sends.is_recently_sent(
+            "+33700000003", timedelta(minutes=10)
+        )
+
+    assert not OtpSendModel.objects.filter(phone="+33700000003").exists()
+
+
+@pytest.mark.django_db
+def test_delete_expired_otp_rows() -> None:
+    buckets = TokenBucketStore()
+    sends = OtpSendStore()
+
+    with freeze_time("2024-05-08T10:00:00Z") as frozen_time:
+        buckets.consume("ip:127.0.0.1", 2, 60)
+        sends.mark_sent("+33700000003")
+
+        frozen_time.tick(timedelta(minutes=1))
+        buckets.consume("ip:127.0.0.2", 2, 60)
+        sends.mark_sent("+33700000004")
+
+        # The first bucket is full again and the first send is over
+        assert TokenBucketStore.delete_full(timedelta(seconds=60)) == 1
+        assert OtpSendStore.delete_expired(timedelta(minutes=1)) == 1
+        assert list(OtpThrottleBucketModel.objects.values_list("key", flat=True)) == [
+            "ip:127.0.0.2"
+        ]
+        assert list(OtpSendModel.objects.values_list("phone", flat=True)) == [
+            "+33700000004"
+        ]
+
+        frozen_time.tick(timedelta(days=1))
+        buckets.consume("ip:127.0.0.3", 2, 60)
+        sends.mark_sent("+33700000005")
+        call_command("delete_expired_otp_rows", stdout=StringIO())
+
+    assert list(OtpThrottleBucketModel.objects.values_list("key", flat=True)) == [
+        "ip:127.0.0.3"
+    ]
+    assert list(OtpSendModel.objects.values_list("phone", flat=True)) == [
+        "+33700000005"
+    ]
@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+from freezegun import freeze_time
+from utils.common import get_cached_pre_signed_url, get_photo_url
+
+
+def test_photo_urls_are_stable_behind_a_cdn(settings) -> None:
+    settings.PHOTO_URL_BASE = "https://photos.reats.fr"
+
+    assert (
+        get_photo_url("cookers/1/drinks/0a1b/original.jpg", "medium")
+        == "https://photos.reats.fr/cookers/1/drinks/0a1b/medium.webp"
+    )
+
+
+def test_pre_signed_photo_urls_are_reused(settings) -> None:
+    settings.PHOTO_URL_BASE = ""
+    get_cached_pre_signed_url.cache_clear()
+
+    with patch(
+        "utils.common.get_pre_signed_url",
+        side_effect=lambda key, expires_in: f"{key}?{len(urls)}",
+    ) as get_pre_signed_url:
+        urls = []
+
+        with freeze_time("2023-10-14T01:00:00+00:00"):
+            urls.append(get_photo_url("cookers/1/drinks/0a1b/original.jpg", "medium"))
+        with freeze_time("2023-10-14T11:00:00+00:00"):
+            urls.append(get_photo_url("cookers/1/drinks/0a1b/original.jpg", "medium"))
+        with freeze_time("2023-10-14T13:00:00+00:00"):
+            urls.append(get_photo_url("cookers/1/drinks/0a1b/original.jpg", "medium"))
+
+    assert urls == [
+        "cookers/1/drinks/0a1b/medium.webp?0",
+        "cookers/1/drinks/0a1b/medium.webp?0",
+        "cookers/1/drinks/0a1b/medium.webp?2",
+    ]
+    assert get_pre_signed_url.call_count == 2
+    assert get_pre_signed_url.call_args.kwargs == {"expires_in": 24 * 60 * 60}
@@ -0,0 +1,170 @@
+import re
+from io import StringIO
+
+import pytest
+from core_app.models import (
+    AddressModel,
+    CookerModel,
+    CustomerModel,
+    DishModel,
+    OrderModel,
+)
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Model
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+SEEDED_CUSTOMERS_NUMBER = 2_000
+SEEDED_COOKERS_NUMBER = 2_000
+SEEDED_ROWS_NUMBER = 20_000
+
+SEQUENTIAL_SCAN_PATTERN = re.compile(
+    r"Seq Scan on (orders|dishes|addresses|customers|cookers|cookers_daily_rollups)\b"
+)
+
+
+def duplicate_rows(
+    model: type[Model],
+    template_pk: int,
+    rows_number: int,
+    overrides: dict[str, str],
+) -> int:
+    """
+    Duplicate a row on the database side, overriding some columns with SQL
+    expressions of the series index `i`.
+
+    :return: the id of the first inserted row
+    """
+    table = model._meta.db_table
+    columns = [
+        field.column for field in model._meta.concrete_fields if not field.primary_key
+    ]
+    select = ", ".join(overrides.get(column, column) for column in columns)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"SELECT {select} FROM {table}, generate_series(1, %s) AS i "
+            "WHERE id = %s RETURNING id",
+            [rows_number, template_pk],
+        )
+        return cursor.fetchone()[0]
+
+
+@pytest.fixture
+def large_dataset() -> None:
+    first_customer_id = duplicate_rows(
+        CustomerModel,
+        1,
+        SEEDED_CUSTOMERS_NUMBER,
+        {"phone": "'+1' || lpad(i::text, 10, '0')"},
+    )
+    first_cooker_id = duplicate_rows(
+        CookerModel,
+        1,
+        SEEDED_COOKERS_NUMBER,
+        {
+            "phone": "'+1' || lpad(i::text, 10, '0')",
+            "siret": "'9' || lpad(i::text, 13, '0')",
+            "postal_code": "lpad(mod(i * 37, 100000)::text, 5, '0')",
+        },
+    )
+    customer_id = f"{first_customer_id} + mod(i, {SEEDED_CUSTOMERS_NUMBER})"
+    cooker_id = f"{first_cooker_id} + mod(i, {SEEDED_COOKERS_NUMBER})"
+    created = "now() - mod(i, 1000) * interval '1 day'"
+
+    duplicate_rows(
+        AddressModel,
+        1,
+        SEEDED_ROWS_NUMBER,
+        {"customer_id": customer_id},
+    )
+    duplicate_rows(
+        DishModel,
+        1,
+        SEEDED_ROWS_NUMBER,
+        {"cooker_id": cooker_id, "name": "'dish ' || i"},
+    )
+    duplicate_rows(
+        OrderModel,
+        9,
+        SEEDED_ROWS_NUMBER,
+        {
+            "customer_id": customer_id,
+            "cooker_id": cooker_id,
+            "delivery_man_id": "CASE WHEN mod(i, 10) = 0 THEN 2 END",
+            "status": "(ARRAY['pending', 'processing', 'completed', 'delivered', "
+            "'cancelled_by_customer', 'cancelled_by_cooker'])[1 + mod(i, 6)]",
+            "created": created,
+            "modified": created,
+        },
+    )
+
+    # Inserted rows bypass OrderModel.save, so rollups are computed afterwards
+    call_command("rebuild_cooker_daily_rollups", stdout=StringIO())
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "path,query_parameters,expected_sql",
+    [
+        ("/api/v1/customers-orders/", {"status": "pending"}, []),
+        ("/api/v1/customers-orders-history/", {}, []),
+        ("/api/v1/customers-addresses/", {}, []),
+        (
+            "/api/v1/customers-dishes/",
+            {"search_address_id": 1, "delivery_mode": "now"},
+            ['"cookers"."postal_code"::text LIKE', '"dishes"."cooker_id" IN'],
+        ),
+        ("/api/v1/cookers-orders/", {"status": "pending"}, []),
+        ("/api/v1/cookers-orders-history/", {}, []),
+        (
+            "/api/v1/cookers-dashboard/",
+            {"start_date": "2024-12-11T20:00:00Z", "end_date": "2024-12-12T10:00:00Z"},
+            ['FROM "orders"'],
+        ),
+        (
+            "/api/v1/cookers-dashboard/",
+            {"start_date": "2024-01-01T08:00:00Z", "end_date": "2024-12-12T10:00:00Z"},
+            ['FROM "cookers_daily_rollups"', 'FROM "orders"'],
+        ),
+        ("/api/v1/dishes/", {}, []),
+        (
+            "/api/v1/delivers-stats/",
+            {"start_date": "2024-01-01", "end_date": "2024-12-31"},
+            [],
+        ),
+        ("/api/v1/delivers-history/", {}, []),
+    ],
+)
+def test_list_endpoints_do_not_scan_large_tables(
+    auth_headers: dict,
+    client: APIClient,
+    large_dataset: None,
+    path: str,
+    query_parameters: dict,
+    expected_sql: list[str],
+) -> None:
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(path, query_parameters, follow=False, **auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+
+    # The queries the indexes are for have to be run, not skipped
+    for sql in expected_sql:
+        assert any(sql in query["sql"] for query in context.captured_queries), sql
+
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            if not query["sql"].startswith("SELECT"):
+                continue
+
+            cursor.execute(f"EXPLAIN {query['sql']}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+
+            assert not SEQUENTIAL_SCAN_PATTERN.search(plan), f"{query['sql']}\n{plan}"
@@ -0,0 +1,40 @@
+import pytest
+from core_app.models import CookerModel, DeliverModel, OrderModel
+
+
+def get_ratings() -> tuple:
+    cooker = CookerModel.objects.get(pk=4)
+    deliver = DeliverModel.objects.get(pk=1)
+
+    return (
+        (cooker.rating_sum, cooker.rating_count, cooker.rating),
+        (deliver.rating_sum, deliver.rating_count, deliver.grades),
+    )
+
+
+@pytest.mark.django_db
+def test_order_ratings_update_cooker_and_delivery_man_aggregates() -> None:
+    first_order, second_order = OrderModel.objects.filter(
+        cooker_id=4, delivery_man_id=1
+    ).order_by("pk")
+
+    first_order.rating = 4.0
+    first_order.save()
+    second_order.rating = 2.0
+    second_order.save()
+
+    assert get_ratings() == ((6.0, 2, 3.0), (6.0, 2, 3.0))
+
+    # Rated again
+    first_order.rating = 5.0
+    first_order.save()
+
+    assert get_ratings() == ((7.0, 2, 3.5), (7.0, 2, 3.5))
+
+    # Other fields only
+    first_order.comment = "Excellent"
+    first_order.save(update_fields=["comment"])
+    second_order.delete()
+
+    assert get_ratings() == ((5.0, 1, 5.0), (5.0, 1, 5.0))
+    assert CookerModel.objects.get(pk=1).rating_count == 0
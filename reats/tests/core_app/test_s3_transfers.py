@@ -0,0 +1,281 @@
+import threading
+from io import BytesIO
+from threading import Event
+from time import sleep
+from unittest.mock import MagicMock, patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from core_app.models import DishModel
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from rest_framework.exceptions import ValidationError
+from utils.common import (
+    aupload_photo,
+    clear_photo,
+    delete_photo,
+    delete_photo_if_unused,
+    photo_deletes,
+    photo_uploads,
+    upload_photo,
+)
+from utils.images import get_photo_keys
+from utils.s3_transfers import DeleteQueue, UploadExecutor
+
+
+@pytest.fixture
+def truncated_image(image: InMemoryUploadedFile) -> InMemoryUploadedFile:
+    content = image.file.getvalue()
+    image.file = BytesIO(content[: len(content) // 2])  # The header stays valid
+    image.size = len(image.file.getvalue())
+
+    return image
+
+
+@pytest.fixture
+def background_s3_transfers(settings) -> None:
+    settings.S3_UPLOADS_MAX_CONCURRENCY = 2
+    settings.S3_DELETES_FLUSH_INTERVAL = 60
+
+
+def test_photo_is_uploaded_after_the_response(
+    background_s3_transfers: None,
+    image: InMemoryUploadedFile,
+    image_hash: str,
+    upload_fileobj: MagicMock,
+) -> None:
+    can_upload = Event()
+    upload_threads = []
+
+    def slow_upload(*args, **kwargs) -> None:
+        can_upload.wait(5)
+        upload_threads.append(threading.current_thread().name)
+
+    upload_fileobj.side_effect = slow_upload
+
+    photo_key = upload_photo(image, "cookers/1/dishes/dish")
+    image.close()  # The uploaded file is removed with the request
+
+    assert photo_key == f"cookers/1/dishes/dish/{image_hash}/original.jpg"
+    assert not upload_threads
+
+    can_upload.set()
+    photo_uploads.join(timeout=5)
+
+    assert [upload.args[2] for upload in upload_fileobj.call_args_list] == [
+        f"cookers/1/dishes/dish/{image_hash}/{name}"
+        for name in ["original.jpg", "large.webp", "medium.webp", "thumbnail.webp"]
+    ]
+    assert all(name.startswith("s3-uploads") for name in upload_threads)
+
+
+def test_photo_failing_in_the_background_is_cleared(
+    background_s3_transfers: None,
+    truncated_image: InMemoryUploadedFile,
+    upload_fileobj: MagicMock,
+) -> None:
+    with patch("utils.common.clear_photo") as clear_photo:
+        photo_key = upload_photo(truncated_image, "cookers/1/dishes/dish")
+        photo_uploads.join(timeout=5)
+
+    clear_photo.assert_called_once_with(photo_key)
+    upload_fileobj.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_photo_failing_in_the_request_is_rejected(
+    truncated_image: InMemoryUploadedFile, upload_fileobj: MagicMock
+) -> None:
+    with pytest.raises(ValidationError):
+        upload_photo(truncated_image, "cookers/1/dishes/dish")
+
+    upload_fileobj.assert_not_called()
+
+
+def test_photo_failing_in_an_async_request_is_cleared_by_the_request(
+    truncated_image: InMemoryUploadedFile, upload_fileobj: MagicMock
+) -> None:
+    clear_threads = []
+
+    with patch(
+        "utils.common.clear_photo",
+        side_effect=lambda _: clear_threads.append(threading.current_thread().name),
+    ):
+        with pytest.raises(ValidationError):
+            async_to_sync(aupload_photo)(truncated_image, "cookers/1/dishes/dish")
+
+    # The external calls threads never query the database
+    assert len(clear_threads) == 1
+    assert not clear_threads[0].startswith("external-calls")
+    upload_fileobj.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_clear_photo() -> None:
+    dish = DishModel.objects.first()
+    cooker = dish.cooker
+    cooker.photo = dish.photo
+    cooker.save()
+
+    clear_photo(dish.photo)
+
+    dish.refresh_from_db()
+    cooker.refresh_from_db()
+    assert dish.photo == ""
+    assert cooker.photo == "cookers/1/profile_pics/default-profile-pic.jpg"
+
+
+def test_photo_already_stored_is_not_uploaded_again(
+    head_object: MagicMock,
+    image: InMemoryUploadedFile,
+    image_hash: str,
+    upload_fileobj: MagicMock,
+) -> None:
+    head_object.side_effect = None
+
+    photo_key = upload_photo(image, "cookers/1/drinks")
+
+    assert photo_key == f"cookers/1/drinks/{image_hash}/original.jpg"
+    head_object.assert_called_once_with(
+        Bucket="reats-dev-bucket",
+        Key=f"cookers/1/drinks/{image_hash}/thumbnail.webp",
+    )
+    upload_fileobj.assert_not_called()
+
+
+def test_photo_uploaded_again_is_not_deleted(
+    settings, image: InMemoryUploadedFile, upload_fileobj: MagicMock
+) -> None:
+    settings.S3_DELETES_FLUSH_INTERVAL = 60
+    photo_key = upload_photo(image, "cookers/1/drinks")
+
+    delete_photo(photo_key)
+    image.seek(0)
+    upload_photo(image, "cookers/1/drinks")
+
+    assert photo_deletes.get_metrics() == {"queued": 0}
+
+
+@pytest.mark.django_db
+def test_photo_shown_by_another_dish_is_not_deleted(settings) -> None:
+    settings.S3_DELETES_FLUSH_INTERVAL = 60
+    dish = DishModel.objects.first()
+    DishModel.objects.exclude(pk=dish.pk).filter(cooker=dish.cooker).update(
+        photo=dish.photo
+    )
+    DishModel.objects.filter(pk=dish.pk).update(photo="cookers/1/dishes/new.jpg")
+
+    delete_photo_if_unused(DishModel, dish.photo)
+    assert photo_deletes.get_metrics() == {"queued": 0}
+
+    DishModel.objects.filter(photo=dish.photo).update(photo="cookers/1/dishes/new.jpg")
+    delete_photo_if_unused(DishModel, dish.photo)
+    assert photo_deletes.get_metrics() == {"queued": 1}
+
+    photo_deletes.discard([dish.photo])
+
+
+def test_submissions_wait_for_a_pending_slot(settings) -> None:
+    settings.S3_UPLOADS_MAX_CONCURRENCY = 1
+    settings.S3_UPLOADS_MAX_PENDING = 1
+    executor = UploadExecutor(thread_name_prefix="test-uploads")
+    can_finish = Event()
+    submitted = Event()
+
+    executor.submit(can_finish.wait, 5)
+    thread = threading.Thread(
+        target=lambda: (executor.submit(lambda: None), submitted.set())
+    )
+    thread.start()
+
+    assert not submitted.wait(0.1)
+    assert executor.get_metrics() == {"max_concurrency": 1, "pending": 1}
+
+    can_finish.set()
+    thread.join(5)
+
+    assert submitted.is_set()
+
+
+def test_deletes_are_coalesced(settings) -> None:
+    settings.S3_DELETES_FLUSH_INTERVAL = 60
+    delete_batch = MagicMock()
+    delete_queue = DeleteQueue(delete_batch)
+
+    # Full batches wake the background thread up, it flushes once released
+    with delete_queue.condition:
+        delete_queue.put(["a/original.jpg", "a/medium.webp"])
+        delete_queue.put(["b/original.jpg", "a/original.jpg"])
+        delete_queue.put([f"c/{index}.jpg" for index in range(2200)])
+
+        assert delete_queue.get_metrics() == {"queued": 2203}
+
+        delete_queue.flush()
+
+    assert [len(batch.args[0]) for batch in delete_batch.call_args_list] == [
+        1000,
+        1000,
+        203,
+    ]
+    assert delete_batch.call_args_list[0].args[0][:3] == [
+        "a/original.jpg",
+        "a/medium.webp",
+        "b/original.jpg",
+    ]
+    assert delete_queue.get_metrics() == {"queued": 0}
+
+
+@pytest.mark.django_db
+def test_deletes_are_sent_by_the_background_thread(
+    settings, delete_objects: MagicMock
+) -> None:
+    settings.S3_DELETES_FLUSH_INTERVAL = 0.05
+    delete_queue = DeleteQueue(photo_deletes.delete_batch)
+
+    delete_queue.put(get_photo_keys("cookers/1/drinks/test/original.jpg"))
+
+    for _ in range(100):
+        if delete_objects.called:
+            break
+        sleep(0.02)
+
+    delete_objects.assert_called_once_with(
+        Bucket="reats-dev-bucket",
+        Delete={
+            "Objects": [
+                {"Key": "cookers/1/drinks/test/original.jpg"},
+                {"Key": "cookers/1/drinks/test/thumbnail.webp"},
+                {"Key": "cookers/1/drinks/test/medium.webp"},
+                {"Key": "cookers/1/drinks/test/large.webp"},
+            ],
+            "Quiet": True,
+        },
+    )
+
+
+@pytest.mark.django_db
+def test_photo_stored_again_is_not_deleted(delete_objects: MagicMock) -> None:
+    dish = DishModel.objects.first()
+    dish.photo = "cookers/1/dishes/dish/hash/original.jpg"
+    dish.save()
+    # Queued by a process before another one stored the same photo again
+    photo_keys = get_photo_keys(dish.photo) + get_photo_keys(
+        "cookers/1/dishes/dish/other/original.jpg"
+    )
+
+    photo_deletes.send(photo_keys)
+
+    delete_objects.assert_called_once_with(
+        Bucket="reats-dev-bucket",
+        Delete={
+            "Objects": [
+                {"Key": f"cookers/1/dishes/dish/other/{name}"}
+                for name in [
+                    "original.jpg",
+                    "thumbnail.webp",
+                    "medium.webp",
+                    "large.webp",
+                ]
+            ],
+            "Quiet": True,
+        },
+    )
@@ -0,0 +1,93 @@
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from cryptography.fernet import Fernet
+from freezegun import freeze_time
+from utils.get_secrets import REQUIRED_SECRETS, load_secrets
+
+SECRET_NAME = "reats-test-secrets"
+
+
+@pytest.fixture
+def remote_secrets() -> dict:
+    return {name: f"remote-{name.lower()}" for name in REQUIRED_SECRETS}
+
+
+@pytest.fixture
+def fetch_aws_secrets(remote_secrets: dict) -> MagicMock:
+    with patch(
+        "utils.get_secrets.fetch_aws_secrets", return_value=remote_secrets
+    ) as fetch_aws_secrets:
+        yield fetch_aws_secrets
+
+
+@pytest.fixture
+def secrets_environment(monkeypatch, tmp_path: Path) -> Path:
+    cache_path = tmp_path / "secrets-cache"
+
+    for name in REQUIRED_SECRETS:
+        monkeypatch.delenv(name, raising=False)
+
+    monkeypatch.delenv("OFFLINE_SECRETS", raising=False)
+    monkeypatch.setenv("SECRETS_CACHE_KEY", Fernet.generate_key().decode())
+    monkeypatch.setenv("SECRETS_CACHE_PATH", str(cache_path))
+    monkeypatch.setenv("SECRETS_CACHE_TTL", "3600")
+
+    return cache_path
+
+
+def test_remote_fetch_refreshes_the_local_cache(
+    fetch_aws_secrets: MagicMock,
+    remote_secrets: dict,
+    secrets_environment: Path,
+) -> None:
+    with freeze_time("2024-05-08T10:00:00Z") as frozen_time:
+        assert load_secrets(SECRET_NAME) == remote_secrets
+        assert secrets_environment.stat().st_mode & 0o777 == 0o600
+        assert b"remote-" not in secrets_environment.read_bytes()
+
+        # Next process starts read the encrypted cache file
+        assert load_secrets(SECRET_NAME) == remote_secrets
+        fetch_aws_secrets.assert_called_once_with(SECRET_NAME)
+
+        # Past its TTL, the cache file is ignored and rewritten
+        frozen_time.tick(timedelta(seconds=3601))
+        assert load_secrets(SECRET_NAME) == remote_secrets
+        assert fetch_aws_secrets.call_count == 2
+
+
+def test_unreadable_cache_falls_back_to_remote_fetch(
+    fetch_aws_secrets: MagicMock,
+    remote_secrets: dict,
+    secrets_environment: Path,
+) -> None:
+    secrets_environment.write_bytes(b"corrupted")
+
+    assert load_secrets(SECRET_NAME) == remote_secrets
+    fetch_aws_secrets.assert_called_once_with(SECRET_NAME)
+
+
+def test_environment_secrets_come_first(
+    fetch_aws_secrets: MagicMock,
+    secrets_environment: Path,
+    monkeypatch,
+) -> None:
+    for name in REQUIRED_SECRETS:
+        monkeypatch.setenv(name, f"env-{name.lower()}")
+
+    assert load_secrets(SECRET_NAME)["DJANGO_SECRET_KEY"] == "env-django_secret_key"
+    fetch_aws_secrets.assert_not_called()
+    assert not secrets_environment.exists()
+
+
+def test_offline_secrets_never_reach_aws(
+    fetch_aws_secrets: MagicMock,
+    secrets_environment: Path,
+    monkeypatch,
+) -> None:
+    monkeypatch.setenv("OFFLINE_SECRETS", "1")
+
+    assert set(load_secrets(SECRET_NAME)) == set(REQUIRED_SECRETS)
+    fetch_aws_secrets.assert_not_called()
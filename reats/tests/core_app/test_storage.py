@@ -0,0 +1,120 @@
+from io import BytesIO, StringIO
+from urllib.parse import urlsplit
+
+import pytest
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.management import call_command
+from django.test import Client
+from freezegun import freeze_time
+from utils.common import (
+    get_pre_signed_url,
+    get_rendition_names,
+    photo_uploads,
+    upload_photo,
+)
+from utils.storage.base import Storage, storage
+
+
+@pytest.fixture
+def file_system_storage(settings, tmp_path) -> None:
+    settings.STORAGE_BACKEND = "utils.storage.filesystem.FileSystemStorage"
+    settings.STORAGE_FILESYSTEM_ROOT = str(tmp_path)
+    settings.STORAGE_FILESYSTEM_URL = "http://testserver/storage/"
+
+
+def test_storage_backends_implement_every_operation() -> None:
+    class UploadOnlyStorage(Storage):
+        def upload(self, file, key, content_type, cache_control) -> None:
+            pass
+
+    with pytest.raises(TypeError):
+        UploadOnlyStorage()  # type: ignore
+
+
+def get_path(url: str) -> str:
+    url_parts = urlsplit(url)
+
+    return f"{url_parts.path}?{url_parts.query}"
+
+
+def test_file_system_storage_objects(file_system_storage) -> None:
+    storage.upload(
+        BytesIO(b"photo"), "cookers/1/0a1b/small.webp", "image/webp", "no-cache"
+    )
+
+    assert storage.exists("cookers/1/0a1b/small.webp")
+    assert not storage.exists("cookers/1/0a1b/large.webp")
+
+    storage.delete(["cookers/1/0a1b/small.webp", "cookers/1/0a1b/large.webp"])
+
+    assert not storage.exists("cookers/1/0a1b/small.webp")
+
+
+@pytest.mark.parametrize("key", ["", "/etc/passwd", "cookers/../../secret", "a//b"])
+def test_file_system_storage_invalid_keys(file_system_storage, tmp_path, key) -> None:
+    storage.upload(BytesIO(b"photo"), key, "image/webp", "no-cache")
+
+    assert not storage.exists(key)
+    assert not any(tmp_path.iterdir())
+
+
+def test_file_system_storage_signed_urls(file_system_storage) -> None:
+    storage.upload(
+        BytesIO(b"photo" * 20_000),
+        "cookers/1/0a1b/small.webp",
+        "image/webp",
+        "public, max-age=60",
+    )
+    client = Client()
+
+    with freeze_time("2023-10-14T01:00:00+00:00"):
+        url = get_pre_signed_url("cookers/1/0a1b/small.webp", expires_in=3600)
+        missing_url = get_pre_signed_url("cookers/1/0a1b/large.webp")
+        response = client.get(get_path(url))
+
+        assert url.startswith("http://testserver/storage/cookers/1/0a1b/small.webp?")
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content) == b"photo" * 20_000
+        assert response["Content-Type"] == "image/webp"
+        assert response["Content-Length"] == "100000"
+        assert response["Cache-Control"] == "public, max-age=60"
+        assert client.get(get_path(url).replace("small", "large")).status_code == 403
+        assert client.get(get_path(url)[:-1]).status_code == 403
+        assert client.get(get_path(missing_url)).status_code == 404
+
+    with freeze_time("2023-10-14T02:00:01+00:00"):
+        assert client.get(get_path(url)).status_code == 403
+
+
+def test_storage_objects_are_only_served_by_file_system_storage() -> None:
+    assert Client().get("/storage/cookers/1/0a1b/small.webp").status_code == 404
+
+
+def test_photos_are_stored_in_file_system_storage(
+    file_system_storage, settings, image: InMemoryUploadedFile
+) -> None:
+    settings.S3_UPLOADS_MAX_CONCURRENCY = 2
+    photo_key = upload_photo(image, "cookers/1/dishes")
+    photo_uploads.join()
+    photo_key_prefix = photo_key.rsplit("/", 1)[0]
+
+    for name in get_rendition_names():
+        assert storage.exists(f"{photo_key_prefix}/{name}")
+
+
+def test_benchmark_photo_pipeline_command() -> None:
+    out = StringIO()
+
+    call_command(
+        "benchmark_photo_pipeline",
+        photos=2,
+        width=320,
+        height=240,
+        threads=2,
+        upload_concurrency=2,
+        stdout=out,
+    )
+
+    assert "new photos: " in out.getvalue()
+    assert "photos already stored: " in out.getvalue()
+    assert f"{2 * len(get_rendition_names())} renditions" in out.getvalue()
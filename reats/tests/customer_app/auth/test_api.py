@@ -83,6 +83,54 @@ class TestCustomerAuth:
             },
         )
 
+    @pytest.mark.django_db
+    def test_customer_auth_does_not_resend_a_valid_otp(
+        self,
+        customer_api_key_header: dict,
+        auth_data: dict,
+        client: APIClient,
+        auth_path: str,
+        send_otp_message_success: MagicMock,
+    ) -> None:
+        for _ in range(2):
+            response = client.post(
+                auth_path,
+                encode_multipart(BOUNDARY, auth_data),
+                content_type=MULTIPART_CONTENT,
+                follow=False,
+                **customer_api_key_header,
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        send_otp_message_success.assert_called_once()
+
+    @pytest.mark.django_db
+    def test_customer_auth_sends_a_new_otp_once_verified(
+        self,
+        customer_api_key_header: dict,
+        auth_data: dict,
+        client: APIClient,
+        auth_path: str,
+        otp_verify_path: str,
+        send_otp_message_success: MagicMock,
+        verify_otp_message_success: MagicMock,
+    ) -> None:
+        for path, data in (
+            (auth_path, auth_data),
+            (otp_verify_path, {**auth_data, "otp": "002233"}),
+            (auth_path, auth_data),
+        ):
+            response = client.post(
+                path,
+                encode_multipart(BOUNDARY, data),
+                content_type=MULTIPART_CONTENT,
+                follow=False,
+                **customer_api_key_header,
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        assert send_otp_message_success.call_count == 2
+
 
 class TestCustomerAskNewOTP:
     @pytest.fixture
@@ -158,6 +206,38 @@ class TestCustomerAskNewOTP:
             },
         )
 
+    @pytest.mark.django_db
+    def test_customer_ask_new_OTP_throttled(
+        self,
+        customer_api_key_header: dict,
+        data: dict,
+        client: APIClient,
+        otp_path: str,
+        send_otp_message_success: MagicMock,
+        settings,
+    ) -> None:
+        for _ in range(settings.OTP_PHONE_BUCKET_CAPACITY):
+            response = client.post(
+                otp_path,
+                encode_multipart(BOUNDARY, data),
+                content_type=MULTIPART_CONTENT,
+                follow=False,
+                **customer_api_key_header,
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        response = client.post(
+            otp_path,
+            encode_multipart(BOUNDARY, data),
+            content_type=MULTIPART_CONTENT,
+            follow=False,
+            **customer_api_key_header,
+        )
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response.headers["Retry-After"]) > 0
+        assert send_otp_message_success.call_count == settings.OTP_PHONE_BUCKET_CAPACITY
+
 
 class TestTokenFetch:
     @pytest.mark.parametrize(
@@ -262,3 +342,24 @@ class TestTokenFetchWhenUserIsPresentOnMultipleTables:
             response.json()["user_id"]
             == CustomerModel.objects.get(phone="+33700000006").pk
         )
+
+    @pytest.mark.django_db
+    def test_fetch_token_queries_only_the_origin_table(
+        self,
+        customer_api_key_header: dict,
+        client: APIClient,
+        data: dict,
+        token_path: str,
+        django_assert_num_queries,
+    ) -> None:
+        with django_assert_num_queries(1) as context:
+            response = client.post(
+                token_path,
+                encode_multipart(BOUNDARY, data),
+                content_type=MULTIPART_CONTENT,
+                follow=False,
+                **customer_api_key_header,
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert '"customers"' in context.captured_queries[0]["sql"]
@@ -1,3 +1,4 @@
+import hashlib
 import os
 from datetime import datetime, timedelta
 from io import BytesIO
@@ -56,7 +57,7 @@ class TestUpdateCustomerAccountInfoWithoutPhoto:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         customer_id: int,
         path: str,
         post_personal_information_data_without_photo: dict,
@@ -83,7 +84,7 @@ class TestUpdateCustomerAccountInfoWithoutPhoto:
             assert customer.lastname == "DOE"
 
             upload_fileobj.assert_not_called()
-            delete_object.assert_not_called()
+            delete_objects.assert_not_called()
 
 
 @pytest.mark.django_db
@@ -97,11 +98,12 @@ class TestUpdateCustomerAccountInfoWithPhotoV1:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         customer_id: int,
         path: str,
         post_personal_information_data_with_photo: dict,
         upload_fileobj: MagicMock,
+        image_hash: str,
     ) -> None:
         with freeze_time("2023-10-14T22:00:00+00:00"):
             response = client.patch(
@@ -119,18 +121,20 @@ class TestUpdateCustomerAccountInfoWithPhotoV1:
             assert customer.modified.isoformat() == "2023-10-14T22:00:00+00:00"
             assert customer.firstname == "John"
             assert customer.lastname == "DOE"
-            assert customer.photo == "customers/3/profile_pics/test.jpg"
-
-            upload_fileobj.assert_called_once()
-            assert len(upload_fileobj.call_args.args) == 3
-
-            arg1, arg2, arg3 = upload_fileobj.call_args.args
+            assert (
+                customer.photo == f"customers/3/profile_pics/{image_hash}/original.jpg"
+            )
 
-            assert isinstance(arg1, InMemoryUploadedFile)
-            assert arg1.name == "test.jpg"
-            assert arg2 == "reats-dev-bucket"
-            assert arg3 == "customers/3/profile_pics/test.jpg"
-            delete_object.assert_not_called()
+            assert [upload.args[1:] for upload in upload_fileobj.call_args_list] == [
+                ("reats-dev-bucket", f"customers/3/profile_pics/{image_hash}/{name}")
+                for name in [
+                    "original.jpg",
+                    "large.webp",
+                    "medium.webp",
+                    "thumbnail.webp",
+                ]
+            ]
+            delete_objects.assert_not_called()
 
 
 @pytest.mark.django_db
@@ -141,7 +145,8 @@ class TestUpdateCustomerAccountInfoWithPhotoV2:
 
     @pytest.fixture
     def second_profile_pic(self) -> InMemoryUploadedFile:
-        im = Image.new(mode="RGB", size=(200, 200))  # create a new image using PIL
+        # create a new image using PIL, unlike the image fixture
+        im = Image.new(mode="RGB", size=(200, 200), color="white")
         im_io = BytesIO()  # a BytesIO object for saving image
         im.save(im_io, "JPEG")  # save the image to im_io
         im_io.seek(0)  # seek to the beginning
@@ -157,6 +162,10 @@ class TestUpdateCustomerAccountInfoWithPhotoV2:
 
         return image
 
+    @pytest.fixture
+    def second_profile_pic_hash(self, second_profile_pic: InMemoryUploadedFile) -> str:
+        return hashlib.sha256(second_profile_pic.file.getvalue()).hexdigest()
+
     @pytest.fixture
     def second_post_personal_information_data_with_photo(
         self,
@@ -172,12 +181,14 @@ class TestUpdateCustomerAccountInfoWithPhotoV2:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         customer_id: int,
         path: str,
         post_personal_information_data_with_photo: dict,
         second_post_personal_information_data_with_photo: dict,
         upload_fileobj: MagicMock,
+        image_hash: str,
+        second_profile_pic_hash: str,
     ) -> None:
         with freeze_time("2023-10-14T22:00:00+00:00"):
             response = client.patch(
@@ -198,18 +209,20 @@ class TestUpdateCustomerAccountInfoWithPhotoV2:
             assert customer.modified.isoformat() == "2023-10-14T22:00:00+00:00"
             assert customer.firstname == "John"
             assert customer.lastname == "DOE"
-            assert customer.photo == "customers/3/profile_pics/test.jpg"
-
-            upload_fileobj.call_count == 1
-            assert len(upload_fileobj.call_args.args) == 3
-
-            arg1, arg2, arg3 = upload_fileobj.call_args.args
+            assert (
+                customer.photo == f"customers/3/profile_pics/{image_hash}/original.jpg"
+            )
 
-            assert isinstance(arg1, InMemoryUploadedFile)
-            assert arg1.name == "test.jpg"
-            assert arg2 == "reats-dev-bucket"
-            assert arg3 == "customers/3/profile_pics/test.jpg"
-            delete_object.assert_not_called()
+            assert [upload.args[1:] for upload in upload_fileobj.call_args_list] == [
+                ("reats-dev-bucket", f"customers/3/profile_pics/{image_hash}/{name}")
+                for name in [
+                    "original.jpg",
+                    "large.webp",
+                    "medium.webp",
+                    "thumbnail.webp",
+                ]
+            ]
+            delete_objects.assert_not_called()
 
         # SECOND CALL #
         with freeze_time("2023-10-22T22:00:00+00:00"):
@@ -231,21 +244,39 @@ class TestUpdateCustomerAccountInfoWithPhotoV2:
             assert customer.modified.isoformat() == "2023-10-22T22:00:00+00:00"
             assert customer.firstname == "John"
             assert customer.lastname == "DOE"
-            assert customer.photo == "customers/3/profile_pics/second_profile_pic.jpg"
-
-            upload_fileobj.call_count == 2
-            assert len(upload_fileobj.call_args.args) == 3
-
-            arg1, arg2, arg3 = upload_fileobj.call_args.args
-
-            assert isinstance(arg1, InMemoryUploadedFile)
-            assert arg1.name == "second_profile_pic.jpg"
-            assert arg2 == "reats-dev-bucket"
-            assert arg3 == "customers/3/profile_pics/second_profile_pic.jpg"
+            assert (
+                customer.photo
+                == f"customers/3/profile_pics/{second_profile_pic_hash}/original.jpg"
+            )
 
-            delete_object.assert_called_once_with(
+            assert [
+                upload.args[1:] for upload in upload_fileobj.call_args_list[4:]
+            ] == [
+                (
+                    "reats-dev-bucket",
+                    f"customers/3/profile_pics/{second_profile_pic_hash}/{name}",
+                )
+                for name in [
+                    "original.jpg",
+                    "large.webp",
+                    "medium.webp",
+                    "thumbnail.webp",
+                ]
+            ]
+
+            delete_objects.assert_called_once_with(
                 Bucket="reats-dev-bucket",
-                Key="customers/3/profile_pics/test.jpg",
+                Delete={
+                    "Objects": [
+                        {"Key": f"customers/3/profile_pics/{image_hash}/original.jpg"},
+                        {
+                            "Key": f"customers/3/profile_pics/{image_hash}/thumbnail.webp"
+                        },
+                        {"Key": f"customers/3/profile_pics/{image_hash}/medium.webp"},
+                        {"Key": f"customers/3/profile_pics/{image_hash}/large.webp"},
+                    ],
+                    "Quiet": True,
+                },
             )
 
 
@@ -3,7 +3,12 @@ from datetime import datetime, timezone
 from unittest.mock import MagicMock
 
 import pytest
-from core_app.models import OrderDishItemModel, OrderDrinkItemModel, OrderModel
+from core_app.models import (
+    CookerModel,
+    OrderDishItemModel,
+    OrderDrinkItemModel,
+    OrderModel,
+)
 from django.forms import model_to_dict
 from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
 from freezegun import freeze_time
@@ -411,3 +416,185 @@ def test_create_scheduled_order_failed_with_wrong_delivery_infos(
         assert response.status_code == expected_status_code
         mock_googlemaps_distance_matrix.assert_not_called()
         mock_stripe_payment_intent_create.assert_not_called()
+
+
+@pytest.fixture
+def json_data_for_order_with_asap_delivery(
+    address_id: int,
+    customer_id: int,
+    cooker_id: int,
+) -> dict:
+    return {
+        "addressID": address_id,
+        "customerID": customer_id,
+        "cookerID": cooker_id,
+        "dishes_items": [
+            {"dishID": 11, "dishOrderedQuantity": 1},
+        ],
+        "drinks_items": [
+            {"drinkID": 2, "drinkOrderedQuantity": 3},
+        ],
+    }
+
+
+@pytest.mark.django_db
+def test_create_order_from_json_body_success(
+    auth_headers: dict,
+    client: APIClient,
+    customer_order_json_path: str,
+    json_data_for_order_with_asap_delivery: dict,
+    mock_googlemaps_distance_matrix: MagicMock,
+    mock_stripe_payment_intent_create: MagicMock,
+    mock_stripe_create_ephemeral_key: MagicMock,
+) -> None:
+
+    with freeze_time("2024-05-08T10:16:00+00:00"):
+        response = client.post(
+            customer_order_json_path,
+            json_data_for_order_with_asap_delivery,
+            format="json",
+            follow=False,
+            **auth_headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        api_response: dict = response.json()
+        assert api_response["data"]["dishes_items"] == [
+            {"dish_quantity": 1, "dish": 11}
+        ]
+        assert api_response["data"]["drinks_items"] == [
+            {"drink_quantity": 3, "drink": 2}
+        ]
+        assert api_response["data"]["sub_total"] == 20.0
+        assert api_response["data"]["total_amount"] == 24.59
+
+        order: OrderModel = OrderModel.objects.get(pk=api_response["data"]["id"])
+        assert order.status == OrderStatusEnum.DRAFT
+        assert order.delivery_fees == 3.19
+        assert order.stripe_payment_intent_id == "pi_3Q6VU7EEYeaFww1W0xCZEUxw"
+        assert list(
+            OrderDishItemModel.objects.filter(order=order).values_list(
+                "dish_id", "dish_quantity"
+            )
+        ) == [(11, 1)]
+        assert list(
+            OrderDrinkItemModel.objects.filter(order=order).values_list(
+                "drink_id", "drink_quantity"
+            )
+        ) == [(2, 3)]
+
+        mock_googlemaps_distance_matrix.assert_called_once_with(
+            origins=["13 rue des Mazières 91000 Evry"],
+            destinations=["1 rue André Lalande 91000 Evry"],
+        )
+        mock_stripe_payment_intent_create.assert_called_once_with(
+            amount=2459,
+            currency="EUR",
+            automatic_payment_methods={"enabled": True},
+            customer="cus_QyZ76Ae0W5KeqP",
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "overridden_data",
+    [
+        {"unexpected": "value"},
+        {"dishes_items": [{"dishID": 11, "dishOrderedQuantity": 1, "price": 0}]},
+        {"dishes_items": []},
+        {"dishes_items": [{"dishID": 11, "dishOrderedQuantity": 0}]},
+        {"dishes_items": [{"dishID": 11, "dishOrderedQuantity": 1}] * 31},
+        {
+            "dishes_items": [
+                {"dishID": 11, "dishOrderedQuantity": 1},
+                {"dishID": 11, "dishOrderedQuantity": 2},
+            ]
+        },
+        {"dishes_items": [{"dishID": 1, "dishOrderedQuantity": 1}]},
+        {"dishes_items": [{"dishID": 999999, "dishOrderedQuantity": 1}]},
+        {"drinks_items": [{"drinkID": "bissap", "drinkOrderedQuantity": 1}]},
+    ],
+    ids=[
+        "unexpected top level key",
+        "unexpected item key",
+        "no dishes",
+        "zero quantity",
+        "too many items",
+        "duplicated dish",
+        "dish from another cooker",
+        "unknown dish",
+        "non integer drink id",
+    ],
+)
+def test_create_order_from_json_body_failed_with_invalid_payload(
+    auth_headers: dict,
+    client: APIClient,
+    customer_order_json_path: str,
+    json_data_for_order_with_asap_delivery: dict,
+    mock_googlemaps_distance_matrix: MagicMock,
+    mock_stripe_payment_intent_create: MagicMock,
+    overridden_data: dict,
+) -> None:
+    orders_count = OrderModel.objects.count()
+
+    response = client.post(
+        customer_order_json_path,
+        {**json_data_for_order_with_asap_delivery, **overridden_data},
+        format="json",
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert OrderModel.objects.count() == orders_count
+    mock_googlemaps_distance_matrix.assert_not_called()
+    mock_stripe_payment_intent_create.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_create_order_from_json_body_failed_with_oversized_body(
+    auth_headers: dict,
+    client: APIClient,
+    customer_order_json_path: str,
+    json_data_for_order_with_asap_delivery: dict,
+    mock_stripe_payment_intent_create: MagicMock,
+    settings,
+) -> None:
+    settings.MAX_JSON_BODY_SIZE = 64
+
+    response = client.post(
+        customer_order_json_path,
+        json_data_for_order_with_asap_delivery,
+        format="json",
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    mock_stripe_payment_intent_create.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_create_order_failed_when_cooker_is_full(
+    auth_headers: dict,
+    client: APIClient,
+    cooker_id: int,
+    customer_order_json_path: str,
+    json_data_for_order_with_asap_delivery: dict,
+    mock_googlemaps_distance_matrix: MagicMock,
+    mock_stripe_payment_intent_create: MagicMock,
+) -> None:
+    cooker: CookerModel = CookerModel.objects.get(pk=cooker_id)
+    cooker.in_flight_order_number = cooker.max_order_number
+    cooker.save()
+
+    response = client.post(
+        customer_order_json_path,
+        json_data_for_order_with_asap_delivery,
+        format="json",
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    mock_googlemaps_distance_matrix.assert_not_called()
+    mock_stripe_payment_intent_create.assert_not_called()
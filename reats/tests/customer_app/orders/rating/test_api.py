@@ -125,13 +125,14 @@ def test_add_rates_to_orders_and_orders_items(
     order.refresh_from_db()
     assert order.rating == order_rating_data["rating"]
     assert order.comment == order_rating_data["comment"]
+    assert order.cooker.rating_sum == order_rating_data["rating"]
+    assert order.cooker.rating_count == 1
 
     # We add infos in dish ratings table
     dish_rating_data: dict = {
         "dishes_ids": [11],
         "ratings": [3],
         "comments": ["Good"],
-        "customer_id": customer_id,
     }
 
     create_dish_rating_response = client.post(
@@ -145,11 +146,12 @@ def test_add_rates_to_orders_and_orders_items(
     assert create_dish_rating_response.json() == {
         "ok": True,
         "status_code": 201,
+        "data": [{"dish_id": 11, "outcome": "created"}],
     }
 
     for idx in range(len(dish_rating_data["dishes_ids"])):
         dish_rating_instance: DishRatingModel = DishRatingModel.objects.get(
-            dish_id=dish_rating_data["dishes_ids"][idx]
+            dish_id=dish_rating_data["dishes_ids"][idx], customer_id=customer_id
         )
         assert dish_rating_instance.rating == dish_rating_data["ratings"][idx]
         assert dish_rating_instance.comment == dish_rating_data["comments"][idx]
@@ -159,7 +161,6 @@ def test_add_rates_to_orders_and_orders_items(
         "drink_ids": [2],
         "ratings": [4],
         "comments": ["Very good"],
-        "customer_id": customer_id,
     }
 
     create_drink_rating_response = client.post(
@@ -172,11 +173,12 @@ def test_add_rates_to_orders_and_orders_items(
     assert create_drink_rating_response.json() == {
         "ok": True,
         "status_code": 201,
+        "data": [{"drink_id": 2, "outcome": "created"}],
     }
 
     for idx in range(len(drink_rating_data["drink_ids"])):
         drink_rating_instance: DrinkRatingModel = DrinkRatingModel.objects.get(
-            drink_id=drink_rating_data["drink_ids"][idx]
+            drink_id=drink_rating_data["drink_ids"][idx], customer_id=customer_id
         )
         assert drink_rating_instance.rating == drink_rating_data["ratings"][idx]
         assert drink_rating_instance.comment == drink_rating_data["comments"][idx]
@@ -196,3 +198,60 @@ def test_add_rates_to_orders_and_orders_items(
         customer="cus_QyZ76Ae0W5KeqP",
         stripe_version="2024-06-20",
     )
+
+
+@pytest.mark.django_db
+def test_dishes_and_drinks_are_rated_again(
+    auth_headers: dict,
+    client: APIClient,
+    customer_orders_dish_rating_path: str,
+    customer_orders_drink_rating_path: str,
+    customer_id: int,
+    django_assert_num_queries,
+) -> None:
+    DishRatingModel.objects.create(customer_id=customer_id, dish_id=11, rating=2)
+    DrinkRatingModel.objects.create(customer_id=customer_id, drink_id=2, rating=2)
+
+    # The customer of the request body is ignored, ratings are upserted with
+    # one lookup and one INSERT ... ON CONFLICT DO UPDATE
+    with django_assert_num_queries(2):
+        response = client.post(
+            customer_orders_dish_rating_path,
+            {
+                "dishes_ids": [11, 12, 11, 999999],
+                "ratings": [3, 4, 5, 1],
+                "comments": ["Good", "Very good", "Excellent", "Unknown"],
+                "customer_id": 2,
+            },
+            follow=False,
+            **auth_headers,
+        )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json() == {
+        "ok": True,
+        "status_code": 201,
+        "data": [
+            {"dish_id": 11, "outcome": "updated"},
+            {"dish_id": 12, "outcome": "created"},
+            {"dish_id": 999999, "outcome": "not_found"},
+        ],
+    }
+    assert {
+        (rating.customer_id, rating.dish_id, rating.rating, rating.comment)
+        for rating in DishRatingModel.objects.all()
+    } == {(customer_id, 11, 5, "Excellent"), (customer_id, 12, 4, "Very good")}
+
+    response = client.post(
+        customer_orders_drink_rating_path,
+        {"drink_ids": [2], "ratings": [4]},
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["data"] == [{"drink_id": 2, "outcome": "updated"}]
+    assert DrinkRatingModel.objects.values_list("rating", "comment").get() == (
+        4,
+        None,
+    )
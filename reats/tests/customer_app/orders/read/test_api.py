@@ -501,3 +501,32 @@ def test_orders_list_success(
     diff = DeepDiff(response.json().get("data"), expected_data, ignore_order=True)
 
     assert not diff
+
+
+@pytest.mark.django_db
+def test_order_events_success(
+    auth_headers: dict,
+    client: APIClient,
+    customer_id: int,
+    customer_order_path: str,
+) -> None:
+    order: OrderModel = OrderModel.objects.get(pk=7)
+    assert order.customer_id == customer_id
+
+    with freeze_time("2024-12-11T21:00:00Z"):
+        order.transition_to(OrderStatusEnum.COMPLETED)
+
+    response = client.get(
+        f"{customer_order_path}{order.pk}/events/",
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get("data") == [
+        {
+            "previous_status": "processing",
+            "status": "completed",
+            "created": "2024-12-11T21:00:00Z",
+        },
+    ]
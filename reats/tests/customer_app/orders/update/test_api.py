@@ -3,7 +3,13 @@ from datetime import datetime, timezone
 from unittest.mock import MagicMock, call
 
 import pytest
-from core_app.models import OrderDishItemModel, OrderDrinkItemModel, OrderModel
+from core_app.models import (
+    CookerModel,
+    OrderDishItemModel,
+    OrderDrinkItemModel,
+    OrderModel,
+)
+from django.db.models import F
 from django.forms import model_to_dict
 from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
 from freezegun import freeze_time
@@ -1424,6 +1430,7 @@ def test_cancel_order_when_initiated_by_customer_and_order_is_still_pending(
         assert response.status_code == status.HTTP_201_CREATED
         order_id = response.json()["data"].pop("id")
         order: OrderModel = OrderModel.objects.get(id=order_id)
+        in_flight_order_number = order.cooker.in_flight_order_number
 
         assert order.status == OrderStatusEnum.DRAFT.value
 
@@ -1441,8 +1448,10 @@ def test_cancel_order_when_initiated_by_customer_and_order_is_still_pending(
 
         # Checking if the order has been updated to pending status
         order.refresh_from_db()
+        order.cooker.refresh_from_db()
 
         assert order.status == OrderStatusEnum.PENDING.value
+        assert order.cooker.in_flight_order_number == in_flight_order_number + 1
 
         with freeze_time(cancel_freeze_time):
             # Now we cancel the order right after it has been paid
@@ -1461,8 +1470,10 @@ def test_cancel_order_when_initiated_by_customer_and_order_is_still_pending(
 
             assert cancel_response.status_code == expected_cancel_response_status_code
             order.refresh_from_db()
+            order.cooker.refresh_from_db()
             assert order.status == OrderStatusEnum.CANCELLED_BY_CUSTOMER.value
             assert order.cancelled_date == datetime.fromisoformat(cancel_freeze_time)
+            assert order.cooker.in_flight_order_number == in_flight_order_number
 
         mock_googlemaps_distance_matrix.assert_called_once_with(
             origins=["1 rue rené cassin résidence neptune 91100 Corbeil-Essonnes"],
@@ -1830,3 +1841,58 @@ def test_update_order_but_unexpected_exception_raises_on_customer_app(
         mock_stripe_webhook_construct_event_failed.assert_not_called()
         mock_stripe_payment_intent_update.assert_not_called()
         mock_transition_to.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_order_paid_when_the_cooker_got_full_is_refunded(
+    auth_headers: dict,
+    client: APIClient,
+    customer_order_path: str,
+    post_order_data: dict,
+    stripe_payment_intent_success_webhook_data: dict,
+    mock_googlemaps_distance_matrix: MagicMock,
+    mock_stripe_payment_intent_create: MagicMock,
+    mock_stripe_create_ephemeral_key: MagicMock,
+    mock_stripe_webhook_construct_event_success: MagicMock,
+    mock_stripe_create_refund_success: MagicMock,
+) -> None:
+    with freeze_time("2024-11-10T08:16:00+00:00"):
+        response = client.post(
+            customer_order_path,
+            encode_multipart(BOUNDARY, post_order_data),
+            content_type=MULTIPART_CONTENT,
+            follow=False,
+            **auth_headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        order: OrderModel = OrderModel.objects.get(id=response.json()["data"]["id"])
+
+        # Other draft orders of the cooker were paid first
+        CookerModel.objects.filter(pk=order.cooker_id).update(
+            max_order_number=F("in_flight_order_number")
+        )
+        in_flight_order_number = CookerModel.objects.get(
+            pk=order.cooker_id
+        ).in_flight_order_number
+
+        stripe_payment_intent_success_webhook_data[
+            "created"
+        ] = datetime.now().timestamp()
+        webhook_response = client.post(
+            "/api/v1/stripe/webhook/",
+            json.dumps(stripe_payment_intent_success_webhook_data),
+            follow=False,
+        )
+
+    assert webhook_response.status_code == status.HTTP_200_OK
+
+    order.refresh_from_db()
+    assert order.status == OrderStatusEnum.DRAFT.value
+    assert not order.events.exists()
+    assert (
+        CookerModel.objects.get(pk=order.cooker_id).in_flight_order_number
+        == in_flight_order_number
+    )
+    mock_stripe_create_refund_success.assert_called_once_with(
+        amount=2319, payment_intent="pi_3Q6VU7EEYeaFww1W0xCZEUxw"
+    )
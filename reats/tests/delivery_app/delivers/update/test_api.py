@@ -1,3 +1,4 @@
+import hashlib
 import os
 from datetime import datetime, timedelta, timezone
 from io import BytesIO
@@ -50,7 +51,7 @@ class TestUpdateDeliverAccountInfoWithoutPhoto:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         deliver_id: int,
         path: str,
         post_data_without_photo: dict,
@@ -79,7 +80,7 @@ class TestUpdateDeliverAccountInfoWithoutPhoto:
             assert deliver.lastname == "DOE AGAIN"
 
             upload_fileobj.assert_not_called()
-            delete_object.assert_not_called()
+            delete_objects.assert_not_called()
 
 
 @pytest.mark.django_db
@@ -93,11 +94,12 @@ class TestUpdateDeliverAccountInfoWithPhotoV1:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         deliver_id: int,
         path: str,
         post_data_with_photo: dict,
         upload_fileobj: MagicMock,
+        image_hash: str,
     ) -> None:
         with freeze_time("2023-10-14T22:00:00+00:00"):
             response = client.patch(
@@ -113,23 +115,23 @@ class TestUpdateDeliverAccountInfoWithPhotoV1:
             deliver = DeliverModel.objects.get(pk=deliver_id)
 
             assert deliver.modified.isoformat() == "2023-10-14T22:00:00+00:00"
-            assert deliver.photo == "delivers/1/profile_pics/test.jpg"
+            assert deliver.photo == f"delivers/1/profile_pics/{image_hash}/original.jpg"
             assert deliver.delivery_radius == 5
             assert deliver.town == "New town"
             assert deliver.delivery_vehicle == "car"
             assert deliver.firstname == "New John test delivery"
             assert deliver.lastname == "DOE AGAIN"
 
-            upload_fileobj.assert_called_once()
-            assert len(upload_fileobj.call_args.args) == 3
-
-            arg1, arg2, arg3 = upload_fileobj.call_args.args
-
-            assert isinstance(arg1, InMemoryUploadedFile)
-            assert arg1.name == "test.jpg"
-            assert arg2 == "reats-dev-bucket"
-            assert arg3 == "delivers/1/profile_pics/test.jpg"
-            delete_object.assert_not_called()
+            assert [upload.args[1:] for upload in upload_fileobj.call_args_list] == [
+                ("reats-dev-bucket", f"delivers/1/profile_pics/{image_hash}/{name}")
+                for name in [
+                    "original.jpg",
+                    "large.webp",
+                    "medium.webp",
+                    "thumbnail.webp",
+                ]
+            ]
+            delete_objects.assert_not_called()
 
 
 @pytest.mark.django_db
@@ -140,7 +142,8 @@ class TestUpdateDeliverAccountInfoWithPhotoV2:
 
     @pytest.fixture
     def second_profile_pic(self) -> InMemoryUploadedFile:
-        im = Image.new(mode="RGB", size=(200, 200))  # create a new image using PIL
+        # create a new image using PIL, unlike the image fixture
+        im = Image.new(mode="RGB", size=(200, 200), color="white")
         im_io = BytesIO()  # a BytesIO object for saving image
         im.save(im_io, "JPEG")  # save the image to im_io
         im_io.seek(0)  # seek to the beginning
@@ -156,6 +159,10 @@ class TestUpdateDeliverAccountInfoWithPhotoV2:
 
         return image
 
+    @pytest.fixture
+    def second_profile_pic_hash(self, second_profile_pic: InMemoryUploadedFile) -> str:
+        return hashlib.sha256(second_profile_pic.file.getvalue()).hexdigest()
+
     @pytest.fixture
     def post_data_with_photo_v2(
         self,
@@ -171,12 +178,14 @@ class TestUpdateDeliverAccountInfoWithPhotoV2:
         self,
         auth_headers: dict,
         client: APIClient,
-        delete_object: MagicMock,
+        delete_objects: MagicMock,
         deliver_id: int,
         path: str,
         post_data_with_photo: dict,
         post_data_with_photo_v2: dict,
         upload_fileobj: MagicMock,
+        image_hash: str,
+        second_profile_pic_hash: str,
     ) -> None:
         with freeze_time("2023-10-14T22:00:00+00:00"):
             response = client.patch(
@@ -195,18 +204,18 @@ class TestUpdateDeliverAccountInfoWithPhotoV2:
             deliver = DeliverModel.objects.get(pk=deliver_id)
 
             assert deliver.modified.isoformat() == "2023-10-14T22:00:00+00:00"
-            assert deliver.photo == "delivers/1/profile_pics/test.jpg"
-
-            upload_fileobj.call_count == 1
-            assert len(upload_fileobj.call_args.args) == 3
-
-            arg1, arg2, arg3 = upload_fileobj.call_args.args
-
-            assert isinstance(arg1, InMemoryUploadedFile)
-            assert arg1.name == "test.jpg"
-            assert arg2 == "reats-dev-bucket"
-            assert arg3 == "delivers/1/profile_pics/test.jpg"
-            delete_object.assert_not_called()
+            assert deliver.photo == f"delivers/1/profile_pics/{image_hash}/original.jpg"
+
+            assert [upload.args[1:] for upload in upload_fileobj.call_args_list] == [
+                ("reats-dev-bucket", f"delivers/1/profile_pics/{image_hash}/{name}")
+                for name in [
+                    "original.jpg",
+                    "large.webp",
+                    "medium.webp",
+                    "thumbnail.webp",
+                ]
+            ]
+            delete_objects.assert_not_called()
 
         # SECOND CALL #
         with freeze_time("2023-10-22T22:00:00+00:00"):
@@ -226,21 +235,40 @@ class TestUpdateDeliverAccountInfoWithPhotoV2:
             deliver = DeliverModel.objects.get(pk=deliver_id)
 
             assert deliver.modified.isoformat() == "2023-10-22T22:00:00+00:00"
-            assert deliver.photo == "delivers/1/profile_pics/second_profile_pic.jpg"
-
-            upload_fileobj.call_count == 2
-            assert len(upload_fileobj.call_args.args) == 3
-
-            arg1, arg2, arg3 = upload_fileobj.call_args.args
-
-            assert isinstance(arg1, InMemoryUploadedFile)
-            assert arg1.name == "second_profile_pic.jpg"
-            assert arg2 == "reats-dev-bucket"
-            assert arg3 == "delivers/1/profile_pics/second_profile_pic.jpg"
+            assert (
+                deliver.photo
+                == f"delivers/1/profile_pics/{second_profile_pic_hash}/original.jpg"
+            )
 
-            delete_object.assert_called_once_with(
+            assert [
+                upload.args[1:] for upload in upload_fileobj.call_args_list[4:]
+            ] == [
+                (
+                    "reats-dev-bucket",
+                    f"delivers/1/profile_pics/{second_profile_pic_hash}/{name}",
+                )
+                for name in [
+                    "original.jpg",
+                    "large.webp",
+                    "medium.webp",
+                    "thumbnail.webp",
+                ]
+            ]
+
+            delete_objects.assert_called_once_with(
                 Bucket="reats-dev-bucket",
-                Key="delivers/1/profile_pics/test.jpg",
+                Delete={
+                    "Objects": [
+                        {"Key": f"delivers/1/profile_pics/{image_hash}/{name}"}
+                        for name in [
+                            "original.jpg",
+                            "thumbnail.webp",
+                            "medium.webp",
+                            "large.webp",
+                        ]
+                    ],
+                    "Quiet": True,
+                },
             )
 
 
@@ -1,9 +1,15 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from core_app.models import OrderModel
+from django.core.cache import cache
+from django.db import connection
 from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
 from freezegun import freeze_time
 from rest_framework import status
 from rest_framework.test import APIClient
+from utils.enums import OrderStatusEnum
+from utils.timeframe_stats_cache import get_series_cache_key
 
 
 @pytest.fixture
@@ -42,6 +48,61 @@ def test_delivery_orders_stats_with_right_dates(
     }
 
 
+@pytest.mark.django_db
+def test_delivery_orders_stats_with_many_delivered_orders(
+    auth_headers: dict,
+    client: APIClient,
+    deliver_id: int,
+    delivery_stats_path: str,
+    django_assert_num_queries,
+) -> None:
+    # Stats are computed by a single aggregate query, whatever the number of orders
+    orders_number = 100_000
+    delivery_in_progress_date = datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+    OrderModel.objects.filter(delivery_man__id=deliver_id).delete()
+    template_order: OrderModel = OrderModel.objects.create(
+        cooker_id=1,
+        customer_id=1,
+        delivery_man_id=deliver_id,
+        status=OrderStatusEnum.DELIVERED,
+        delivery_fees=4.0,
+        delivery_fees_bonus=0.5,
+        delivery_distance=3000.0,  # in meters
+        delivery_initial_distance=1000.0,
+        delivery_in_progress_date=delivery_in_progress_date,
+        delivered_date=delivery_in_progress_date + timedelta(minutes=15),
+    )
+
+    # Duplicating the template order on the database side is way faster than bulk_create
+    columns = ", ".join(
+        field.column
+        for field in OrderModel._meta.concrete_fields
+        if not field.primary_key
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO orders ({columns}) "
+            f"SELECT {columns} FROM orders, generate_series(2, %s) WHERE id = %s",
+            [orders_number, template_order.pk],
+        )
+
+    with django_assert_num_queries(1):
+        response = client.get(
+            delivery_stats_path,
+            {"start_date": "2024-01-01", "end_date": "2099-12-31"},
+            follow=False,
+            **auth_headers,
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get("data") == {
+        "delivery_mean_time": 900.0,
+        "total_delivery_distance": 400_000_000.0,
+        "total_delivery_fees": 450_000.0,
+        "total_number_of_deliveries": orders_number,
+    }
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     "query_params",
@@ -127,3 +188,82 @@ class TestDeliveryOrdersStatsFailedWithExpiredToken:
 
             assert response.status_code == status.HTTP_401_UNAUTHORIZED
             assert response.json().get("error_code") == "token_not_valid"
+
+
+@pytest.mark.django_db
+@freeze_time("2024-04-15T10:00:00Z")
+def test_delivery_timeframe_stats_for_a_year(
+    auth_headers: dict,
+    client: APIClient,
+    delivery_stats_path: str,
+    empty_cache: None,
+) -> None:
+    empty_bucket = {
+        "deliveries_number": 0,
+        "total_delivery_fees": 0.0,
+        "total_delivery_distance": 0.0,
+        "delivery_mean_time": 0.0,
+    }
+    expected_data = [
+        {"start_date": "2024-01-01", **empty_bucket},
+        {"start_date": "2024-02-01", **empty_bucket},
+        {
+            "start_date": "2024-03-01",
+            "deliveries_number": 2,
+            "total_delivery_fees": 9.7,
+            "total_delivery_distance": 9.0,
+            "delivery_mean_time": 720.0,
+        },
+        {"start_date": "2024-04-01", **empty_bucket},
+    ]
+
+    response = client.get(
+        f"{delivery_stats_path}timeframe/",
+        {"timeframe": "year"},
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.json() == {
+        "ok": True,
+        "status_code": status.HTTP_200_OK,
+        "data": expected_data,
+    }
+
+    cache_key = get_series_cache_key("deliver:1")
+    assert cache.get(f"{cache_key}:year:2024-03-01") == expected_data[2]
+
+    # Finished months are served from the cache, orders being changed behind
+    # the deletion signals
+    OrderModel.objects.filter(delivery_man__id=1).update(
+        status=OrderStatusEnum.CANCELLED_BY_CUSTOMER
+    )
+    response = client.get(
+        f"{delivery_stats_path}timeframe/",
+        {"timeframe": "year"},
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.json().get("data") == expected_data
+
+
+@pytest.mark.django_db
+def test_delivery_timeframe_stats_fails_with_invalid_timeframe(
+    auth_headers: dict,
+    client: APIClient,
+    delivery_stats_path: str,
+) -> None:
+    response = client.get(
+        f"{delivery_stats_path}timeframe/",
+        {"timeframe": "decade"},
+        follow=False,
+        **auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {
+        "ok": False,
+        "status_code": status.HTTP_400_BAD_REQUEST,
+        "error": "Invalid timeframe. Expected one of week, month or year.",
+    }
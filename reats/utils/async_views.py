@@ -0,0 +1,157 @@
+"""
+Async handlers for DRF viewsets, served by the ASGI worker of
+config/gunicorn.conf.py.
+
+DRF 3.14 calls handlers synchronously, AsyncViewSetMixin awaits the async
+ones and runs everything touching the database in the request thread with
+sync_to_async. Blocking calls to Google, Stripe, S3 and Pinpoint go through
+run_external_call, on a thread pool bounding how many are in flight, the
+request giving its pooled database connection back while it waits for them.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.decorators import classonlymethod
+from rest_framework import status
+from rest_framework.mixins import CreateModelMixin, UpdateModelMixin
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+external_calls_executor = ThreadPoolExecutor(
+    max_workers=settings.EXTERNAL_CALLS_MAX_CONCURRENCY,
+    thread_name_prefix="external-calls",
+)
+
+
+def release_database_connections() -> None:
+    """
+    Give the pooled connections of the request thread back, the next query
+    borrows one again. Connections in a transaction are kept.
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+async def run_external_call(function: Callable, *args, **kwargs) -> Any:
+    """
+    Await a blocking call to an external service. Never pass it a function
+    querying the database, the pool threads have their own connections.
+
+    With the database pool, the request does not hold a connection while
+    waiting, so slow services never exhaust the pool.
+    """
+    if settings.DB_POOL_MAX_SIZE:
+        await sync_to_async(release_database_connections)()
+
+    return await sync_to_async(
+        function, thread_sensitive=False, executor=external_calls_executor
+    )(*args, **kwargs)
+
+
+class AsyncViewSetMixin:
+    """
+    Dispatch of a viewset having async handlers. Synchronous handlers of the
+    same viewset keep working, they run in the request thread.
+    """
+
+    @classonlymethod
+    def as_view(cls, *args, **kwargs) -> Callable:
+        view = super().as_view(*args, **kwargs)  # type: ignore
+
+        # Django awaits the views marked as coroutine functions
+        return markcoroutinefunction(view)
+
+    def initial(self, request: Request, *args, **kwargs) -> None:
+        super().initial(request, *args, **kwargs)  # type: ignore
+        request.data  # Parsed here, so that async handlers never read files
+
+    async def dispatch(self, request, *args, **kwargs) -> Response:
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)  # type: ignore
+        self.request = request
+        self.headers = self.default_response_headers  # type: ignore
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:  # type: ignore
+                handler = getattr(
+                    self,
+                    request.method.lower(),
+                    self.http_method_not_allowed,  # type: ignore
+                )
+            else:
+                handler = self.http_method_not_allowed  # type: ignore
+
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)  # type: ignore
+
+        self.response = self.finalize_response(  # type: ignore
+            request, response, *args, **kwargs
+        )
+
+        return self.response
+
+
+class AsyncCreateModelMixin(CreateModelMixin):
+    """
+    CreateModelMixin with an async perform_create, for creations calling
+    external services.
+    """
+
+    async def create(self, request: Request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)  # type: ignore
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await self.perform_create(serializer)
+        data = await sync_to_async(lambda: serializer.data)()
+
+        return Response(
+            data,
+            status=status.HTTP_201_CREATED,
+            headers=self.get_success_headers(data),
+        )
+
+    async def perform_create(self, serializer: BaseSerializer) -> None:
+        await sync_to_async(serializer.save)()
+
+
+class AsyncUpdateModelMixin(UpdateModelMixin):
+    """
+    UpdateModelMixin with an async perform_update, for updates calling
+    external services.
+    """
+
+    async def update(self, request: Request, *args, **kwargs) -> Response:
+        partial = kwargs.pop("partial", False)
+        instance = await sync_to_async(self.get_object)()  # type: ignore
+        serializer = self.get_serializer(  # type: ignore
+            instance, data=request.data, partial=partial
+        )
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await self.perform_update(serializer)
+
+        if getattr(instance, "_prefetched_objects_cache", None):
+            instance._prefetched_objects_cache = {}
+
+        return Response(await sync_to_async(lambda: serializer.data)())
+
+    async def partial_update(self, request: Request, *args, **kwargs) -> Response:
+        kwargs["partial"] = True
+
+        return await self.update(request, *args, **kwargs)
+
+    async def perform_update(self, serializer: BaseSerializer) -> None:
+        await sync_to_async(serializer.save)()
@@ -0,0 +1,84 @@
+from collections import OrderedDict
+from threading import Lock
+from time import time
+from typing import Union
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.tokens import Token
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of raw tokens whose signature has already been verified.
+
+    Entries are keyed by the whole raw token, never by its signature alone,
+    and are dropped once the token expires.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._tokens: OrderedDict[bytes, Token] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, raw_token: bytes) -> Union[Token, None]:
+        with self._lock:
+            token = self._tokens.get(raw_token)
+
+            if token is None:
+                return None
+
+            if token["exp"] <= time():
+                del self._tokens[raw_token]
+                return None
+
+            self._tokens.move_to_end(raw_token)
+
+            return token
+
+    def set(self, raw_token: bytes, token: Token) -> None:
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._tokens[raw_token] = token
+            self._tokens.move_to_end(raw_token)
+
+            while len(self._tokens) > self.max_size:
+                self._tokens.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+
+verified_tokens = VerifiedTokenCache(settings.JWT_VERIFIED_TOKENS_CACHE_SIZE)
+
+
+@receiver(setting_changed)
+def clear_verified_tokens(setting: str, **kwargs) -> None:
+    # A new verifying key must not accept tokens verified with the previous one
+    if setting in ("SIMPLE_JWT", "JWT_VERIFIED_TOKENS_CACHE_SIZE"):
+        verified_tokens.max_size = settings.JWT_VERIFIED_TOKENS_CACHE_SIZE
+        verified_tokens.clear()
+
+
+class CachedJWTStatelessUserAuthentication(JWTStatelessUserAuthentication):
+    """
+    Stateless JWT authentication verifying the RSA signature of a given token
+    only once until it expires.
+    """
+
+    def get_validated_token(self, raw_token: bytes) -> Token:
+        token = verified_tokens.get(raw_token)
+
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            verified_tokens.set(raw_token, token)
+
+        return token
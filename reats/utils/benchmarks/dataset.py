@@ -0,0 +1,349 @@
+"""
+Synthetic dataset of the API benchmark, generated on the database side from
+generate_series, so that a million orders take seconds and no memory in
+Python.
+
+Rows are a deterministic function of their index `i` in the series: seeding
+twice at the same scale gives the same dataset, relative to the seeding time.
+"""
+
+from io import StringIO
+
+from core_app.models import (
+    AddressModel,
+    CookerDailyRollupModel,
+    CookerModel,
+    CustomerModel,
+    DeliverModel,
+    DishModel,
+    DishRatingModel,
+    DrinkModel,
+    DrinkRatingModel,
+    OrderDishItemModel,
+    OrderDrinkItemModel,
+    OrderModel,
+)
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max, Model
+from django.utils import timezone
+
+DATASET_SIZES = {
+    "cookers": 2_000,
+    "delivers": 500,
+    "customers": 50_000,
+    "dishes": 100_000,
+    "drinks": 20_000,
+    "orders": 1_000_000,
+    "dish_ratings": 200_000,
+    "drink_ratings": 40_000,
+}
+
+COUNTRIES = "ARRAY['Cameroun', 'France', 'Italie', 'Japon', 'Liban', 'Maroc', 'Mexique', 'Sénégal']"  # noqa
+TOWNS = "ARRAY['Paris', 'Montreuil', 'Saint-Denis', 'Vincennes', 'Boulogne']"
+# One in ten cookers and addresses per postal code prefix, like the search
+POSTAL_CODE = "(ARRAY['75', '77', '78', '91', '92', '93', '94', '95', '60', '27'])[1 + mod(i, 10)] || lpad(mod(i * 7, 1000)::text, 3, '0')"  # noqa
+CREATED = "now() - interval '1 year' * age_fraction"
+
+
+def get_dataset_sizes(scale: float) -> dict[str, int]:
+    return {name: max(1, round(size * scale)) for name, size in DATASET_SIZES.items()}
+
+
+def insert_rows(model: type[Model], rows_number: int, expressions: dict) -> int:
+    """
+    Insert rows computed from SQL expressions of the series index `i`, the
+    columns left out taking their field default.
+
+    :return: the id of the first inserted row, ids being consecutive
+    """
+    first_id = (model.objects.aggregate(max_id=Max("pk"))["max_id"] or 0) + 1
+    columns, selects, params = [model._meta.pk.column], [f"{first_id} + i"], []
+
+    for field in model._meta.concrete_fields:
+        if field.primary_key:
+            continue
+
+        if field.column in expressions:
+            selects.append(expressions[field.column])
+        elif field.has_default():
+            selects.append("%s")
+            params.append(field.get_db_prep_save(field.get_default(), connection))
+        elif not field.null:
+            raise ValueError(f"{model.__name__}.{field.column} needs an expression")
+        else:
+            continue
+
+        columns.append(field.column)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {model._meta.db_table} ({', '.join(columns)}) "
+            f"SELECT {', '.join(selects)} FROM generate_series(0, %s) AS i, "
+            # Spreads the rows over the past year, in the order of their ids
+            f"LATERAL (SELECT 1 - (i + 1)::float / %s AS age_fraction) AS t",
+            [*params, rows_number - 1, rows_number],
+        )
+
+    return first_id
+
+
+def insert_profiles(model: type[Model], rows_number: int, phone_prefix: str) -> int:
+    expressions = {
+        "firstname": "'Prénom ' || i",
+        "lastname": "'Nom ' || i",
+        "phone": f"'+33{phone_prefix}' || lpad(i::text, 7, '0')",
+        "national_phone": f"'0{phone_prefix}' || lpad(i::text, 7, '0')",
+        "is_activated": "true",
+        "created": CREATED,
+        "modified": CREATED,
+    }
+
+    if model is CustomerModel:
+        expressions["stripe_id"] = "'cus_' || md5(i::text)"
+    else:
+        expressions["siret"] = f"'{phone_prefix}' || lpad(i::text, 12, '0')"
+        expressions["town"] = f"({TOWNS})[1 + mod(i, 5)]"
+        expressions["is_online"] = "mod(i, 3) = 0"
+
+    if model is CookerModel:
+        expressions.update(
+            {
+                "postal_code": POSTAL_CODE,
+                "street_name": "'rue des Cuisiniers'",
+                "street_number": "(1 + mod(i, 200))::text",
+                "latitude": "48.8 + mod(i, 100) / 1000.0",
+                "longitude": "2.3 + mod(i, 100) / 1000.0",
+                "acceptance_rate": "50 + mod(i, 51)",
+            }
+        )
+
+    if model is DeliverModel:
+        expressions.update(
+            {
+                "delivery_vehicle": "(ARRAY['bike', 'scooter', 'car'])[1 + mod(i, 3)]",
+                "delivery_radius": "5 + mod(i, 10)",
+            }
+        )
+
+    return insert_rows(model, rows_number, expressions)
+
+
+def seed_dataset(scale: float = 1.0) -> dict[str, int]:
+    """
+    Seed the cookers, delivery men, customers and their addresses, dishes,
+    drinks, orders with their items and ratings, then the tables kept up to
+    date on writes.
+
+    Each cooker has sizes["dishes"] // sizes["cookers"] dishes, each order 2
+    dishes of its cooker, and one order in two a drink. The last orders are
+    in flight, the latest one pending, one in 47 is a draft and the others
+    are mostly delivered. Moduli are primes so that statuses do not follow
+    the customer or the cooker of the order.
+
+    :return: the number of rows seeded per table
+    """
+    sizes = get_dataset_sizes(scale)
+    sizes["dishes"] = max(sizes["dishes"], sizes["cookers"])
+    sizes["drinks"] = max(sizes["drinks"], sizes["cookers"])
+    cookers_number = sizes["cookers"]
+    in_flight_orders_number = max(1, sizes["orders"] // 10_000)
+
+    with transaction.atomic():
+        first_cooker_id = insert_profiles(CookerModel, cookers_number, "71")
+        first_deliver_id = insert_profiles(DeliverModel, sizes["delivers"], "72")
+        first_customer_id = insert_profiles(CustomerModel, sizes["customers"], "73")
+        first_address_id = insert_rows(
+            AddressModel,
+            sizes["customers"],
+            {
+                "street_name": "'rue des Clients'",
+                "street_number": "(1 + mod(i, 200))::text",
+                "town": f"({TOWNS})[1 + mod(i, 5)]",
+                "postal_code": POSTAL_CODE,
+                "customer_id": f"{first_customer_id} + i",
+                "created": CREATED,
+                "modified": CREATED,
+            },
+        )
+
+        # Dish j belongs to the cooker j mod cookers_number
+        first_dish_id = insert_rows(
+            DishModel,
+            sizes["dishes"],
+            {
+                "category": "(ARRAY['starter', 'dish', 'dessert'])[1 + mod(i, 3)]",
+                "country": f"({COUNTRIES})[1 + mod(i, 8)]",
+                "description": "'Description du plat ' || i",
+                "name": "'Plat ' || i",
+                "price": "5 + mod(i * 7, 20)",
+                "photo": f"'cookers/' || ({first_cooker_id} + mod(i, {cookers_number})) || '/dishes/' || md5(i::text) || '/original.jpg'",  # noqa
+                "cooker_id": f"{first_cooker_id} + mod(i, {cookers_number})",
+                "is_enabled": f"mod(i / {cookers_number}, 10) <> 9",
+                "is_suitable_for_quick_delivery": "mod(i, 2) = 0",
+                "is_suitable_for_scheduled_delivery": "true",
+                "created": CREATED,
+                "modified": CREATED,
+            },
+        )
+        first_drink_id = insert_rows(
+            DrinkModel,
+            sizes["drinks"],
+            {
+                "unit": "(ARRAY['liter', 'centiliters'])[1 + mod(i, 2)]",
+                "country": f"({COUNTRIES})[1 + mod(i, 8)]",
+                "description": "'Description de la boisson ' || i",
+                "name": "'Boisson ' || i",
+                "price": "2 + mod(i * 7, 5)",
+                "photo": f"'cookers/' || ({first_cooker_id} + mod(i, {cookers_number})) || '/drinks/' || md5(i::text) || '/original.jpg'",  # noqa
+                "cooker_id": f"{first_cooker_id} + mod(i, {cookers_number})",
+                "capacity": "(ARRAY[33, 50, 1])[1 + mod(i, 3)]",
+                "is_suitable_for_quick_delivery": "true",
+                "is_suitable_for_scheduled_delivery": "true",
+                "created": CREATED,
+                "modified": CREATED,
+            },
+        )
+
+        status = (
+            f"CASE WHEN i >= {sizes['orders'] - in_flight_orders_number} "
+            "THEN (ARRAY['pending', 'processing', 'completed'])"
+            f"[1 + mod({sizes['orders'] - 1} - i, 3)] "
+            "WHEN mod(i, 47) = 0 THEN 'draft' "
+            "WHEN mod(i, 23) = 1 THEN 'cancelled_by_customer' "
+            "WHEN mod(i, 19) = 2 THEN 'cancelled_by_cooker' "
+            "ELSE 'delivered' END"
+        )
+        paid = f"({status}) <> 'draft'"
+        delivered = f"({status}) = 'delivered'"
+        first_order_id = insert_rows(
+            OrderModel,
+            sizes["orders"],
+            {
+                "cooker_id": f"{first_cooker_id} + mod(i, {cookers_number})",
+                "customer_id": f"{first_customer_id} + mod(i, {sizes['customers']})",
+                "address_id": f"{first_address_id} + mod(i, {sizes['customers']})",
+                "delivery_man_id": f"CASE WHEN {delivered} THEN {first_deliver_id} + mod(i, {sizes['delivers']}) END",  # noqa
+                "status": status,
+                "processing_date": f"CASE WHEN {delivered} THEN {CREATED} + interval '5 minutes' END",  # noqa
+                "completed_date": f"CASE WHEN {delivered} THEN {CREATED} + interval '30 minutes' END",  # noqa
+                "delivered_date": f"CASE WHEN {delivered} THEN {CREATED} + interval '50 minutes' END",  # noqa
+                "cancelled_date": f"CASE WHEN ({status}) LIKE 'cancelled%%' THEN {CREATED} + interval '5 minutes' END",  # noqa
+                "paid_date": f"CASE WHEN {paid} THEN {CREATED} END",
+                "delivery_distance": "500 + mod(i * 13, 9500)",
+                "delivery_initial_distance": "500 + mod(i * 13, 9500)",
+                "delivery_fees": "2.5 + mod(i * 13, 9500) / 2000.0",
+                "stripe_payment_intent_id": "'pi_' || md5(i::text)",
+                "stripe_payment_intent_secret": "'pi_' || md5(i::text) || '_secret'",
+                "rating": f"CASE WHEN {delivered} AND mod(i, 3) = 0 THEN 1 + mod(i, 5) ELSE 0 END",  # noqa
+                "created": CREATED,
+                "modified": CREATED,
+            },
+        )
+        dishes_per_cooker = sizes["dishes"] // cookers_number
+        drinks_per_cooker = sizes["drinks"] // cookers_number
+
+        # Items of the order cooker, the k-th dish of the cooker c being the
+        # dish c + k * cookers_number, and so are drinks
+        insert_rows(
+            OrderDishItemModel,
+            sizes["orders"] * 2,
+            {
+                "order_id": f"{first_order_id} + i / 2",
+                "dish_id": f"{first_dish_id} + mod(i / 2, {cookers_number}) + mod(i, {dishes_per_cooker}) * {cookers_number}",  # noqa
+                "dish_quantity": "1 + mod(i, 3)",
+                "created": "now()",
+                "modified": "now()",
+            },
+        )
+        insert_rows(
+            OrderDrinkItemModel,
+            (sizes["orders"] + 1) // 2,
+            {
+                "order_id": f"{first_order_id} + i * 2",
+                "drink_id": f"{first_drink_id} + mod(i * 2, {cookers_number}) + mod(i, {drinks_per_cooker}) * {cookers_number}",  # noqa
+                "drink_quantity": "1 + mod(i, 2)",
+                "created": "now()",
+                "modified": "now()",
+            },
+        )
+
+        for model, item, items_number in (
+            (DishRatingModel, "dish", sizes["dishes"]),
+            (DrinkRatingModel, "drink", sizes["drinks"]),
+        ):
+            first_item_id = first_dish_id if item == "dish" else first_drink_id
+            # Distinct (customer, item) pairs, each item being rated by at
+            # most two customers at these sizes
+            insert_rows(
+                model,
+                sizes[f"{item}_ratings"],
+                {
+                    f"{item}_id": f"{first_item_id} + mod(i, {items_number})",
+                    "customer_id": f"{first_customer_id} + mod(i + i / {items_number}, {sizes['customers']})",  # noqa
+                    "rating": "1 + mod(i, 5)",
+                    "comment": "CASE WHEN mod(i, 4) = 0 THEN 'Très bon' END",
+                    "created": CREATED,
+                    "modified": CREATED,
+                },
+            )
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(),
+                [
+                    CookerModel,
+                    DeliverModel,
+                    CustomerModel,
+                    AddressModel,
+                    DishModel,
+                    DrinkModel,
+                    OrderModel,
+                    OrderDishItemModel,
+                    OrderDrinkItemModel,
+                    DishRatingModel,
+                    DrinkRatingModel,
+                ],
+            ):
+                cursor.execute(sql)
+
+        rebuild_cooker_daily_rollups()
+        call_command("reconcile_in_flight_orders", stdout=StringIO())
+        call_command("rebuild_rating_aggregates", stdout=StringIO())
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    return sizes
+
+
+def rebuild_cooker_daily_rollups() -> None:
+    """
+    What the rebuild_cooker_daily_rollups command does, in a single
+    INSERT ... SELECT instead of a row per cooker and day in Python
+    """
+    totals = (
+        "SELECT items.order_id, SUM(products.price * items.{product}_quantity) "
+        "AS total FROM order_{products}_items AS items JOIN {products} AS products "
+        "ON products.id = items.{product}_id GROUP BY items.order_id"
+    )
+    dishes_totals = totals.format(product="dish", products="dishes")
+    drinks_totals = totals.format(product="drink", products="drinks")
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {CookerDailyRollupModel._meta.db_table}")
+        cursor.execute(
+            f"INSERT INTO {CookerDailyRollupModel._meta.db_table} "
+            "(cooker_id, day, status, count, revenue) "
+            "SELECT orders.cooker_id, (orders.created AT TIME ZONE %s)::date, "
+            "orders.status, COUNT(*), "
+            "SUM(COALESCE(dishes_totals.total, 0) + COALESCE(drinks_totals.total, 0)) "
+            "FROM orders "
+            f"LEFT JOIN ({dishes_totals}) AS dishes_totals "
+            "ON dishes_totals.order_id = orders.id "
+            f"LEFT JOIN ({drinks_totals}) AS drinks_totals "
+            "ON drinks_totals.order_id = orders.id "
+            "WHERE orders.status <> 'draft' GROUP BY 1, 2, 3",
+            [timezone.get_current_timezone_name()],
+        )
@@ -0,0 +1,523 @@
+"""
+Requests of the API benchmark, one per method of every route of the routers
+of source.urls, and their latency, queries and allocated memory.
+
+Each request runs in a transaction rolled back afterwards, so that creations,
+updates and deletions are measured again and again on the same dataset.
+"""
+
+import statistics
+import tracemalloc
+from datetime import timedelta
+from importlib import import_module
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Optional
+
+from core_app.management.commands.benchmark_photo_pipeline import make_photo
+from core_app.models import DishModel, DrinkModel, OrderModel
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, resolve
+from rest_framework.parsers import JSONParser
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from utils.common import photo_uploads
+from utils.enums import OrderStatusEnum
+from utils.otp_throttling import otp_sends, otp_throttle_buckets
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+PHOTO = object()  # Replaced by a new uploaded photo in each request
+
+COOKER = {
+    "firstname": "Jean",
+    "lastname": "Cuisinier",
+    "phone": "+33799999999",
+    "postal_code": "75011",
+    "siret": "99999999999999",
+    "street_name": "rue de la Roquette",
+    "street_number": "12",
+    "town": "Paris",
+    "address_complement": "",
+}
+CUSTOMER = {"firstname": "Jeanne", "lastname": "Cliente", "phone": "+33799999998"}
+DELIVER = {
+    "firstname": "Jules",
+    "lastname": "Livreur",
+    "phone": "+33799999997",
+    "delivery_vehicle": "bike",
+    "town": "Paris",
+    "delivery_radius": "10",
+    "siret": "99999999999997",
+}
+ADDRESS = {
+    "street_name": "rue Oberkampf",
+    "street_number": "20",
+    "postal_code": "75011",
+    "address_complement": "",
+    "town": "Paris",
+    "customer": "{customer_id}",
+}
+DISH = {
+    "category": "dish",
+    "cooker": "{cooker_id}",
+    "country": "Cameroun",
+    "description": "Ndolé, plantains et riz",
+    "name": "Ndolé",
+    "photo": PHOTO,
+    "price": "12.5",
+}
+DRINK = {
+    "unit": "centiliters",
+    "country": "Sénégal",
+    "description": "Jus de bissap",
+    "name": "Bissap",
+    "price": "3",
+    "photo": PHOTO,
+    "cooker": "{cooker_id}",
+    "capacity": "33",
+}
+ORDER = {
+    "addressID": "{address_id}",
+    "customerID": "{customer_id}",
+    "cookerID": "{cooker_id}",
+    "dishes_items": '[{{"dishID": "{dish_id}", "dishOrderedQuantity": 2}}]',
+    "drinks_items": '[{{"drinkID": "{drink_id}", "drinkOrderedQuantity": 1}}]',
+}
+JSON_ORDER = {
+    **ORDER,
+    "dishes_items": [{"dishID": "{dish_id}", "dishOrderedQuantity": 2}],
+    "drinks_items": [{"drinkID": "{drink_id}", "drinkOrderedQuantity": 1}],
+}
+LAST_30_DAYS = {"start_date": "{start_date}", "end_date": "{end_date}"}
+RATING = {"rating": 4, "comment": "Très bon"}
+
+# (method, path, user, data), the path and data being formatted with the
+# context of get_context. Users are the cooker, customer and deliver of the
+# context, or an app authenticated with its API key.
+SCENARIOS: list[tuple[str, str, Optional[str], dict]] = [
+    ("get", "/api/v1/", None, {}),
+    ("get", "/api/v1/cookers/", "cooker", {}),
+    ("post", "/api/v1/cookers/", "cooker-app", COOKER),
+    ("post", "/api/v1/cookers/otp/ask/", "cooker-app", {"phone": "{cooker_phone}"}),
+    ("post", "/api/v1/cookers/auth/", "cooker-app", {"phone": "{cooker_phone}"}),
+    (
+        "post",
+        "/api/v1/cookers/otp-verify/",
+        "cooker-app",
+        {"phone": "{cooker_phone}", "otp": "123456"},
+    ),
+    ("get", "/api/v1/cookers/{cooker_id}/", "cooker", {}),
+    ("put", "/api/v1/cookers/{cooker_id}/", "cooker", COOKER),
+    ("patch", "/api/v1/cookers/{cooker_id}/", "cooker", {"firstname": "Jean"}),
+    ("delete", "/api/v1/cookers/{cooker_id}/", "cooker", {}),
+    ("get", "/api/v1/cookers-dashboard/", "cooker", LAST_30_DAYS),
+    (
+        "get",
+        "/api/v1/cookers-dashboard/timeframe/",
+        "cooker",
+        {"timeframe": "month"},
+    ),
+    ("get", "/api/v1/cookers-orders/", "cooker", {"status": "pending"}),
+    ("put", "/api/v1/cookers-orders/{pending_order_id}/", "cooker", ORDER),
+    (
+        "patch",
+        "/api/v1/cookers-orders/{pending_order_id}/",
+        "cooker",
+        {"status": "processing"},
+    ),
+    ("get", "/api/v1/cookers-orders/{pending_order_id}/events/", "cooker", {}),
+    ("get", "/api/v1/cookers-orders-history/", "cooker", LAST_30_DAYS),
+    ("get", "/api/v1/dishes/", "cooker", {}),
+    ("post", "/api/v1/dishes/", "cooker", DISH),
+    ("get", "/api/v1/dishes/{dish_id}/", "cooker", {}),
+    ("put", "/api/v1/dishes/{dish_id}/", "cooker", DISH),
+    ("patch", "/api/v1/dishes/{dish_id}/", "cooker", {"price": "13"}),
+    ("delete", "/api/v1/dishes/{dish_id}/", "cooker", {}),
+    ("get", "/api/v1/drinks/", "cooker", {}),
+    ("post", "/api/v1/drinks/", "cooker", DRINK),
+    ("get", "/api/v1/drinks/{drink_id}/", "cooker", {}),
+    ("put", "/api/v1/drinks/{drink_id}/", "cooker", DRINK),
+    ("patch", "/api/v1/drinks/{drink_id}/", "cooker", {"price": "4"}),
+    ("delete", "/api/v1/drinks/{drink_id}/", "cooker", {}),
+    ("get", "/api/v1/customers/", "customer", {}),
+    ("post", "/api/v1/customers/", "customer-app", CUSTOMER),
+    (
+        "post",
+        "/api/v1/customers/otp/ask/",
+        "customer-app",
+        {"phone": "{customer_phone}"},
+    ),
+    ("post", "/api/v1/customers/auth/", "customer-app", {"phone": "{customer_phone}"}),
+    (
+        "post",
+        "/api/v1/customers/otp-verify/",
+        "customer-app",
+        {"phone": "{customer_phone}", "otp": "123456"},
+    ),
+    ("get", "/api/v1/customers/{customer_id}/", "customer", {}),
+    ("put", "/api/v1/customers/{customer_id}/", "customer", CUSTOMER),
+    ("patch", "/api/v1/customers/{customer_id}/", "customer", {"firstname": "Jo"}),
+    ("delete", "/api/v1/customers/{customer_id}/", "customer", {}),
+    (
+        "get",
+        "/api/v1/customers-dishes/",
+        "customer",
+        {"search_address_id": "{address_id}", "delivery_mode": "now"},
+    ),
+    ("get", "/api/v1/customers-dishes-countries/", "customer", {}),
+    ("get", "/api/v1/customers-drinks/", "customer", {"cooker_id": "{cooker_id}"}),
+    ("get", "/api/v1/customers-desserts/", "customer", {"cooker_id": "{cooker_id}"}),
+    ("get", "/api/v1/customers-starters/", "customer", {"cooker_id": "{cooker_id}"}),
+    ("get", "/api/v1/customers-addresses/", "customer", {}),
+    ("post", "/api/v1/customers-addresses/", "customer", ADDRESS),
+    ("get", "/api/v1/customers-addresses/{address_id}/", "customer", {}),
+    ("put", "/api/v1/customers-addresses/{address_id}/", "customer", ADDRESS),
+    (
+        "patch",
+        "/api/v1/customers-addresses/{address_id}/",
+        "customer",
+        {"town": "Paris"},
+    ),
+    ("delete", "/api/v1/customers-addresses/{address_id}/", "customer", {}),
+    ("get", "/api/v1/customers-orders/", "customer", {"status": "pending"}),
+    ("post", "/api/v1/customers-orders/", "customer", ORDER),
+    ("put", "/api/v1/customers-orders/{pending_order_id}/", "customer", ORDER),
+    (
+        "patch",
+        "/api/v1/customers-orders/{pending_order_id}/",
+        "customer",
+        {"status": "cancelled_by_customer"},
+    ),
+    ("get", "/api/v1/customers-orders/{pending_order_id}/events/", "customer", {}),
+    ("get", "/api/v1/customers-orders-history/", "customer", {}),
+    (
+        "post",
+        "/api/v1/customers-orders-dish-rating/",
+        "customer",
+        {"dishes_ids": ["{dish_id}", "{rated_dish_id}"], "ratings": [4, 5]},
+    ),
+    (
+        "post",
+        "/api/v1/customers-orders-drink-rating/",
+        "customer",
+        {"drink_ids": ["{drink_id}"], "ratings": [4]},
+    ),
+    (
+        "put",
+        "/api/v1/customers-orders-rating/{delivered_order_id}/",
+        "customer",
+        RATING,
+    ),
+    (
+        "patch",
+        "/api/v1/customers-orders-rating/{delivered_order_id}/",
+        "customer",
+        RATING,
+    ),
+    ("get", "/api/v1/delivers/", "deliver", {}),
+    ("post", "/api/v1/delivers/", "delivery-app", DELIVER),
+    ("post", "/api/v1/delivers/otp/ask/", "delivery-app", {"phone": "{deliver_phone}"}),
+    ("post", "/api/v1/delivers/auth/", "delivery-app", {"phone": "{deliver_phone}"}),
+    (
+        "post",
+        "/api/v1/delivers/otp-verify/",
+        "delivery-app",
+        {"phone": "{deliver_phone}", "otp": "123456"},
+    ),
+    ("get", "/api/v1/delivers/{deliver_id}/", "deliver", {}),
+    ("put", "/api/v1/delivers/{deliver_id}/", "deliver", DELIVER),
+    ("patch", "/api/v1/delivers/{deliver_id}/", "deliver", {"town": "Montreuil"}),
+    ("delete", "/api/v1/delivers/{deliver_id}/", "deliver", {}),
+    ("get", "/api/v1/delivers-stats/", "deliver", LAST_30_DAYS),
+    ("get", "/api/v1/delivers-stats/timeframe/", "deliver", {"timeframe": "month"}),
+    ("get", "/api/v1/delivers-history/", "deliver", {"start_date": "{start_date}"}),
+    ("post", "/api/v2/customers-orders/", "customer", JSON_ORDER),
+]
+
+
+def get_scenario_name(method: str, path: str) -> str:
+    return f"{method.upper()} {path}"
+
+
+def get_router_endpoints() -> set[tuple[str, str]]:
+    """
+    Methods and routes of the routers of the root URLconf, the format suffix
+    routes aside, routes being joined like in django.urls.ResolverMatch
+
+    :return: set of (method, route), ex: ("get", "api/v1/cookers/$")
+    """
+    # Imported on use, like Django does, views reading settings on import
+    urls = import_module(settings.ROOT_URLCONF)
+    routers_urls = [urls.router.urls, urls.router_v2.urls]
+    endpoints = set()
+
+    for resolver in urls.urlpatterns:
+        if not isinstance(resolver, URLResolver) or not any(
+            resolver.urlconf_name is router_urls for router_urls in routers_urls
+        ):
+            continue
+
+        for pattern in resolver.url_patterns:
+            if "format" in pattern.pattern.regex.groupindex:
+                continue
+
+            # The API root of DefaultRouter is not a viewset
+            methods = getattr(pattern.callback, "actions", {"get": "api_root"})
+
+            route = f"{resolver.pattern}{str(pattern.pattern).removeprefix('^')}"
+
+            for method in methods:
+                # HEAD, added to actions on the first request, is served by GET
+                if (
+                    method != "head"
+                    and method in pattern.callback.cls.http_method_names
+                ):
+                    endpoints.add((method, route))
+
+    return endpoints
+
+
+def get_scenarios_endpoints(context: dict) -> set[tuple[str, str]]:
+    return {
+        (method, resolve(path.format(**context)).route)
+        for method, path, _, _ in SCENARIOS
+    }
+
+
+def get_context() -> dict:
+    """
+    Ids, phones and dates of the requests, picked in the dataset: the
+    customer and cooker of the latest pending order, and the delivery man of
+    the latest delivered order of this customer
+    """
+    pending_order = (
+        OrderModel.objects.select_related("cooker", "customer")
+        .filter(status=OrderStatusEnum.PENDING)
+        .latest("id")
+    )
+    delivered_order = (
+        OrderModel.objects.select_related("delivery_man")
+        .filter(
+            customer_id=pending_order.customer_id,
+            status=OrderStatusEnum.DELIVERED,
+            delivery_man__isnull=False,
+        )
+        .latest("id")
+    )
+    dishes_ids = list(
+        DishModel.objects.filter(cooker_id=pending_order.cooker_id, is_enabled=True)
+        .order_by("id")
+        .values_list("id", flat=True)[:2]
+    )
+    drink = DrinkModel.objects.filter(cooker_id=pending_order.cooker_id).earliest("id")
+
+    return {
+        "cooker_id": pending_order.cooker_id,
+        "cooker_phone": pending_order.cooker.phone,
+        "customer_id": pending_order.customer_id,
+        "customer_phone": pending_order.customer.phone,
+        "address_id": pending_order.address_id,
+        "deliver_id": delivered_order.delivery_man_id,
+        "deliver_phone": delivered_order.delivery_man.phone,
+        "dish_id": dishes_ids[0],
+        "rated_dish_id": dishes_ids[-1],
+        "drink_id": drink.id,
+        "pending_order_id": pending_order.id,
+        "delivered_order_id": delivered_order.id,
+        "start_date": (pending_order.created - timedelta(days=30)).isoformat(),
+        "end_date": pending_order.created.isoformat(),
+    }
+
+
+def format_data(data: Any, context: dict, photo: bytes) -> Any:
+    if data is PHOTO:
+        return SimpleUploadedFile("photo.jpg", photo, "image/jpeg")
+
+    if isinstance(data, str):
+        return data.format(**context)
+
+    if isinstance(data, list):
+        return [format_data(item, context, photo) for item in data]
+
+    if isinstance(data, dict):
+        return {key: format_data(value, context, photo) for key, value in data.items()}
+
+    return data
+
+
+def get_headers(user: Optional[str], context: dict) -> dict:
+    if user is None:
+        return {}
+
+    if user.endswith("-app"):
+        app_origin, api_key = {
+            "cooker-app": (settings.COOKER_APP_ORIGIN, settings.COOKER_APP_API_KEY),
+            "customer-app": (
+                settings.CUSTOMER_APP_ORIGIN,
+                settings.CUSTOMER_APP_API_KEY,
+            ),
+            "delivery-app": (
+                settings.DELIVERY_APP_ORIGIN,
+                settings.DELIVERY_APP_API_KEY,
+            ),
+        }[user]
+
+        return {"HTTP_APP_ORIGIN": app_origin, "HTTP_X_API_KEY": api_key}
+
+    token = AccessToken()
+    token[api_settings.USER_ID_CLAIM] = context[f"{user}_id"]
+
+    return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+def send_request(
+    client: APIClient, method: str, path: str, data: dict, headers: dict
+) -> Any:
+    view_class = resolve(path).func.cls
+    request_format = (
+        "json" if issubclass(view_class.parser_classes[0], JSONParser) else "multipart"
+    )
+
+    with transaction.atomic():
+        if method == "get":
+            response = client.get(path, data, **headers)
+        elif method == "delete":
+            response = client.delete(path, **headers)
+        else:
+            response = getattr(client, method)(
+                path, data, format=request_format, **headers
+            )
+
+        transaction.set_rollback(True)
+
+    # Only the database rows are rolled back
+    otp_throttle_buckets.clear_local()
+    otp_sends.clear_local()
+
+    return response
+
+
+def count_queries(captured_queries: list[dict]) -> int:
+    # Savepoints stand for the transactions of requests run outside of one
+    return sum(
+        not query["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO"))
+        for query in captured_queries
+    )
+
+
+def benchmark_endpoints(repeat: int) -> dict[str, dict]:
+    """
+    Send the request of each scenario once to warm up, once to count the
+    queries, once to trace the allocated memory, then `repeat` times to
+    measure the latency, the photos being processed after each request.
+
+    :return: status, median and 95th percentile latency in ms, number of
+    queries and peak of allocated memory in KB per scenario name
+    """
+    client = APIClient(raise_request_exception=False)
+    context = get_context()
+    photo = make_photo(1600, 1200)
+    results = {}
+
+    for method, path_template, user, data_template in SCENARIOS:
+        path = path_template.format(**context)
+        headers = get_headers(user, context)
+
+        def send() -> Any:
+            response = send_request(
+                client,
+                method,
+                path,
+                format_data(data_template, context, photo),
+                headers,
+            )
+            photo_uploads.join()
+
+            return response
+
+        response = send()
+        reset_queries()  # The log keeps the last 9000 queries only
+
+        with CaptureQueriesContext(connection) as queries_context:
+            send()
+
+        # Captured queries are read from the log, reset by the next requests
+        queries_number = count_queries(queries_context.captured_queries)
+
+        tracemalloc.start()
+        send()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        latencies = []
+
+        for _ in range(repeat):
+            data = format_data(data_template, context, photo)
+            start = perf_counter()
+            send_request(client, method, path, data, headers)
+            latencies.append((perf_counter() - start) * 1000)
+            photo_uploads.join()
+
+        results[get_scenario_name(method, path_template)] = {
+            "status": response.status_code,
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(
+                statistics.quantiles(latencies, n=20)[-1]
+                if len(latencies) > 1
+                else latencies[0],
+                2,
+            ),
+            "queries": queries_number,
+            "peak_kb": round(peak_memory / 1024, 1),
+        }
+
+    return results
+
+
+def compare_with_baseline(
+    results: dict[str, dict],
+    baseline: dict[str, dict],
+    latency_tolerance: float,
+    memory_tolerance: float,
+) -> list[str]:
+    """
+    Statuses have to be the same, numbers of queries the same or lower,
+    latencies and allocated memory within a tolerance, plus 1 ms and 64 KB
+    for the fastest and smallest requests to not be flaky.
+
+    :return: the regressions, ex: "GET /api/v1/dishes/: 12 queries instead of 3"
+    """
+    regressions = []
+
+    for name, result in results.items():
+        expected = baseline.get(name)
+
+        if expected is None:
+            continue
+
+        if result["status"] != expected["status"]:
+            regressions.append(
+                f"{name}: status {result['status']} instead of {expected['status']}"
+            )
+
+        if result["queries"] > expected["queries"]:
+            regressions.append(
+                f"{name}: {result['queries']} queries instead of {expected['queries']}"
+            )
+
+        if result["p50_ms"] > expected["p50_ms"] * (1 + latency_tolerance) + 1:
+            regressions.append(
+                f"{name}: {result['p50_ms']} ms instead of {expected['p50_ms']} ms"
+            )
+
+        if result["peak_kb"] > expected["peak_kb"] * (1 + memory_tolerance) + 64:
+            regressions.append(
+                f"{name}: {result['peak_kb']} KB allocated instead of "
+                f"{expected['peak_kb']} KB"
+            )
+
+    return regressions
@@ -0,0 +1,147 @@
+"""
+Local stand-ins of Stripe, Google Maps, Pinpoint and S3, answering like them
+without network, so that the API benchmark measures the API only.
+"""
+
+import json
+import zlib
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+import stripe
+from django.test import override_settings
+from stripe import http_client
+from utils.common import pinpoint_client
+from utils.distance_computer import google_map_client
+
+STRIPE_OBJECTS = {
+    "customers": ("cus", "customer"),
+    "ephemeral_keys": ("ephkey", "ephemeral_key"),
+    "payment_intents": ("pi", "payment_intent"),
+    "refunds": ("re", "refund"),
+}
+
+
+class StripeStandIn(http_client.HTTPClient):
+    """
+    HTTP client of the Stripe library answering the calls of utils.common,
+    the responses going through the library parsing like real ones.
+    """
+
+    name = "stand-in"
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Any,
+        post_data: Any = None,
+        *,
+        _usage: Optional[list[str]] = None,
+    ) -> tuple[str, int, dict]:
+        path_parts = urlsplit(url).path.split("/")  # ["", "v1", resource, id]
+        prefix, object_name = STRIPE_OBJECTS.get(path_parts[2], ("obj", "object"))
+
+        if method == "get":
+            body: dict = {"object": "list", "data": [], "has_more": False}
+        else:
+            object_id = (
+                path_parts[3] if len(path_parts) > 3 else f"{prefix}_{uuid4().hex}"
+            )
+            body = {
+                "id": object_id,
+                "object": object_name,
+                "client_secret": f"{object_id}_secret",
+                "secret": f"ek_test_{uuid4().hex}",
+                "deleted": method == "delete",
+            }
+
+        return json.dumps(body), 200, {"request-id": f"req_{uuid4().hex}"}
+
+    def close(self) -> None:
+        pass
+
+
+class GoogleMapsStandIn:
+    """
+    Distance matrix of up to 20 km between addresses, always the same for
+    the same addresses
+    """
+
+    def distance_matrix(
+        self, origins: list[str], destinations: list[str], **kwargs
+    ) -> dict:
+        rows = []
+
+        for origin in origins:
+            elements = []
+
+            for destination in destinations:
+                meters = zlib.crc32(f"{origin}|{destination}".encode()) % 20_000
+                elements.append(
+                    {
+                        "distance": {
+                            "text": f"{meters / 1000:.1f} km",
+                            "value": meters,
+                        },
+                        "duration": {"text": "", "value": meters // 5},
+                        "status": "OK",
+                    }
+                )
+
+            rows.append({"elements": elements})
+
+        return {
+            "destination_addresses": destinations,
+            "origin_addresses": origins,
+            "rows": rows,
+            "status": "OK",
+        }
+
+
+class PinpointStandIn:
+    """Every OTP is delivered and every OTP is valid"""
+
+    def send_otp_message(
+        self, ApplicationId: str, SendOTPMessageRequestParameters: dict
+    ) -> dict:
+        phone = SendOTPMessageRequestParameters["DestinationIdentity"]
+
+        return {
+            "MessageResponse": {
+                "ApplicationId": ApplicationId,
+                "Result": {
+                    phone: {"DeliveryStatus": "SUCCESSFUL", "StatusCode": 200},
+                },
+            },
+        }
+
+    def verify_otp_message(
+        self, ApplicationId: str, VerifyOTPMessageRequestParameters: dict
+    ) -> dict:
+        return {"VerificationResponse": {"Valid": True}}
+
+
+@contextmanager
+def external_services_stand_ins(storage_root: str) -> Iterator[None]:
+    """
+    Replace the external services by their stand-ins, photos being stored in
+    a utils.storage.filesystem.FileSystemStorage under storage_root
+    """
+    previous_stripe_client = stripe.default_http_client
+    stripe.default_http_client = StripeStandIn()
+    google_map_client.replace(GoogleMapsStandIn())
+    pinpoint_client.replace(PinpointStandIn())
+
+    try:
+        with override_settings(
+            STORAGE_BACKEND="utils.storage.filesystem.FileSystemStorage",
+            STORAGE_FILESYSTEM_ROOT=storage_root,
+        ):
+            yield
+    finally:
+        stripe.default_http_client = previous_stripe_client
+        google_map_client.reset()
+        pinpoint_client.reset()
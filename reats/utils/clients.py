@@ -0,0 +1,48 @@
+from threading import Lock
+from typing import Any, Callable
+
+# boto3 sessions are not thread-safe, so clients are created one at a time
+clients_creation_lock = Lock()
+
+
+class LazyClient:
+    """
+    Proxy to an API client created on first use instead of at import time.
+
+    The client is then shared by every thread of the process, along with its
+    connection pool. boto3, googlemaps and Stripe clients are thread-safe once
+    created.
+    """
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self._factory = factory
+        self._client: Any = None
+
+    @property
+    def is_created(self) -> bool:
+        return self._client is not None
+
+    def reset(self) -> None:
+        """
+        Create the client again on next use, e.g. after a settings change
+        """
+        with clients_creation_lock:
+            self._client = None
+
+    def replace(self, client: Any) -> None:
+        """
+        Use another client until the next reset, e.g. a local stand-in
+        """
+        with clients_creation_lock:
+            self._client = client
+
+    def get_client(self) -> Any:
+        if self._client is None:
+            with clients_creation_lock:
+                if self._client is None:
+                    self._client = self._factory()
+
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get_client(), name)
@@ -3,23 +3,55 @@ import logging
 import os
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Type, Union
+from functools import lru_cache
+from http import HTTPStatus
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from typing import IO, Type, Union
 
 import boto3
-import phonenumbers
 import stripe
 import stripe.error
+from asgiref.sync import sync_to_async
 from botocore.exceptions import ClientError
-from core_app.models import CookerModel, CustomerModel, DeliverModel, OrderModel
+from core_app.models import (
+    CookerModel,
+    CustomerModel,
+    DeliverModel,
+    DishModel,
+    DrinkModel,
+    OrderModel,
+)
 from django.conf import settings
-from django.core.files.uploadedfile import InMemoryUploadedFile
-from phonenumbers.phonenumberutil import NumberParseException
+from django.core.files.uploadedfile import UploadedFile
+from django.db import close_old_connections
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Greatest, Least
+from PIL import Image, UnidentifiedImageError
+from rest_framework.exceptions import ValidationError
+from utils.async_views import run_external_call
+from utils.clients import LazyClient
 from utils.enums import OrderStatusEnum
+from utils.images import (
+    ORIGINAL_RENDITION_NAME,
+    get_original_photo_key,
+    get_photo_keys,
+    get_photo_variant_key,
+    get_rendition_names,
+    process_photo,
+)
+from utils.otp_throttling import otp_sends
+from utils.phones import parse_phone
+from utils.s3_transfers import DeleteQueue, UploadExecutor
+from utils.storage.base import storage
 
 logger = logging.getLogger("watchtower-logger")
-session = boto3.session.Session(region_name=os.getenv("AWS_REGION"))
-s3 = session.client("s3", config=boto3.session.Config(signature_version="s3v4"))
-pinpoint_client = boto3.client("pinpoint", region_name=os.getenv("AWS_REGION"))
+pinpoint_client = LazyClient(
+    lambda: boto3.client("pinpoint", region_name=os.getenv("AWS_REGION"))
+)
+photo_uploads = UploadExecutor(thread_name_prefix="s3-uploads")
+# Models storing the keys returned by upload_photo
+PHOTO_MODELS = (CookerModel, CustomerModel, DeliverModel, DishModel, DrinkModel)
 stripe.api_key = settings.STRIPE_PRIVATE_API_KEY
 
 
@@ -53,60 +85,222 @@ def compute_start_date(timeframe: str) -> datetime:
     return start_date
 
 
-def upload_image_to_s3(image: InMemoryUploadedFile, image_path: str) -> None:
-    try:
-        s3.upload_fileobj(
-            image,
-            os.getenv("AWS_S3_BUCKET"),
-            image_path,
-        )
-    except ClientError as err:
-        logger.error(err)
-    else:
-        logger.info(f"{image_path} has been uploaded to S3.")
+def upload_photo(image: UploadedFile, photo_directory: str) -> str:
+    """
+    Spool the uploaded photo and upload its renditions, see
+    utils.images.process_photo, in the background under
+    <photo_directory>/<SHA-256 of the uploaded file>/
 
+    The same photo uploaded twice in a directory is stored once, and each key
+    always holds the same content, see settings.PHOTO_CACHE_CONTROL.
 
-def get_pre_signed_url(key: str) -> str:
-    try:
-        url = s3.generate_presigned_url(
-            ClientMethod="get_object",
-            Params={
-                "Bucket": os.getenv("AWS_S3_BUCKET"),
-                "Key": key,
-            },
-        )
-    except ClientError as err:
-        logger.error(err)
-    else:
-        logger.info(url)
+    A photo failing to be processed in the background is then replaced by
+    the default one of the models storing it, see clear_photo.
 
-    return url
+    :return: the photo key to store in the model, pending until the upload ends
+    :raises ValidationError: when the uploaded file is not an image
+    """
+    photo_key, is_uploaded = submit_photo_upload(image, photo_directory)
 
+    if not is_uploaded:
+        clear_photo(photo_key)
+        raise ValidationError({"photo": "Invalid image"})
+
+    return photo_key
+
+
+async def aupload_photo(image: UploadedFile, photo_directory: str) -> str:
+    """
+    Async version of upload_photo
+    """
+    photo_key, is_uploaded = await run_external_call(
+        submit_photo_upload, image, photo_directory
+    )
+
+    if not is_uploaded:
+        await sync_to_async(clear_photo)(photo_key)
+        raise ValidationError({"photo": "Invalid image"})
+
+    return photo_key
+
+
+def submit_photo_upload(image: UploadedFile, photo_directory: str) -> tuple[str, bool]:
+    """
+    Storage part of upload_photo, never querying the database so that it can
+    run through run_external_call.
+
+    :return: the photo key, and False when it failed to be uploaded in the
+        calling thread and has to be cleared
+    :raises ValidationError: when the uploaded file is not an image
+    """
+    # Uploaded files are removed with the request, the background upload reads
+    # this copy instead
+    photo_file = SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+    photo_hash = hashlib.sha256()
+
+    for chunk in image.chunks():
+        photo_hash.update(chunk)
+        photo_file.write(chunk)
 
-def delete_s3_object(key: str) -> None:
     try:
-        s3.delete_object(Bucket=os.getenv("AWS_S3_BUCKET"), Key=key)
-    except ClientError as err:
+        photo_file.seek(0)
+        with Image.open(photo_file):  # Only reads the header
+            pass
+    except (UnidentifiedImageError, Image.DecompressionBombError) as err:
         logger.error(err)
-    else:
-        logger.info(f"{key} has been removed from {os.getenv('AWS_S3_BUCKET')} bucket")
+        photo_file.close()
+        raise ValidationError({"photo": "Invalid image"})
 
+    photo_key_prefix = f"{photo_directory}/{photo_hash.hexdigest()}/"
+    photo_key = photo_key_prefix + ORIGINAL_RENDITION_NAME
+    photo_deletes.discard(get_photo_keys(photo_key))  # Uploaded again before deleted
+    photo_file.seek(0)
 
-def format_phone(phone: str) -> str:
-    if phone in settings.PHONE_BLACK_LIST:
-        raise NumberParseException(
-            NumberParseException.NOT_A_NUMBER,
-            "This phone number is forbidden",
+    if not settings.S3_UPLOADS_MAX_CONCURRENCY:
+        return photo_key, upload_photo_renditions(photo_file, photo_key_prefix)
+
+    photo_uploads.submit(upload_photo_in_background, photo_file, photo_key_prefix)
+
+    return photo_key, True
+
+
+def upload_photo_in_background(photo_file: IO, photo_key_prefix: str) -> None:
+    if not upload_photo_renditions(photo_file, photo_key_prefix):
+        clear_photo(photo_key_prefix + ORIGINAL_RENDITION_NAME)
+        # Not run by a request thread, nothing else closes its connections
+        close_old_connections()
+
+
+def upload_photo_renditions(photo_file: IO, photo_key_prefix: str) -> bool:
+    with photo_file:
+        # Only complete uploads are skipped, the last rendition is uploaded last
+        if storage.exists(photo_key_prefix + get_rendition_names()[-1]):
+            logger.info(f"{photo_key_prefix} already uploaded")
+            return True
+
+        try:
+            renditions = process_photo(photo_file)
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as err:
+            logger.error(f"{photo_key_prefix} not uploaded: {err}")
+            return False
+
+    for name, (content, content_type) in renditions.items():
+        storage.upload(
+            BytesIO(content),
+            photo_key_prefix + name,
+            content_type,
+            settings.PHOTO_CACHE_CONTROL,
         )
 
-    e164_phone_number = phonenumbers.format_number(
-        phonenumbers.parse(
-            phone,
-            settings.PHONE_REGION,
-        ),
-        phonenumbers.PhoneNumberFormat.E164,
+    return True
+
+
+def clear_photo(photo_key: str) -> None:
+    """
+    Replace a photo that could not be uploaded by the default photo of each
+    model storing it, an empty key when the model has none
+    """
+    for model in PHOTO_MODELS:
+        model.objects.filter(photo=photo_key).update(
+            photo=model._meta.get_field("photo").get_default()
+        )
+
+
+def get_photo_url(photo_key: str, variant: str) -> str:
+    """
+    URL of the photo rendition fitting the endpoint, see settings.PHOTO_VARIANTS
+
+    URLs stay the same for settings.PHOTO_URL_CACHE_TIME at least, so that
+    clients keep the photo in cache. Behind a CDN, see settings.PHOTO_URL_BASE,
+    they never change.
+    """
+    if not photo_key:
+        return ""  # Cleared by clear_photo
+
+    key = get_photo_variant_key(photo_key, variant)
+
+    if settings.PHOTO_URL_BASE:
+        return f"{settings.PHOTO_URL_BASE}/{key}"
+
+    return get_cached_pre_signed_url(
+        key, int(time.time() // settings.PHOTO_URL_CACHE_TIME)
     )
-    return e164_phone_number
+
+
+@lru_cache(maxsize=10_000)
+def get_cached_pre_signed_url(key: str, time_window: int) -> str:
+    # Still valid for a whole window when signed at the end of its own
+    return get_pre_signed_url(key, expires_in=2 * settings.PHOTO_URL_CACHE_TIME)
+
+
+def get_pre_signed_url(key: str, expires_in: int = 3600) -> str:
+    return storage.get_signed_url(key, expires_in)
+
+
+def delete_unused_photo_keys(keys: list[str]) -> None:
+    """
+    Delete the keys of the photos no model stores. While they were queued,
+    another process can have stored the same photo again without uploading
+    it, see upload_photo_renditions.
+    """
+    # Keys of photos uploaded before the renditions existed are stored as is
+    stored_keys = {key: {key, get_original_photo_key(key)} for key in keys}
+    used_keys: set[str] = set()
+
+    for model in PHOTO_MODELS:
+        used_keys.update(
+            model.objects.filter(photo__in=set().union(*stored_keys.values()))
+            .values_list("photo", flat=True)
+            .distinct()
+        )
+
+    unused_keys = [key for key in keys if not stored_keys[key] & used_keys]
+
+    if unused_keys:
+        storage.delete(unused_keys)
+
+
+# Keys go to storage.delete in batches, see settings.S3_DELETES_FLUSH_INTERVAL
+photo_deletes = DeleteQueue(delete_unused_photo_keys)
+
+
+def delete_photo(photo_key: str) -> None:
+    """
+    Queue the deletion of every rendition of a photo, see
+    settings.S3_DELETES_FLUSH_INTERVAL
+    """
+    photo_deletes.put(get_photo_keys(photo_key))
+
+
+def delete_photo_if_unused(
+    model: Type[Union[DishModel, DrinkModel]], photo_key: str
+) -> None:
+    """
+    Delete a photo of a dish or drink unless another one still shows it, the
+    same photo uploaded for several of them being stored once
+    """
+    if not model.objects.filter(photo=photo_key).exists():
+        delete_photo(photo_key)
+
+
+def format_phone(phone: str) -> str:
+    return parse_phone(phone)[0]
+
+
+def get_user_by_app_origin(
+    app_origin: str, phone: str
+) -> Union[CookerModel, CustomerModel, DeliverModel, None]:
+    """
+    Fetch the user of the table implied by the App-Origin header value, with
+    a single lookup on its unique phone index.
+    """
+    model: Type[Union[CookerModel, CustomerModel, DeliverModel]] = {
+        settings.COOKER_APP_ORIGIN: CookerModel,
+        settings.CUSTOMER_APP_ORIGIN: CustomerModel,
+        settings.DELIVERY_APP_ORIGIN: DeliverModel,
+    }[app_origin]
+
+    return model.objects.filter(phone=phone).first()
 
 
 def generate_ref_id(phone: str):
@@ -137,13 +331,80 @@ def send_otp(phone: str) -> Union[dict, None]:
     return response
 
 
+def is_otp_delivered(otp_response: Union[dict, None], phone: str) -> bool:
+    if otp_response is None:
+        logger.error(f"Failed to send an OTP to {phone}")
+        return False
+
+    otp_result: dict = (
+        otp_response.get("MessageResponse", {}).get("Result", {}).get(phone, {})
+    )
+
+    if otp_result.get("StatusCode") != HTTPStatus.OK:
+        logger.error(
+            f"Expected {HTTPStatus.OK} but got {otp_result.get('StatusCode')} in otp response"
+        )
+        return False
+
+    if otp_result.get("DeliveryStatus") != "SUCCESSFUL":
+        logger.error(
+            f"Expected SUCCESSFUL but got {otp_result.get('DeliveryStatus')} in otp delivery status"
+        )
+        return False
+
+    return True
+
+
+def get_otp_validity_period() -> timedelta:
+    return timedelta(minutes=int(os.getenv("AWS_PINPOINT_VALIDITY_PERIOD", "10")))
+
+
+def request_otp(phone: str, deduplicate: bool = True) -> bool:
+    """
+    Send an OTP to a phone number, unless an OTP sent earlier is still valid
+    and deduplication is asked.
+
+    :return: whether the phone number has a valid OTP on its way
+    """
+    if deduplicate and otp_sends.is_recently_sent(phone, get_otp_validity_period()):
+        logger.info(f"An OTP sent to {phone} is still valid, skipping a new one")
+        return True
+
+    if not is_otp_delivered(send_otp(phone), phone):
+        return False
+
+    otp_sends.mark_sent(phone)
+
+    return True
+
+
+async def arequest_otp(phone: str, deduplicate: bool = True) -> bool:
+    """
+    Async version of request_otp
+    """
+    if deduplicate and await sync_to_async(otp_sends.is_recently_sent)(
+        phone, get_otp_validity_period()
+    ):
+        logger.info(f"An OTP sent to {phone} is still valid, skipping a new one")
+        return True
+
+    if not is_otp_delivered(await run_external_call(send_otp, phone), phone):
+        return False
+
+    await sync_to_async(otp_sends.mark_sent)(phone)
+
+    return True
+
+
 def is_otp_valid(data: dict) -> bool:
+    e164_phone_format = format_phone(data["phone"])
+
     try:
         response = pinpoint_client.verify_otp_message(
             ApplicationId=os.getenv("AWS_PINPOINT_APP_ID"),
             VerifyOTPMessageRequestParameters={
-                "DestinationIdentity": format_phone(data["phone"]),
-                "ReferenceId": generate_ref_id(format_phone(data["phone"])),
+                "DestinationIdentity": e164_phone_format,
+                "ReferenceId": generate_ref_id(e164_phone_format),
                 "Otp": data["otp"],
             },
         )
@@ -152,7 +413,13 @@ def is_otp_valid(data: dict) -> bool:
         logger.info(e.response)
         return False
 
-    return response["VerificationResponse"]["Valid"]
+    is_valid: bool = response["VerificationResponse"]["Valid"]
+
+    if is_valid:
+        # The OTP cannot be used twice, the next authentication needs a new one
+        otp_sends.mark_used(e164_phone_format)
+
+    return is_valid
 
 
 def activate_user(
@@ -256,31 +523,56 @@ def compute_order_total_amount(order: OrderModel) -> int:
     return order_items_total + order.delivery_fees + service_fees
 
 
-def create_payment_intent(order: OrderModel) -> dict:
-    order_total_amount: Union[int, float] = compute_order_total_amount(order)
+def create_stripe_payment_intent(
+    order_id: int, order_total_amount: Union[int, float], stripe_customer_id: str
+) -> dict:
     order_total_amount_in_cents: int = int(order_total_amount * 100)
-    order_customer: CustomerModel = order.customer
 
     try:
         response = stripe.PaymentIntent.create(
             amount=order_total_amount_in_cents,
             currency=settings.DEFAULT_CURRENCY,
             automatic_payment_methods={"enabled": True},
-            customer=order_customer.stripe_id,
+            customer=stripe_customer_id,
         )
     except stripe.StripeError as e:
-        logger.error(f"Failed to create payment intent for order {order.id}")
+        logger.error(f"Failed to create payment intent for order {order_id}")
         logger.error(f"Stripe error: {e}")
         raise
     except Exception as e:
-        logger.error(f"Failed to create payment intent for order {order.id}")
+        logger.error(f"Failed to create payment intent for order {order_id}")
         logger.error(f"An unexpected error occurred: {e}")
         raise
     else:
-        logger.info(f"Payment intent for order {order.id} created successfully")
+        logger.info(f"Payment intent for order {order_id} created successfully")
         return stripe.util.convert_to_dict(response)
 
 
+def create_payment_intent(order: OrderModel) -> dict:
+    order_customer: CustomerModel = order.customer
+
+    return create_stripe_payment_intent(
+        order.id, compute_order_total_amount(order), order_customer.stripe_id
+    )
+
+
+async def acreate_payment_intent(order: OrderModel) -> dict:
+    """
+    Async version of create_payment_intent
+    """
+    order_total_amount: Union[int, float] = await sync_to_async(
+        compute_order_total_amount
+    )(order)
+    order_customer: CustomerModel = await sync_to_async(lambda: order.customer)()
+
+    return await run_external_call(
+        create_stripe_payment_intent,
+        order.id,
+        order_total_amount,
+        order_customer.stripe_id,
+    )
+
+
 def update_payment_intent(
     order: OrderModel,
 ) -> None:
@@ -402,37 +694,86 @@ def get_delivery_fee(distance: float) -> float:
     return round(delivery_fee, 2)
 
 
-def update_cooker_acceptance_rate(
-    instance: OrderModel,
-    new_status: str,
-) -> None:
+def get_acceptance_rate_delta(new_status: str) -> Union[int, None]:
     """
-    Update the cookers's acceptance rate based on the new status.
+    Get the acceptance rate adjustment due to an order switching to new_status.
 
-    Basically, only PROCESSING and CANCELLED_BY_COOKER statuses are taken into account.
+    Basically, only DELIVERED and CANCELLED_BY_COOKER statuses are taken into account.
 
-    :param instance: The cooker instance
     :param new_status: The new status
+    :return: The delta to apply, None if the status is not taken into account
     """
-
     if new_status == OrderStatusEnum.CANCELLED_BY_COOKER:
-        new_value = (
-            instance.cooker.acceptance_rate - settings.ACCEPTANCE_RATE_DECREASE_VALUE
+        return -settings.ACCEPTANCE_RATE_DECREASE_VALUE
+
+    if new_status == OrderStatusEnum.DELIVERED:
+        return settings.ACCEPTANCE_RATE_INCREASE_VALUE
+
+    return None
+
+
+def update_cookers_acceptance_rates(
+    cookers_new_statuses: list[tuple[int, str]],
+) -> int:
+    """
+    Apply many acceptance rate adjustments in a single clamped UPDATE statement.
+
+    Adjustments of a same cooker are applied in order, each one being clamped between
+    0 and 100, as if they had been applied one after the other. Successive clamped
+    additions always reduce to a single one, min(max(rate + offset, low), high),
+    whose offset and bounds are computed here for each cooker.
+
+    :param cookers_new_statuses: (cooker id, new order status) pairs
+    :return: The number of updated cookers
+    """
+    # Cooker id -> (offset, low, high)
+    clamps: dict[int, tuple[float, float, float]] = {}
+
+    for cooker_id, new_status in cookers_new_statuses:
+        delta = get_acceptance_rate_delta(new_status)
+
+        if delta is None:
+            logger.info(f"Status {new_status} is not taken into account")
+            continue
+
+        offset, low, high = clamps.get(cooker_id, (0.0, 0.0, 100.0))
+        clamps[cooker_id] = (
+            offset + delta,
+            min(max(low + delta, 0.0), 100.0),
+            min(max(high + delta, 0.0), 100.0),
         )
-    elif new_status == OrderStatusEnum.DELIVERED:
-        new_value = (
-            instance.cooker.acceptance_rate + settings.ACCEPTANCE_RATE_INCREASE_VALUE
+
+    if not clamps:
+        return 0
+
+    def get_case(index: int) -> Case:
+        return Case(
+            *[
+                When(pk=cooker_id, then=Value(clamp[index]))
+                for cooker_id, clamp in clamps.items()
+            ],
+            output_field=FloatField(),
         )
-    else:
-        logger.info(f"Status {new_status} is not taken into account")
-        return
 
-    if new_value <= 0:
-        new_value = 0
+    return CookerModel.objects.filter(pk__in=clamps).update(
+        acceptance_rate=Least(
+            Greatest(F("acceptance_rate") + get_case(0), get_case(1)),
+            get_case(2),
+        ),
+        last_acceptance_rate_update_date=datetime.now(timezone.utc),
+    )
+
+
+def update_cooker_acceptance_rate(
+    instance: OrderModel,
+    new_status: str,
+) -> None:
+    """
+    Update the cookers's acceptance rate based on the new status.
 
-    if new_value >= 100:
-        new_value = 100
+    Basically, only DELIVERED and CANCELLED_BY_COOKER statuses are taken into account.
 
-    instance.cooker.acceptance_rate = new_value
-    instance.cooker.last_acceptance_rate_update_date = datetime.now(timezone.utc)
-    instance.cooker.save()
+    :param instance: The order instance
+    :param new_status: The new status
+    """
+    update_cookers_acceptance_rates([(instance.cooker_id, new_status)])
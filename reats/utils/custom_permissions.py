@@ -3,7 +3,6 @@ import logging
 from django.conf import settings
 from rest_framework.permissions import BasePermission
 from rest_framework.request import Request
-from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 
 logger = logging.getLogger("watchtower-logger")
 
@@ -16,12 +15,8 @@ WHITE_LIST = [
 
 class UserPermission(BasePermission):
     def has_permission(self, request: Request, view) -> bool:
-        JWT_authenticator = JWTStatelessUserAuthentication()
-        response = JWT_authenticator.authenticate(request)
-        logger.info(request)
-        logger.info(response)
-
-        if request.user and response:
+        # request.auth is the token validated by the authentication classes
+        if request.user and request.auth is not None:
             logger.info(f"Permission granted for user {request.user}")
             return True
         logger.info(f"Permission denied for user {request.user}")
@@ -0,0 +1,51 @@
+import logging
+
+from django.conf import settings
+from phonenumbers.phonenumberutil import NumberParseException
+from rest_framework.request import Request
+from rest_framework.throttling import BaseThrottle
+from utils.common import format_phone
+from utils.otp_throttling import otp_throttle_buckets
+
+logger = logging.getLogger("watchtower-logger")
+
+
+class OtpRequestThrottle(BaseThrottle):
+    """
+    Token buckets per IP address, then per phone number, for the actions
+    sending an OTP.
+    """
+
+    wait_time: float = 0.0
+
+    def allow_request(self, request: Request, view) -> bool:
+        ip_address = self.get_ident(request)
+        self.wait_time = otp_throttle_buckets.consume(
+            f"ip:{ip_address}",
+            settings.OTP_IP_BUCKET_CAPACITY,
+            settings.OTP_IP_BUCKET_REFILL_TIME,
+        )
+
+        if self.wait_time:
+            logger.warning(f"Too many OTP requests from {ip_address}")
+            return False
+
+        try:
+            e164_phone_format = format_phone(str(request.data.get("phone")))
+        except NumberParseException:
+            return True  # Rejected by the view itself
+
+        self.wait_time = otp_throttle_buckets.consume(
+            f"phone:{e164_phone_format}",
+            settings.OTP_PHONE_BUCKET_CAPACITY,
+            settings.OTP_PHONE_BUCKET_REFILL_TIME,
+        )
+
+        if self.wait_time:
+            logger.warning(f"Too many OTP requests for {e164_phone_format}")
+            return False
+
+        return True
+
+    def wait(self) -> float:
+        return self.wait_time
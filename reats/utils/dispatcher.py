@@ -0,0 +1,136 @@
+import logging
+
+import numpy as np
+from core_app.models import DeliverModel, OrderModel
+from django.db import transaction
+from django.db.models import Exists, OuterRef, QuerySet
+from django.utils import timezone
+from scipy.optimize import linear_sum_assignment
+from utils.enums import OrderStatusEnum
+
+logger = logging.getLogger("watchtower-logger")
+
+EARTH_RADIUS = 6371.0  # in KM
+UNREACHABLE_COST = 1e9  # any distance above a delivery radius
+
+
+def compute_haversine_distance_matrix(
+    origins: np.ndarray,
+    destinations: np.ndarray,
+) -> np.ndarray:
+    """
+    Compute the great-circle distance between every origin and every destination
+
+    :param origins: array of shape (n, 2) containing (latitude, longitude) in degrees
+    :param destinations: array of shape (m, 2) containing (latitude, longitude) in degrees
+    :return: array of shape (n, m) containing distances in KM
+    """
+    origins_radians = np.radians(origins)[:, np.newaxis, :]
+    destinations_radians = np.radians(destinations)[np.newaxis, :, :]
+    delta = destinations_radians - origins_radians
+
+    haversine = (
+        np.sin(delta[..., 0] / 2) ** 2
+        + np.cos(origins_radians[..., 0])
+        * np.cos(destinations_radians[..., 0])
+        * np.sin(delta[..., 1] / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(haversine))
+
+
+def get_dispatchable_orders() -> QuerySet:
+    return (
+        OrderModel.objects.filter(
+            status=OrderStatusEnum.COMPLETED,
+            delivery_man__isnull=True,
+            cooker__latitude__isnull=False,
+            cooker__longitude__isnull=False,
+        )
+        .select_related("cooker")
+        .order_by("completed_date", "id")
+    )
+
+
+def get_available_delivers() -> QuerySet:
+    busy_deliver_orders = OrderModel.objects.filter(
+        delivery_man=OuterRef("pk"),
+        status=OrderStatusEnum.COMPLETED,
+    )
+
+    return (
+        DeliverModel.objects.filter(
+            is_online=True,
+            is_activated=True,
+            is_deleted=False,
+            latitude__isnull=False,
+            longitude__isnull=False,
+        )
+        .exclude(Exists(busy_deliver_orders))
+        .order_by("id")
+    )
+
+
+def dispatch_completed_orders() -> int:
+    """
+    Assign completed orders waiting for a delivery man to the online delivery
+    men, minimizing the total pickup distance
+
+    Orders and delivery men are locked with SKIP LOCKED so that concurrent
+    runs never assign the same order, or the same delivery man, twice.
+
+    :return: the number of assigned orders
+    """
+    with transaction.atomic():
+        orders: list[OrderModel] = list(
+            get_dispatchable_orders().select_for_update(skip_locked=True, of=("self",))
+        )
+        delivers: list[DeliverModel] = list(
+            get_available_delivers().select_for_update(skip_locked=True)
+        )
+
+        if not orders or not delivers:
+            return 0
+
+        delivers_positions = np.array(
+            [(deliver.latitude, deliver.longitude) for deliver in delivers]
+        )
+        cookers_positions = np.array(
+            [(order.cooker.latitude, order.cooker.longitude) for order in orders]
+        )
+        delivery_radiuses = np.array([deliver.delivery_radius for deliver in delivers])
+
+        distances = compute_haversine_distance_matrix(
+            delivers_positions, cookers_positions
+        )
+        costs = np.where(
+            distances <= delivery_radiuses[:, np.newaxis],
+            distances,
+            UNREACHABLE_COST,
+        )
+        delivers_indexes, orders_indexes = linear_sum_assignment(costs)
+
+        assigned_orders: list[OrderModel] = []
+        now = timezone.now()
+
+        for deliver_index, order_index in zip(delivers_indexes, orders_indexes):
+            if costs[deliver_index, order_index] >= UNREACHABLE_COST:
+                continue
+
+            order = orders[order_index]
+            order.delivery_man = delivers[deliver_index]
+            # In meters, like the delivery distances given by Google
+            order.delivery_initial_distance = round(
+                float(distances[deliver_index, order_index]) * 1000
+            )
+            order.modified = now
+            assigned_orders.append(order)
+
+        OrderModel.objects.bulk_update(
+            assigned_orders,
+            ["delivery_man", "delivery_initial_distance", "modified"],
+        )
+
+    logger.info(f"{len(assigned_orders)}/{len(orders)} completed orders dispatched")
+
+    return len(assigned_orders)
@@ -2,12 +2,15 @@ import logging
 from typing import Any
 
 import googlemaps
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.db.models import QuerySet
 from googlemaps.exceptions import ApiError, HTTPError, Timeout, TransportError
+from utils.async_views import run_external_call
+from utils.clients import LazyClient
 
 logger = logging.getLogger("watchtower-logger")
-google_map_client = googlemaps.Client(key=settings.GOOGLE_API_KEY)
+google_map_client = LazyClient(lambda: googlemaps.Client(key=settings.GOOGLE_API_KEY))
 
 
 def compute_distance(
@@ -43,6 +46,46 @@ def compute_distance(
     return distance_dict
 
 
+def get_cookers_addresses(cookers: QuerySet) -> dict[int, str]:
+    cookers_adresses_queryset: QuerySet = cookers.order_by("id").values_list(
+        "id",
+        "street_number",
+        "street_name",
+        "address_complement",
+        "postal_code",
+        "town",
+    )
+
+    return {
+        cooker[
+            0
+        ]: f"{cooker[1]} {cooker[2]} {cooker[3]}, {cooker[4]} {cooker[5]}, {settings.DEFAULT_SEARCH_COUNTRY}"
+        for cooker in cookers_adresses_queryset
+    }
+
+
+def filter_closest_cookers_ids(
+    cookers_ids_addresses_dict: dict[int, str],
+    distance_dict: dict[str, Any],
+    search_radius: int,
+) -> list:
+    closest_cookers_ids: list[int] = []
+
+    logger.debug(distance_dict)
+
+    for cooker_id, distance in zip(
+        cookers_ids_addresses_dict.keys(), distance_dict["rows"][0]["elements"]
+    ):
+
+        if distance["status"] != "OK":
+            continue
+
+        if float(distance["distance"]["value"]) <= float(search_radius * 1000):
+            closest_cookers_ids.append(cooker_id)
+
+    return closest_cookers_ids
+
+
 def get_closest_cookers_ids_from_customer_search_address(
     customer_address: str,
     cookers: QuerySet,
@@ -56,34 +99,40 @@ def get_closest_cookers_ids_from_customer_search_address(
     :param search_radius: int (in KM)
     :return: dict containing closest cookers ids from the customer address
     """
-    closest_cookers_ids: list[int] = []
-    cookers_adresses_queryset: QuerySet = cookers.order_by("id").values_list(
-        "street_number", "street_name", "address_complement", "postal_code", "town"
-    )
-    cookers_ids = cookers.order_by("id").values_list("id", flat=True)
-    cookers_adresses = [
-        f"{cooker[0]} {cooker[1]} {cooker[2]}, {cooker[3]} {cooker[4]}, {settings.DEFAULT_SEARCH_COUNTRY}"
-        for cooker in cookers_adresses_queryset
-    ]
-    cookers_ids_addresses_dict: dict[int, str] = dict(
-        zip(cookers_ids, cookers_adresses)
-    )
+    cookers_ids_addresses_dict = get_cookers_addresses(cookers)
+
+    if not cookers_ids_addresses_dict:
+        return []
 
     distance_dict: dict[str, Any] = compute_distance(
         origins=[customer_address + f", {settings.DEFAULT_SEARCH_COUNTRY}"],
         destinations=list(cookers_ids_addresses_dict.values()),
     )
 
-    logger.debug(distance_dict)
+    return filter_closest_cookers_ids(
+        cookers_ids_addresses_dict, distance_dict, search_radius
+    )
 
-    for cooker_id, distance in zip(
-        cookers_ids_addresses_dict.keys(), distance_dict["rows"][0]["elements"]
-    ):
 
-        if distance["status"] != "OK":
-            continue
+async def aget_closest_cookers_ids_from_customer_search_address(
+    customer_address: str,
+    cookers: QuerySet,
+    search_radius: int,
+) -> list:
+    """
+    Async version of get_closest_cookers_ids_from_customer_search_address
+    """
+    cookers_ids_addresses_dict = await sync_to_async(get_cookers_addresses)(cookers)
 
-        if float(distance["distance"]["value"]) <= float(search_radius * 1000):
-            closest_cookers_ids.append(cooker_id)
+    if not cookers_ids_addresses_dict:
+        return []
 
-    return closest_cookers_ids
+    distance_dict: dict[str, Any] = await run_external_call(
+        compute_distance,
+        origins=[customer_address + f", {settings.DEFAULT_SEARCH_COUNTRY}"],
+        destinations=list(cookers_ids_addresses_dict.values()),
+    )
+
+    return filter_closest_cookers_ids(
+        cookers_ids_addresses_dict, distance_dict, search_radius
+    )
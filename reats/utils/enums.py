@@ -18,6 +18,11 @@ class OrderStatusEnum(str, Enum):
     def choices(cls):
         return [(key.value.lower(), key.name.lower()) for key in cls]
 
+    @classmethod
+    def in_flight_statuses(cls):
+        """Paid orders a cooker still has to handle."""
+        return [cls.PENDING, cls.PROCESSING, cls.COMPLETED]
+
 
 class TimeFrameEnum(str, Enum):
     WEEK = "week"
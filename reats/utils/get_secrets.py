@@ -1,8 +1,30 @@
 import json
 import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Union
 
 import boto3
 from botocore.exceptions import ClientError
+from cryptography.fernet import Fernet, InvalidToken
+
+REQUIRED_SECRETS = (
+    "RSA_PRIVATE_KEY_PATH",
+    "RSA_PUBLIC_KEY_PATH",
+    "COOKER_APP_API_KEY",
+    "CUSTOMER_APP_API_KEY",
+    "DELIVERY_APP_API_KEY",
+    "GOOGLE_API_KEY",
+    "STRIPE_PRIVATE_API_KEY",
+    "STRIPE_WEBHOOK_ENDPOINT_SIGNATURE",
+    "DJANGO_SECRET_KEY",
+)
+OPTIONAL_SECRETS = ("RDS_PASSWORD",)
+
+DEFAULT_SECRETS_CACHE_TTL = 60 * 60  # in seconds
+
+# Placeholders checked by the API clients when they are created
+OFFLINE_SECRETS_PLACEHOLDERS = {"GOOGLE_API_KEY": "AIza-offline-google-api-key"}
 
 
 def fetch_aws_secrets(secret_name: str):
@@ -33,3 +55,126 @@ def fetch_aws_secrets(secret_name: str):
     except ClientError as e:
         print(f"Error retrieving secret {secret_name}: {e}")
         return None
+
+
+class SecretsProvider(ABC):
+    @abstractmethod
+    def get_secrets(self, secret_name: str) -> Union[dict, None]:
+        pass
+
+
+class EnvironmentSecretsProvider(SecretsProvider):
+    """
+    Secrets set as environment variables, used only when all of them are set.
+    """
+
+    def get_secrets(self, secret_name: str) -> Union[dict, None]:
+        if not all(os.getenv(name) for name in REQUIRED_SECRETS):
+            return None
+
+        return {
+            name: os.environ[name]
+            for name in REQUIRED_SECRETS + OPTIONAL_SECRETS
+            if name in os.environ
+        }
+
+
+class LocalCacheSecretsProvider(SecretsProvider):
+    """
+    Secrets fetched by a previous process, kept in a file encrypted with
+    Fernet. The Fernet token timestamp is used to expire the file.
+    """
+
+    def __init__(self, path: str, key: str, ttl: int) -> None:
+        self.path = path
+        self.fernet = Fernet(key)
+        self.ttl = ttl
+
+    def get_secrets(self, secret_name: str) -> Union[dict, None]:
+        try:
+            with open(self.path, "rb") as cache_file:
+                return json.loads(self.fernet.decrypt(cache_file.read(), ttl=self.ttl))
+        except (OSError, InvalidToken, ValueError):
+            return None
+
+    def store_secrets(self, secrets: dict) -> None:
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+
+        try:
+            file_descriptor = os.open(
+                temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+            )
+            with os.fdopen(file_descriptor, "wb") as cache_file:
+                cache_file.write(self.fernet.encrypt(json.dumps(secrets).encode()))
+
+            os.replace(temporary_path, self.path)  # Readers never see a partial file
+        except OSError as e:
+            print(f"Error writing secrets cache {self.path}: {e}")
+
+
+class AWSSecretsManagerProvider(SecretsProvider):
+    def get_secrets(self, secret_name: str) -> Union[dict, None]:
+        return fetch_aws_secrets(secret_name)
+
+
+class OfflineSecretsProvider(SecretsProvider):
+    """
+    Placeholder secrets for tests and offline tools, never reaching AWS.
+    """
+
+    def get_secrets(self, secret_name: str) -> Union[dict, None]:
+        return {
+            name: OFFLINE_SECRETS_PLACEHOLDERS.get(name, f"offline-{name.lower()}")
+            for name in REQUIRED_SECRETS
+        }
+
+
+def get_local_cache_provider(
+    secret_name: str,
+) -> Union[LocalCacheSecretsProvider, None]:
+    key: Union[str, None] = os.getenv("SECRETS_CACHE_KEY")
+
+    if not key:
+        return None
+
+    return LocalCacheSecretsProvider(
+        os.getenv(
+            "SECRETS_CACHE_PATH",
+            os.path.join(tempfile.gettempdir(), f"reats-secrets-{secret_name}"),
+        ),
+        key,
+        int(os.getenv("SECRETS_CACHE_TTL", DEFAULT_SECRETS_CACHE_TTL)),
+    )
+
+
+def load_secrets(secret_name: str) -> Union[dict, None]:
+    """
+    Load secrets from the first provider having them: environment variables,
+    then the local cache file, then AWS Secrets Manager. A successful remote
+    fetch refreshes the local cache file.
+
+    The local cache is only used when SECRETS_CACHE_KEY holds a Fernet key,
+    and OFFLINE_SECRETS replaces the whole chain with placeholder secrets.
+    """
+    if os.getenv("OFFLINE_SECRETS"):
+        return OfflineSecretsProvider().get_secrets(secret_name)
+
+    secrets = EnvironmentSecretsProvider().get_secrets(secret_name)
+
+    if secrets is not None:
+        return secrets
+
+    local_cache = get_local_cache_provider(secret_name)
+
+    if local_cache is not None:
+        secrets = local_cache.get_secrets(secret_name)
+
+        if secrets is not None:
+            return secrets
+
+    secrets = AWSSecretsManagerProvider().get_secrets(secret_name)
+
+    if local_cache is not None and isinstance(secrets, dict):
+        local_cache.store_secrets(secrets)
+
+    return secrets
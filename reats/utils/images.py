@@ -0,0 +1,92 @@
+from io import BytesIO
+from typing import IO
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+ORIGINAL_RENDITION_NAME = "original.jpg"
+
+
+def get_rendition_name(variant: str) -> str:
+    return f"{variant}.webp"
+
+
+def get_variants_by_size() -> list[tuple[str, int]]:
+    return sorted(
+        settings.PHOTO_VARIANTS.items(), key=lambda item: item[1], reverse=True
+    )
+
+
+def get_rendition_names() -> list[str]:
+    """
+    Names of the renditions of a photo, in the order process_photo makes them
+    """
+    return [ORIGINAL_RENDITION_NAME] + [
+        get_rendition_name(variant) for variant, _ in get_variants_by_size()
+    ]
+
+
+def process_photo(image_file: IO) -> dict[str, tuple[bytes, str]]:
+    """
+    Decode an uploaded photo, apply its EXIF orientation and drop all its
+    metadata, then encode a capped JPEG original and one WebP rendition per
+    size of settings.PHOTO_VARIANTS
+
+    :param image_file: uploaded photo, in any format known by Pillow
+    :return: content and content type of each rendition, by rendition name
+    :raises PIL.UnidentifiedImageError: when the file is not an image
+    """
+    with Image.open(image_file) as decoded_image:
+        decoded_image.draft("RGB", settings.PHOTO_ORIGINAL_MAX_SIZE)  # JPEG only
+        image = ImageOps.exif_transpose(decoded_image).convert("RGB")
+
+    image.info = {}  # EXIF, GPS, ICC profile and comments are never written
+    image.thumbnail(settings.PHOTO_ORIGINAL_MAX_SIZE, Image.Resampling.LANCZOS)
+
+    original = BytesIO()
+    image.save(original, "JPEG", quality=85, optimize=True, progressive=True)
+    renditions = {ORIGINAL_RENDITION_NAME: (original.getvalue(), "image/jpeg")}
+
+    # From the largest variant to the smallest, each resized from the previous one
+    for variant, max_size in get_variants_by_size():
+        image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        rendition = BytesIO()
+        image.save(rendition, "WEBP", quality=80, method=4)
+        renditions[get_rendition_name(variant)] = (rendition.getvalue(), "image/webp")
+
+    return renditions
+
+
+def get_photo_variant_key(photo_key: str, variant: str) -> str:
+    """
+    Key of a photo rendition, from the photo key stored in the models. Photos
+    uploaded before the renditions existed only have their original.
+    """
+    if not photo_key.endswith(f"/{ORIGINAL_RENDITION_NAME}"):
+        return photo_key
+
+    return photo_key[: -len(ORIGINAL_RENDITION_NAME)] + get_rendition_name(variant)
+
+
+def get_photo_keys(photo_key: str) -> list[str]:
+    return list(
+        dict.fromkeys(
+            [photo_key]
+            + [
+                get_photo_variant_key(photo_key, variant)
+                for variant in settings.PHOTO_VARIANTS
+            ]
+        )
+    )
+
+
+def get_original_photo_key(key: str) -> str:
+    """
+    Photo key stored in the models, from the key of one of its renditions
+    """
+    directory, _, name = key.rpartition("/")
+
+    if name not in get_rendition_names():
+        return key
+
+    return f"{directory}/{ORIGINAL_RENDITION_NAME}"
@@ -0,0 +1,180 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Union
+
+from core_app.models import OtpSendModel, OtpThrottleBucketModel
+from django.db import transaction
+from django.utils import timezone
+
+
+class LocalFrontCache:
+    """
+    Bounded per-process LRU sitting in front of a database-backed store.
+    """
+
+    def __init__(self, max_size: int = 10_000) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = Lock()
+
+    def get_local(self, key: str) -> Any:
+        with self._lock:
+            return self._entries.get(key)
+
+    def set_local(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop_local(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class TokenBucketStore(LocalFrontCache):
+    """
+    Token buckets persisted in the database.
+
+    The database bucket is shared by every process and only loses tokens
+    between two refills, so a local copy without any token left is enough to
+    reject a request without a database round trip.
+    """
+
+    @staticmethod
+    def refill(
+        tokens: float,
+        updated: datetime,
+        now: datetime,
+        capacity: int,
+        refill_time: float,
+    ) -> float:
+        elapsed_seconds = max((now - updated).total_seconds(), 0.0)
+
+        return min(float(capacity), tokens + elapsed_seconds / refill_time)
+
+    def consume(self, key: str, capacity: int, refill_time: float) -> float:
+        """
+        Take a token from a bucket
+
+        :param capacity: maximum number of tokens in the bucket
+        :param refill_time: seconds needed to get a token back
+        :return: 0 if a token was taken, else the seconds to wait for the next one
+        """
+        now = timezone.now()
+        local_bucket: Union[tuple[float, datetime], None] = self.get_local(key)
+
+        if local_bucket is not None:
+            tokens = self.refill(*local_bucket, now, capacity, refill_time)
+
+            if tokens < 1:
+                return (1 - tokens) * refill_time
+
+        with transaction.atomic():
+            locked_buckets = OtpThrottleBucketModel.objects.select_for_update()
+            bucket, _ = locked_buckets.get_or_create(
+                key=key,
+                defaults={"tokens": capacity, "updated": now},
+            )
+            tokens = self.refill(
+                bucket.tokens, bucket.updated, now, capacity, refill_time
+            )
+            is_allowed = tokens >= 1
+
+            if is_allowed:
+                tokens -= 1
+
+            bucket.tokens = tokens
+            bucket.updated = now
+            bucket.save(update_fields=["tokens", "updated"])
+
+        self.set_local(key, (tokens, now))
+
+        return 0.0 if is_allowed else (1 - tokens) * refill_time
+
+    @staticmethod
+    def delete_full(full_period: timedelta) -> int:
+        """
+        Delete the buckets left untouched long enough to be full again, they are
+        recreated full on their next use anyway
+
+        :param full_period: seconds needed by the slowest bucket to refill entirely
+        :return: The number of deleted buckets
+        """
+        deleted_buckets_number, _ = OtpThrottleBucketModel.objects.filter(
+            updated__lte=timezone.now() - full_period
+        ).delete()
+
+        return deleted_buckets_number
+
+
+class OtpSendStore(LocalFrontCache):
+    """
+    Dates of the last OTP successfully sent to each phone number, until it is
+    used.
+
+    An OTP used through another process is only removed from the database, so
+    a local copy is trusted for local_ttl at most.
+    """
+
+    local_ttl = timedelta(seconds=5)
+
+    def is_recently_sent(self, phone: str, window: timedelta) -> bool:
+        now = timezone.now()
+        local_send: Union[tuple[datetime, datetime], None] = self.get_local(phone)
+
+        if local_send is not None:
+            sent_date, checked_date = local_send
+
+            if now - sent_date < window and now - checked_date < self.local_ttl:
+                return True
+
+        sent_date = (
+            OtpSendModel.objects.filter(phone=phone, sent_date__gt=now - window)
+            .values_list("sent_date", flat=True)
+            .first()
+        )
+
+        if sent_date is None:
+            self.pop_local(phone)
+            return False
+
+        self.set_local(phone, (sent_date, now))
+
+        return True
+
+    def mark_sent(self, phone: str) -> None:
+        now = timezone.now()
+        OtpSendModel.objects.update_or_create(phone=phone, defaults={"sent_date": now})
+        self.set_local(phone, (now, now))
+
+    def mark_used(self, phone: str) -> None:
+        """
+        Let the next authentication send a new OTP
+        """
+        OtpSendModel.objects.filter(phone=phone).delete()
+        self.pop_local(phone)
+
+    @staticmethod
+    def delete_expired(window: timedelta) -> int:
+        """
+        Delete the sends older than the deduplication window, they are ignored
+
+        :return: The number of deleted sends
+        """
+        deleted_sends_number, _ = OtpSendModel.objects.filter(
+            sent_date__lte=timezone.now() - window
+        ).delete()
+
+        return deleted_sends_number
+
+
+otp_throttle_buckets = TokenBucketStore()
+otp_sends = OtpSendStore()
@@ -0,0 +1,23 @@
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class BoundedJSONParser(JSONParser):
+    """
+    JSON parser refusing bodies bigger than settings.MAX_JSON_BODY_SIZE.
+
+    The body is read with a hard limit, so an oversized or chunked payload
+    is rejected before being decoded.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        max_body_size: int = settings.MAX_JSON_BODY_SIZE
+        raw_body: bytes = stream.read(max_body_size + 1)
+
+        if len(raw_body) > max_body_size:
+            raise ParseError(f"JSON body exceeds {max_body_size} bytes")
+
+        return super().parse(BytesIO(raw_body), media_type, parser_context)
@@ -0,0 +1,28 @@
+from functools import lru_cache
+
+import phonenumbers
+from django.conf import settings
+from phonenumbers.phonenumberutil import NumberParseException
+
+
+@lru_cache(maxsize=4096)
+def parse_phone(phone: str) -> tuple[str, str]:
+    """
+    Parse a phone number once and return both its E.164 form and its national
+    form without spaces. Results are memoized, the auth flows keep parsing the
+    same numbers.
+    """
+    if phone in settings.PHONE_BLACK_LIST:
+        raise NumberParseException(
+            NumberParseException.NOT_A_NUMBER,
+            "This phone number is forbidden",
+        )
+
+    phone_number = phonenumbers.parse(phone, settings.PHONE_REGION)
+
+    return (
+        phonenumbers.format_number(phone_number, phonenumbers.PhoneNumberFormat.E164),
+        phonenumbers.format_number(
+            phone_number, phonenumbers.PhoneNumberFormat.NATIONAL
+        ).replace(" ", ""),
+    )
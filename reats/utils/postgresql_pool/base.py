@@ -0,0 +1,223 @@
+"""
+PostgreSQL backend borrowing its connections from a per-process pool.
+
+Django 4.1 has no built-in pool and psycopg_pool needs psycopg 3, so closing a
+connection at the end of a request gives it back to the pool instead.
+Enabled with the DB_POOL_MAX_SIZE environment variable, see source/settings.py.
+"""
+
+import os
+from threading import Condition, Lock
+from time import monotonic
+from typing import Callable, Union
+
+import psycopg2
+from django.conf import settings
+from django.db.backends.postgresql import base
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.extensions import connection as Connection
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of at most max_size connections to one database.
+
+    Connections idle for more than health_check_age seconds are checked with
+    a query before being lent again, the broken ones are replaced.
+    """
+
+    def __init__(self, max_size: int, timeout: float, health_check_age: float) -> None:
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_age = health_check_age
+        self.pid = os.getpid()
+
+        self.size = 0  # Idle and in use connections
+        self.in_use = 0
+        self.waiting = 0
+        self.created = 0  # Since the process start
+        self._idle_connections: list[tuple[Connection, float]] = []
+        self._condition = Condition()
+
+    def get_connection(self, connect: Callable[[], Connection]) -> Connection:
+        """
+        Lend an idle connection, or a new one made with connect when the pool
+        is not full. Wait for a connection to be given back otherwise.
+        """
+        deadline = monotonic() + self.timeout
+        idle_connection: Union[tuple[Connection, float], None] = None
+
+        with self._condition:
+            self.waiting += 1
+
+            try:
+                while not self._idle_connections and self.size >= self.max_size:
+                    remaining = deadline - monotonic()
+
+                    if remaining <= 0 or not self._condition.wait(remaining):
+                        raise PoolTimeout(
+                            f"No database connection available after {self.timeout} seconds"
+                        )
+            finally:
+                self.waiting -= 1
+
+            self.in_use += 1
+
+            if self._idle_connections:
+                idle_connection = self._idle_connections.pop()
+            else:
+                self.size += 1
+
+        if idle_connection is not None:
+            if self.is_healthy(*idle_connection):
+                return idle_connection[0]
+
+            self.close_quietly(idle_connection[0])  # Its slot goes to a new one
+
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self.size -= 1
+                self.in_use -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self.created += 1
+
+        return connection
+
+    def put_connection(self, connection: Connection) -> None:
+        if not connection.closed and (
+            connection.info.transaction_status != TRANSACTION_STATUS_IDLE
+        ):
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                pass
+
+        is_reusable = (
+            not connection.closed
+            and connection.info.transaction_status == TRANSACTION_STATUS_IDLE
+        )
+
+        if not is_reusable:
+            self.close_quietly(connection)
+
+        with self._condition:
+            self.in_use -= 1
+
+            if is_reusable:
+                self._idle_connections.append((connection, monotonic()))
+            else:
+                self.size -= 1
+
+            self._condition.notify()
+
+    def is_healthy(self, connection: Connection, returned_at: float) -> bool:
+        if connection.closed:
+            return False
+
+        if monotonic() - returned_at < self.health_check_age:
+            return True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def close_quietly(connection: Connection) -> None:
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+    def close_idle_connections(self) -> None:
+        with self._condition:
+            idle_connections = self._idle_connections
+            self._idle_connections = []
+            self.size -= len(idle_connections)
+
+        for connection, _ in idle_connections:
+            self.close_quietly(connection)
+
+    def get_metrics(self) -> dict:
+        with self._condition:
+            return {
+                "max_size": self.max_size,
+                "size": self.size,
+                "in_use": self.in_use,
+                "idle": len(self._idle_connections),
+                "waiting": self.waiting,
+                "created": self.created,
+            }
+
+
+pools: dict[str, ConnectionPool] = {}
+pools_lock = Lock()
+
+
+def get_pool(alias: str) -> ConnectionPool:
+    """
+    Pool of the database alias for the current process, a forked gunicorn
+    worker never reuses the connections of its master.
+    """
+    pool = pools.get(alias)
+
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+
+    with pools_lock:
+        pool = pools.get(alias)
+
+        if pool is None or pool.pid != os.getpid():
+            pool = ConnectionPool(
+                settings.DB_POOL_MAX_SIZE,
+                settings.DB_POOL_TIMEOUT,
+                settings.DB_POOL_HEALTH_CHECK_AGE,
+            )
+            pools[alias] = pool
+
+        return pool
+
+
+def get_pools_metrics() -> dict:
+    return {
+        alias: pool.get_metrics()
+        for alias, pool in list(pools.items())
+        if pool.pid == os.getpid()
+    }
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    pool: Union[ConnectionPool, None] = None
+
+    def get_new_connection(self, conn_params: dict) -> Connection:
+        self.pool = get_pool(self.alias)
+        connection = self.pool.get_connection(
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params)
+        )
+        # Set by the parent class on new connections only
+        self.isolation_level = self.settings_dict["OPTIONS"].get(
+            "isolation_level", connection.isolation_level
+        )
+
+        return connection
+
+    def _close(self) -> None:
+        if self.connection is None:
+            return
+
+        if self.pool is None or self.pool.pid != os.getpid():
+            return  # Opened before a fork, the socket belongs to the parent
+
+        with self.wrap_database_errors:
+            self.pool.put_connection(self.connection)
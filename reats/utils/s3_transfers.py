@@ -0,0 +1,188 @@
+"""
+S3 transfers taken out of the requests.
+
+Uploads run on a bounded thread pool, requests only wait for it when too many
+uploads are already pending. Deleted keys are queued and sent by a background
+thread, coalesced into delete_objects calls of up to 1000 keys.
+"""
+
+import atexit
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore, Condition, Lock, Thread
+from typing import Any, Callable, Optional, Union
+
+from boto3.s3.transfer import TransferConfig
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger("watchtower-logger")
+
+DELETE_OBJECTS_MAX_KEYS = 1000  # S3 limit per delete_objects call
+
+transfer_config = TransferConfig(
+    multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+    multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE,
+    max_concurrency=settings.S3_MULTIPART_MAX_CONCURRENCY,
+)
+
+
+class UploadExecutor:
+    """
+    Thread pool running the uploads once the response is sent, created on
+    first use so that forked workers never share its threads.
+
+    With settings.S3_UPLOADS_MAX_CONCURRENCY set to 0, uploads run in the
+    request thread.
+    """
+
+    def __init__(self, thread_name_prefix: str) -> None:
+        self.thread_name_prefix = thread_name_prefix
+        self.lock = Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.pending_slots: Optional[BoundedSemaphore] = None
+        self.futures: set[Future] = set()
+        self.pid = 0
+
+    def get_executor(self) -> tuple[ThreadPoolExecutor, BoundedSemaphore]:
+        with self.lock:
+            if self.executor is None or self.pid != os.getpid():
+                self.executor = ThreadPoolExecutor(
+                    max_workers=settings.S3_UPLOADS_MAX_CONCURRENCY,
+                    thread_name_prefix=self.thread_name_prefix,
+                )
+                self.pending_slots = BoundedSemaphore(settings.S3_UPLOADS_MAX_PENDING)
+                self.futures = set()
+                self.pid = os.getpid()
+
+            return self.executor, self.pending_slots  # type: ignore
+
+    def submit(self, function: Callable, *args) -> Union[Future, Any]:
+        """
+        Run the upload in the background, waiting for a slot when
+        settings.S3_UPLOADS_MAX_PENDING uploads are already queued or running
+        """
+        if not settings.S3_UPLOADS_MAX_CONCURRENCY:
+            return function(*args)
+
+        executor, pending_slots = self.get_executor()
+        pending_slots.acquire()
+
+        try:
+            future = executor.submit(function, *args)
+        except BaseException:
+            pending_slots.release()
+            raise
+
+        with self.lock:
+            self.futures.add(future)
+
+        future.add_done_callback(lambda done: self.on_done(done, pending_slots))
+
+        return future
+
+    def on_done(self, future: Future, pending_slots: BoundedSemaphore) -> None:
+        with self.lock:
+            self.futures.discard(future)
+
+        pending_slots.release()
+
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Background upload failed: {future.exception()!r}")
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for the uploads submitted so far
+        """
+        with self.lock:
+            futures = list(self.futures)
+
+        for future in futures:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass  # Already logged by on_done
+
+    def get_metrics(self) -> dict:
+        with self.lock:
+            return {
+                "max_concurrency": settings.S3_UPLOADS_MAX_CONCURRENCY,
+                "pending": len(self.futures),
+            }
+
+
+class DeleteQueue:
+    """
+    Keys to delete, sent by a background thread every
+    settings.S3_DELETES_FLUSH_INTERVAL seconds, or as soon as a full batch is
+    queued. Queuing the same key twice only deletes it once.
+
+    With settings.S3_DELETES_FLUSH_INTERVAL set to 0, keys are deleted in the
+    calling thread.
+    """
+
+    def __init__(self, delete_batch: Callable[[list[str]], None]) -> None:
+        self.delete_batch = delete_batch
+        self.condition = Condition()
+        self.keys: dict[str, None] = {}  # Ordered set
+        self.thread: Optional[Thread] = None
+        self.pid = 0
+        atexit.register(self.flush)
+
+    def put(self, keys: list[str]) -> None:
+        if not settings.S3_DELETES_FLUSH_INTERVAL:
+            self.send(keys)
+            return
+
+        with self.condition:
+            self.keys.update(dict.fromkeys(keys))
+
+            if self.thread is None or self.pid != os.getpid():
+                self.thread = Thread(target=self.run, name="s3-deletes", daemon=True)
+                self.pid = os.getpid()
+                self.thread.start()
+
+            if len(self.keys) >= DELETE_OBJECTS_MAX_KEYS:
+                self.condition.notify()
+
+    def discard(self, keys: list[str]) -> None:
+        with self.condition:
+            for key in keys:
+                self.keys.pop(key, None)
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: len(self.keys) >= DELETE_OBJECTS_MAX_KEYS,
+                    # put stops queuing once the interval is set to 0
+                    timeout=settings.S3_DELETES_FLUSH_INTERVAL or None,
+                )
+
+            self.flush()
+            # Not a request thread, nothing else closes its connections
+            close_old_connections()
+
+    def flush(self) -> None:
+        """
+        Delete the queued keys now
+        """
+        with self.condition:
+            keys = list(self.keys)
+            self.keys.clear()
+
+        self.send(keys)
+
+    def send(self, keys: list[str]) -> None:
+        for start in range(0, len(keys), DELETE_OBJECTS_MAX_KEYS):
+            end = start + DELETE_OBJECTS_MAX_KEYS
+
+            try:
+                self.delete_batch(keys[start:end])
+            except Exception as err:
+                logger.error(err)
+
+    def get_metrics(self) -> dict:
+        with self.condition:
+            return {"queued": len(self.keys)}
@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+from typing import IO
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from utils.clients import LazyClient
+
+
+class Storage(ABC):
+    """
+    Object storage of the photos, addressed by S3 keys. Failures are logged,
+    never raised, like in the rest of utils.common.
+    """
+
+    @abstractmethod
+    def upload(self, file: IO, key: str, content_type: str, cache_control: str) -> None:
+        pass
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def delete(self, keys: list[str]) -> None:
+        """
+        Delete up to 1000 keys, missing keys being ignored
+        """
+
+    @abstractmethod
+    def get_signed_url(self, key: str, expires_in: int) -> str:
+        pass
+
+
+storage: Storage = LazyClient(  # type: ignore
+    lambda: import_string(settings.STORAGE_BACKEND)()
+)
+
+
+@receiver(setting_changed)
+def reset_storage(setting: str, **kwargs) -> None:
+    if setting.startswith("STORAGE_"):
+        storage.reset()  # type: ignore
@@ -0,0 +1,145 @@
+import json
+import logging
+import mmap
+import os
+import shutil
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from time import time
+from typing import IO, Iterator, Optional
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .base import Storage
+
+logger = logging.getLogger("watchtower-logger")
+
+
+class InvalidKey(ValueError):
+    pass
+
+
+class FileSystemStorage(Storage):
+    """
+    Stand-in for S3 on the local disk, for development, load tests and
+    benchmarks without network.
+
+    Objects are stored under <root>/objects/<key>, with their content type and
+    cache control under <root>/metadata/<key>.json, both replaced atomically
+    like S3 objects. Reads are memory-mapped. Signed URLs point to
+    core_app.views.serve_storage_object, signed with the SECRET_KEY and
+    expiring like S3 presigned URLs.
+    """
+
+    def __init__(
+        self, root: Optional[str] = None, base_url: Optional[str] = None
+    ) -> None:
+        self.root = Path(root or settings.STORAGE_FILESYSTEM_ROOT).resolve()
+        self.base_url = (base_url or settings.STORAGE_FILESYSTEM_URL).rstrip("/")
+
+    def get_path(self, key: str, kind: str = "objects") -> Path:
+        parts = key.split("/")
+
+        if not key or key.startswith("/") or any(p in ("", ".", "..") for p in parts):
+            raise InvalidKey(key)
+
+        return self.root.joinpath(kind, *parts)
+
+    def write_atomically(self, path: Path, file: IO) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with NamedTemporaryFile(dir=path.parent, delete=False) as temporary_file:
+            try:
+                shutil.copyfileobj(file, temporary_file)
+            except BaseException:
+                os.unlink(temporary_file.name)
+                raise
+
+        os.replace(temporary_file.name, path)
+
+    def upload(self, file: IO, key: str, content_type: str, cache_control: str) -> None:
+        try:
+            path = self.get_path(key)
+            self.write_atomically(path, file)
+            metadata = json.dumps(
+                {
+                    "ContentType": content_type,
+                    "CacheControl": cache_control,
+                    "ContentLength": path.stat().st_size,
+                }
+            )
+            self.write_atomically(
+                self.get_path(f"{key}.json", "metadata"),
+                BytesIO(metadata.encode()),
+            )
+        except (InvalidKey, OSError) as err:
+            logger.error(err)
+        else:
+            logger.info(f"{key} has been stored in {self.root}.")
+
+    def exists(self, key: str) -> bool:
+        try:
+            return self.get_path(key).is_file()
+        except InvalidKey:
+            return False
+
+    def delete(self, keys: list[str]) -> None:
+        for key in keys:
+            try:
+                self.get_path(key).unlink(missing_ok=True)
+                self.get_path(f"{key}.json", "metadata").unlink(missing_ok=True)
+            except (InvalidKey, OSError) as err:
+                logger.error(err)
+
+    def sign(self, key: str, expires: int) -> str:
+        return salted_hmac(
+            "utils.storage.filesystem", f"{key}:{expires}", algorithm="sha256"
+        ).hexdigest()
+
+    def get_signed_url(self, key: str, expires_in: int) -> str:
+        expires = int(time()) + expires_in
+        query = urlencode({"Expires": expires, "Signature": self.sign(key, expires)})
+
+        return f"{self.base_url}/{quote(key)}?{query}"
+
+    def is_signature_valid(self, key: str, expires: str, signature: str) -> bool:
+        try:
+            expires_at = int(expires)
+        except ValueError:
+            return False
+
+        return expires_at > time() and constant_time_compare(
+            signature, self.sign(key, expires_at)
+        )
+
+    def get_metadata(self, key: str) -> dict:
+        """
+        ContentType, CacheControl and ContentLength of an object
+
+        :raises FileNotFoundError: when the object does not exist
+        """
+        return json.loads(self.get_path(f"{key}.json", "metadata").read_bytes())
+
+    @contextmanager
+    def open(self, key: str) -> Iterator[memoryview]:
+        """
+        Memory-mapped content of an object
+
+        :raises FileNotFoundError: when the object does not exist
+        """
+        with open(self.get_path(key), "rb") as object_file:
+            if os.fstat(object_file.fileno()).st_size == 0:
+                yield memoryview(b"")  # Empty files cannot be mapped
+                return
+
+            with mmap.mmap(object_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                content = memoryview(mapped)
+
+                try:
+                    yield content
+                finally:
+                    content.release()
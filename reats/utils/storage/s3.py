@@ -0,0 +1,76 @@
+import logging
+import os
+from typing import IO
+
+import boto3
+from botocore.exceptions import ClientError
+from utils.clients import LazyClient
+from utils.s3_transfers import transfer_config
+
+from .base import Storage
+
+logger = logging.getLogger("watchtower-logger")
+s3 = LazyClient(
+    lambda: boto3.session.Session(region_name=os.getenv("AWS_REGION")).client(
+        "s3", config=boto3.session.Config(signature_version="s3v4")
+    )
+)
+
+
+class S3Storage(Storage):
+    def __init__(self) -> None:
+        self.bucket = os.getenv("AWS_S3_BUCKET")
+
+    def upload(self, file: IO, key: str, content_type: str, cache_control: str) -> None:
+        try:
+            s3.upload_fileobj(
+                file,
+                self.bucket,
+                key,
+                ExtraArgs={"ContentType": content_type, "CacheControl": cache_control},
+                Config=transfer_config,
+            )
+        except ClientError as err:
+            logger.error(err)
+        else:
+            logger.info(f"{key} has been uploaded to S3.")
+
+    def exists(self, key: str) -> bool:
+        try:
+            s3.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as err:
+            if err.response["Error"]["Code"] not in ("404", "NoSuchKey"):
+                logger.error(err)
+
+            return False
+
+        return True
+
+    def delete(self, keys: list[str]) -> None:
+        try:
+            s3.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+            )
+        except ClientError as err:
+            logger.error(err)
+        else:
+            logger.info(
+                f"{len(keys)} objects have been removed from {self.bucket} bucket"
+            )
+
+    def get_signed_url(self, key: str, expires_in: int) -> str:
+        url = ""
+
+        try:
+            url = s3.generate_presigned_url(
+                ClientMethod="get_object",
+                Params={"Bucket": self.bucket, "Key": key},
+                ExpiresIn=expires_in,
+            )
+        except ClientError as err:
+            logger.error(err)
+        else:
+            logger.info(url)
+
+        return url
@@ -0,0 +1,252 @@
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Union
+
+from core_app.models import CookerDailyRollupModel, OrderModel
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, DurationField, F, Q, QuerySet, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from utils.common import compute_start_date
+from utils.enums import OrderStatusEnum, TimeFrameEnum
+from utils.timeframe_stats_cache import get_series_cache_key
+
+logger = logging.getLogger("watchtower-logger")
+
+
+def get_timeframe_stats_response(
+    timeframe: Union[str, None], get_stats: Callable[[str], list[dict]]
+) -> Response:
+    """
+    Response of the timeframe stats endpoints, get_stats being called with a
+    valid timeframe only
+    """
+    if timeframe not in [item.value for item in TimeFrameEnum]:
+        logger.error(f"Invalid timeframe {timeframe}")
+        return Response(
+            {
+                "ok": False,
+                "status_code": status.HTTP_400_BAD_REQUEST,
+                "error": "Invalid timeframe. Expected one of week, month or year.",
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    return Response(
+        {
+            "ok": True,
+            "status_code": status.HTTP_200_OK,
+            "data": get_stats(timeframe),
+        }
+    )
+
+
+def get_timeframe_buckets(timeframe: str) -> list[date]:
+    """
+    Compute the start day of every bucket of the given timeframe, up to the current one.
+
+    Buckets are days for a week or a month and months for a year.
+    """
+    start_day: date = compute_start_date(timeframe).date()
+    today: date = timezone.localdate()
+
+    if timeframe == TimeFrameEnum.YEAR:
+        return [date(today.year, month, 1) for month in range(1, today.month + 1)]
+
+    return [start_day + timedelta(days=i) for i in range((today - start_day).days + 1)]
+
+
+def get_bucket_end(timeframe: str, bucket_start: date) -> date:
+    if timeframe == TimeFrameEnum.YEAR:
+        return (bucket_start + timedelta(days=32)).replace(day=1)
+
+    return bucket_start + timedelta(days=1)
+
+
+def get_bucketed_series(
+    series_name: str,
+    timeframe: str,
+    compute_buckets: Callable[[date, date], dict[date, dict]],
+    empty_bucket: dict,
+    is_bucket_final: Callable[[dict], bool],
+) -> list[dict]:
+    """
+    Build the stats series of a timeframe.
+
+    Finished buckets are cached once final, until their rows change, see
+    utils.timeframe_stats_cache. Only the missing buckets and the current one
+    are computed, in a single query.
+    """
+    buckets: list[date] = get_timeframe_buckets(timeframe)
+    cache_key: str = get_series_cache_key(series_name)
+    keys: dict[date, str] = {
+        bucket: f"{cache_key}:{timeframe}:{bucket.isoformat()}" for bucket in buckets
+    }
+    cached_buckets: dict[str, dict] = cache.get_many(list(keys.values())[:-1])
+    missing_buckets: list[date] = [
+        bucket for bucket in buckets if keys[bucket] not in cached_buckets
+    ]
+    computed_buckets: dict[date, dict] = compute_buckets(
+        missing_buckets[0], get_bucket_end(timeframe, buckets[-1])
+    )
+
+    series: list[dict] = []
+    final_buckets: dict[str, dict] = {}
+
+    for bucket in buckets:
+        if keys[bucket] in cached_buckets:
+            series.append(cached_buckets[keys[bucket]])
+            continue
+
+        bucket_stats = {
+            "start_date": bucket.isoformat(),
+            **empty_bucket,
+            **computed_buckets.get(bucket, {}),
+        }
+
+        if bucket != buckets[-1] and is_bucket_final(bucket_stats):
+            final_buckets[keys[bucket]] = bucket_stats
+
+        series.append(bucket_stats)
+
+    cache.set_many(final_buckets, timeout=settings.TIMEFRAME_STATS_CACHE_TIME)
+
+    return series
+
+
+def get_cooker_timeframe_stats(cooker_id: int, timeframe: str) -> list[dict]:
+    """
+    Orders number and revenue of a cooker per bucket, read from the daily rollups.
+
+    Cancelled orders are left out. A past bucket is final once none of its
+    orders is still in flight.
+    """
+    bucket_field = TruncMonth("day") if timeframe == TimeFrameEnum.YEAR else F("day")
+    cancelled_statuses = [
+        OrderStatusEnum.CANCELLED_BY_COOKER,
+        OrderStatusEnum.CANCELLED_BY_CUSTOMER,
+    ]
+
+    def compute_buckets(start_day: date, end_day: date) -> dict[date, dict]:
+        rollups: QuerySet = (
+            CookerDailyRollupModel.objects.filter(
+                cooker_id=cooker_id,
+                day__gte=start_day,
+                day__lt=end_day,
+            )
+            .exclude(status__in=cancelled_statuses)
+            .annotate(bucket=bucket_field)
+            .values("bucket")
+            .annotate(
+                orders_number=Sum("count"),
+                revenue=Sum("revenue"),
+                in_flight_orders_number=Sum(
+                    "count",
+                    filter=Q(status__in=OrderStatusEnum.in_flight_statuses()),
+                ),
+            )
+        )
+
+        return {
+            rollup.pop("bucket"): {
+                "orders_number": rollup["orders_number"],
+                "revenue": round(rollup["revenue"], 2),
+                "in_flight_orders_number": rollup["in_flight_orders_number"] or 0,
+            }
+            for rollup in rollups
+        }
+
+    series = get_bucketed_series(
+        f"cooker:{cooker_id}",
+        timeframe,
+        compute_buckets,
+        {"orders_number": 0, "revenue": 0.0, "in_flight_orders_number": 0},
+        lambda bucket_stats: bucket_stats["in_flight_orders_number"] == 0,
+    )
+
+    return [
+        {
+            key: value
+            for key, value in bucket_stats.items()
+            if key != "in_flight_orders_number"
+        }
+        for bucket_stats in series
+    ]
+
+
+def get_deliver_timeframe_stats(deliver_id: int, timeframe: str) -> list[dict]:
+    """
+    Deliveries of a delivery man per bucket of delivery day.
+
+    Delivered is a final status, so every past bucket is final.
+    """
+    bucket_field = (
+        TruncMonth("delivered_date")
+        if timeframe == TimeFrameEnum.YEAR
+        else TruncDate("delivered_date")
+    )
+
+    def compute_buckets(start_day: date, end_day: date) -> dict[date, dict]:
+        orders: QuerySet = (
+            OrderModel.objects.filter(
+                delivery_man_id=deliver_id,
+                status=OrderStatusEnum.DELIVERED,
+                delivered_date__gte=timezone.make_aware(
+                    datetime.combine(start_day, time.min)
+                ),
+                delivered_date__lt=timezone.make_aware(
+                    datetime.combine(end_day, time.min)
+                ),
+            )
+            .annotate(bucket=bucket_field)
+            .values("bucket")
+            .annotate(
+                deliveries_number=Count("id"),
+                total_delivery_fees=Sum(
+                    Coalesce("delivery_fees", 0.0)
+                    + Coalesce("delivery_fees_bonus", 0.0)
+                ),
+                total_delivery_distance=Sum(
+                    Coalesce("delivery_distance", 0.0)
+                    + Coalesce("delivery_initial_distance", 0.0)
+                ),
+                delivery_mean_time=Avg(
+                    F("delivered_date") - F("delivery_in_progress_date"),
+                    output_field=DurationField(),
+                ),
+            )
+        )
+
+        return {
+            (
+                order["bucket"].date()
+                if timeframe == TimeFrameEnum.YEAR
+                else order["bucket"]
+            ): {
+                "deliveries_number": order["deliveries_number"],
+                "total_delivery_fees": round(order["total_delivery_fees"], 2),
+                "total_delivery_distance": round(order["total_delivery_distance"], 2),
+                "delivery_mean_time": (
+                    round(order["delivery_mean_time"].total_seconds(), 2)
+                    if order["delivery_mean_time"] is not None
+                    else 0.0
+                ),
+            }
+            for order in orders
+        }
+
+    return get_bucketed_series(
+        f"deliver:{deliver_id}",
+        timeframe,
+        compute_buckets,
+        {
+            "deliveries_number": 0,
+            "total_delivery_fees": 0.0,
+            "total_delivery_distance": 0.0,
+            "delivery_mean_time": 0.0,
+        },
+        lambda bucket_stats: True,
+    )
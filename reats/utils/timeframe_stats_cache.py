@@ -0,0 +1,43 @@
+"""
+Versions of the buckets cached by utils.timeframe_stats, per series of buckets
+("cooker:1", "deliver:2") and for every series at once.
+
+Changing a version makes the buckets cached under the previous one unreachable,
+they expire after settings.TIMEFRAME_STATS_CACHE_TIME.
+"""
+
+from time import time_ns
+
+from django.core.cache import cache
+from django.db import transaction
+
+STATS_CACHE_KEY_PREFIX = "timeframe-stats"
+ALL_SERIES = "all"
+
+
+def get_version_key(series: str) -> str:
+    return f"{STATS_CACHE_KEY_PREFIX}:version:{series}"
+
+
+def get_series_cache_key(series: str) -> str:
+    """
+    Prefix of the cached buckets keys of a series, holding its current versions
+    """
+    version_keys = [get_version_key(ALL_SERIES), get_version_key(series)]
+    versions = cache.get_many(version_keys)
+
+    return ":".join(
+        [STATS_CACHE_KEY_PREFIX, series]
+        + [str(versions.get(version_key, 0)) for version_key in version_keys]
+    )
+
+
+def invalidate_timeframe_stats(series: str = ALL_SERIES) -> None:
+    """
+    Drop the cached buckets of a series, or of every series, once the current
+    transaction is committed so that they are not computed again from the
+    previous rows
+    """
+    transaction.on_commit(
+        lambda: cache.set(get_version_key(series), time_ns(), timeout=None)
+    )